@@ -3,5 +3,9 @@
 from __future__ import annotations
 
 from .neo4j_service import Neo4jService, Neo4jResult
-from .settings import Neo4jSetting
-
+from .query_log import QueryLog, QueryExecution, QueryStats
+from .schema import Neo4jSchemaManager, IndexStatus
+from .index_version import IndexVersion
+from .neighborhood import EntityNeighborhoods, NeighborhoodStats
+from .scope import course_index_name, course_label, course_slug
+from .settings import Neo4jSetting, Neo4jSchemaSetting
@@ -0,0 +1,68 @@
+"""Version counter of the knowledge graph.
+
+The indexing service bumps it after every successful run; readers such as
+the RAG query cache compare it with the version their results were computed at.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from base import BaseModel
+from logger import get_logger
+
+from .neo4j_service import Neo4jService
+
+logger = get_logger(__name__)
+
+BUMP_INDEX_VERSION = """
+MERGE (v:IndexVersion {name: $name})
+SET v.version = coalesce(v.version, 0) + 1, v.updated_at = timestamp()
+RETURN v.version AS version
+"""
+
+READ_INDEX_VERSION = """
+OPTIONAL MATCH (v:IndexVersion {name: $name})
+RETURN coalesce(v.version, 0) AS version
+"""
+
+
+class IndexVersion(BaseModel):
+    """Monotonic version of the graph, stored on a single ``IndexVersion`` node."""
+
+    neo4j_service: Neo4jService
+    name: str = 'knowledge_graph'
+
+    async def bump(self) -> Optional[int]:
+        """Increment the version.
+
+        Returns:
+            Optional[int]: The new version, None on failure.
+        """
+        rows = await self.neo4j_service.execute_write(
+            BUMP_INDEX_VERSION,
+            {'name': self.name},
+            output_format='records',
+            query_name='BUMP_INDEX_VERSION',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to bump index version', extra={'name': self.name, 'error': rows.error})
+            return None
+        return rows[0]['version']
+
+    async def read(self) -> Optional[int]:
+        """Read the current version (0 before the first bump).
+
+        Returns:
+            Optional[int]: The current version, None on failure.
+        """
+        rows = await self.neo4j_service.execute_read(
+            READ_INDEX_VERSION,
+            {'name': self.name},
+            output_format='records',
+            query_name='READ_INDEX_VERSION',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to read index version', extra={'name': self.name, 'error': rows.error})
+            return None
+        return rows[0]['version']
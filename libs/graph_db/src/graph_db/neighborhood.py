@@ -0,0 +1,161 @@
+"""Materialized entity neighborhoods of the knowledge graph.
+
+Every Entity gets ``NEIGHBOR`` relationships to its ``top_k`` relationship
+Descriptions, ranked by how many chunks mention both endpoints of the
+relationship, then by recency. The relationship holds the ``chunk_uid`` and
+``rank`` of the Description, whose text and embedding stay on the node.
+Chunks also get the ``file_name`` of their Document.
+
+Query-time context mapping then reads at most ``top_k`` ``(e)-[:NEIGHBOR]->(d)``
+relationships per entity instead of expanding every ``Relationship`` node, so
+its cost no longer grows with the degree of hub entities.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from base import BaseModel
+from logger import get_logger
+
+from .neo4j_service import Neo4jService
+
+logger = get_logger(__name__)
+
+# Entities with a relationship Description written after their last materialization
+STALE_ENTITIES = """
+MATCH (e:Entity)-[:RELATED]-(:Relationship)-[:DESCRIBED]->(d:Description)
+WITH e, max(d.updated_at) AS updated_at
+WHERE e.neighborhood_at IS NULL OR e.neighborhood_at < updated_at
+RETURN e.name AS name
+"""
+
+MATERIALIZE_NEIGHBORHOODS = """
+UNWIND $names AS name
+MATCH (e:Entity {name: name})
+CALL {
+  WITH e
+  OPTIONAL MATCH (e)-[old:NEIGHBOR]->()
+  DELETE old
+}
+CALL {
+  WITH e
+  OPTIONAL MATCH (e)-[:RELATED]-(r:Relationship)-[:RELATED]-(other:Entity),
+                 (r)-[:DESCRIBED]->(d:Description)
+  WHERE d.embedding IS NOT NULL AND d.chunk_uid IS NOT NULL
+  WITH e, d, CASE WHEN d IS NULL THEN 0
+                  ELSE COUNT { (e)<-[:MENTIONED]-(:Chunk)-[:MENTIONED]->(other) } END AS support
+  ORDER BY support DESC, d.updated_at DESC
+  // one row per entity even without a Description, so that the timestamp is always set
+  WITH e, collect(DISTINCT d)[..$top_k] AS descriptions
+  FOREACH (rank IN range(0, size(descriptions) - 1) |
+    FOREACH (d IN [descriptions[rank]] |
+      CREATE (e)-[:NEIGHBOR {chunk_uid: d.chunk_uid, rank: rank}]->(d)
+    )
+  )
+  RETURN size(descriptions) AS neighbors
+}
+SET e.neighborhood_at = timestamp()
+RETURN count(e) AS entities, sum(neighbors) AS neighbors
+"""
+
+CHUNK_FILE_NAMES = """
+MATCH (doc:Document)-[:CONTAINED]->(c:Chunk)
+WHERE c.file_name IS NULL
+WITH doc, c LIMIT $batch_size
+SET c.file_name = doc.file_name
+RETURN count(c) AS chunks
+"""
+
+
+class NeighborhoodStats(BaseModel):
+    entities: int = 0
+    neighbors: int = 0
+    chunks: int = 0
+    failed_batches: int = 0
+
+
+class EntityNeighborhoods(BaseModel):
+    """Materialization of the entity neighborhoods, ``batch_size`` entities
+    per transaction.
+
+    An indexing run rewrites the entities of the relationships it wrote;
+    without names, every entity with a relationship Description newer than
+    its previous materialization is rewritten (backfill of an existing graph).
+    """
+
+    neo4j_service: Neo4jService
+    top_k: int = 8
+    batch_size: int = 500
+
+    async def stale_entities(self) -> Optional[List[str]]:
+        """Names of the entities whose neighborhood is missing or outdated.
+
+        Returns:
+            Optional[List[str]]: The entity names, None on failure.
+        """
+        rows = await self.neo4j_service.execute_read(
+            STALE_ENTITIES,
+            {},
+            output_format='records',
+            query_name='STALE_ENTITIES',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to read stale entity neighborhoods', extra={'error': rows.error})
+            return None
+        return [row['name'] for row in rows]
+
+    async def materialize(self, names: Optional[List[str]] = None) -> NeighborhoodStats:
+        """Rewrite the neighborhoods of the given entities, or backfill the
+        stale ones and the missing chunk file names.
+
+        Args:
+            names (Optional[List[str]]): The entity names, None for the stale ones.
+
+        Returns:
+            NeighborhoodStats: Counters of the run.
+        """
+        stats = NeighborhoodStats()
+        backfill = names is None
+        if backfill:
+            names = await self.stale_entities()
+            if names is None:
+                stats.failed_batches += 1
+                return stats
+
+        for start in range(0, len(names), self.batch_size):
+            batch = names[start:start + self.batch_size]
+            rows = await self.neo4j_service.execute_write(
+                MATERIALIZE_NEIGHBORHOODS,
+                {'names': batch, 'top_k': self.top_k},
+                output_format='records',
+                query_name='MATERIALIZE_NEIGHBORHOODS',
+            )
+            if not isinstance(rows, list):
+                logger.error(
+                    'Failed to materialize entity neighborhoods',
+                    extra={'entities': len(batch), 'error': rows.error},
+                )
+                stats.failed_batches += 1
+                continue
+            stats.entities += rows[0]['entities']
+            stats.neighbors += rows[0]['neighbors'] or 0
+
+        # chunks written by the indexing service carry their file name already
+        while backfill:
+            rows = await self.neo4j_service.execute_write(
+                CHUNK_FILE_NAMES,
+                {'batch_size': self.batch_size},
+                output_format='records',
+                query_name='CHUNK_FILE_NAMES',
+            )
+            if not isinstance(rows, list):
+                logger.error('Failed to backfill chunk file names', extra={'error': rows.error})
+                stats.failed_batches += 1
+                break
+            stats.chunks += rows[0]['chunks']
+            if rows[0]['chunks'] < self.batch_size:
+                break
+
+        logger.info('Entity neighborhoods materialized', extra=stats.model_dump())
+        return stats
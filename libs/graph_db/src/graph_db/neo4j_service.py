@@ -2,16 +2,33 @@
 
 from __future__ import annotations
 
+from neo4j.api import AsyncBookmarkManager
+from neo4j import AsyncDriver
 from neo4j import AsyncGraphDatabase
-from typing import Dict, List, Any, Optional, Literal
+from neo4j import AsyncManagedTransaction
+from neo4j import AsyncResult
+from neo4j import AsyncSession
+from neo4j import READ_ACCESS
+from neo4j import WRITE_ACCESS
+import time
+
+from pydantic import PrivateAttr
+from typing import Dict, List, Any, Optional, Literal, Sequence
 from base import BaseModel
 from .settings import Neo4jSetting
+from .query_log import QueryLog
+from .query_log import default_query_name
 from logger import get_logger
+from .utils import to_arrow
+from .utils import to_columns
 from .utils import to_df
+from .utils import to_numpy
+from .utils import to_records
 from pandas import DataFrame
 
 logger = get_logger(__name__)
 
+OutputFormat = Literal['records', 'columns', 'numpy', 'arrow', 'pandas']
 
 
 class Neo4jResult(BaseModel):
@@ -26,106 +43,301 @@ class Neo4jService(BaseModel):
     """Service for interacting with Neo4j database via official driver."""
     
     settings: Neo4jSetting
+    _driver: Optional[AsyncDriver] = PrivateAttr(default=None)
+    _query_log: Optional[QueryLog] = PrivateAttr(default=None)
     
     @property
-    def driver(self):
-        return AsyncGraphDatabase.driver(
-            self.settings.uri,
-            auth=(self.settings.username, self.settings.password)
-        )
+    def driver(self) -> AsyncDriver:
+        """The driver (and its connection pool), created on first use and shared."""
+        if self._driver is None:
+            self._driver = AsyncGraphDatabase.driver(
+                self.settings.uri,
+                auth=(self.settings.username, self.settings.password),
+                max_transaction_retry_time=self.settings.max_transaction_retry_time,
+            )
+        return self._driver
+    
+    @property
+    def query_log(self) -> QueryLog:
+        """Timings of the queries run by this service, slow queries and captured plans."""
+        if self._query_log is None:
+            self._query_log = QueryLog(
+                slow_query_threshold_ms=self.settings.slow_query_threshold_ms,
+                max_slow_queries=self.settings.max_slow_queries,
+            )
+        return self._query_log
     
     async def close(self):
         """Close the driver connection."""
-        if self.driver:
-            await self.driver.close()
+        driver, self._driver = self._driver, None
+        if driver:
+            await driver.close()
+    
+    @staticmethod
+    def bookmark_manager() -> AsyncBookmarkManager:
+        """
+        Create a bookmark manager for causal consistency across the queries of a request.
+        
+        Pass the same manager to every execute_read/execute_write call of the request:
+        each read then sees the writes made before it, even on another cluster member.
+        """
+        return AsyncGraphDatabase.bookmark_manager()
+    
+    def _session(
+        self,
+        access_mode: str = WRITE_ACCESS,
+        bookmark_manager: Optional[AsyncBookmarkManager] = None,
+    ) -> AsyncSession:
+        return self.driver.session(
+            database=self.settings.database,
+            default_access_mode=access_mode,
+            bookmark_manager=bookmark_manager,
+        )
+    
+    @staticmethod
+    async def _convert(
+        result: AsyncResult,
+        output_format: OutputFormat | None,
+        vector_keys: Optional[Sequence[str]],
+    ) -> Neo4jResult | DataFrame | List[Dict[str, Any]] | Dict[str, Any]:
+        if output_format == 'records':
+            return await to_records(result)
+        if output_format == 'columns':
+            return await to_columns(result)
+        if output_format == 'numpy':
+            return await to_numpy(result, vector_keys)
+        if output_format == 'arrow':
+            return await to_arrow(result, vector_keys)
+        if output_format == 'pandas':
+            return await to_df(result)
+        
+        data = await to_records(result)
+        summary = await result.consume()
+        
+        # Calculate rows affected from counters
+        counters = summary.counters
+        rows_affected = (
+            counters.nodes_created + 
+            counters.relationships_created +
+            counters.nodes_deleted +
+            counters.relationships_deleted +
+            counters.properties_set
+        )
+        return Neo4jResult(
+            success=True, 
+            data=data, 
+            rows_affected=rows_affected
+        )
+    
+    @staticmethod
+    def _row_count(output: Any) -> int:
+        if isinstance(output, Neo4jResult):
+            return len(output.data or [])
+        if isinstance(output, dict):
+            return len(next(iter(output.values()), []))
+        if hasattr(output, 'num_rows'):
+            return output.num_rows
+        return len(output)
+    
+    async def _run(
+        self,
+        runner: AsyncSession | AsyncManagedTransaction,
+        access_mode: str,
+        cypher: str,
+        parameters: Optional[Dict[str, Any]],
+        output_format: OutputFormat | None,
+        vector_keys: Optional[Sequence[str]],
+        query_name: Optional[str],
+    ) -> Neo4jResult | DataFrame | List[Dict[str, Any]] | Dict[str, Any]:
+        """Run a query, convert its result and record its timing in the query log."""
+        query_name = query_name or default_query_name(cypher)
+        profile = self.query_log.take_profile_request(query_name)
+        
+        started_at = time.perf_counter()
+        result = await runner.run(f"PROFILE {cypher}" if profile else cypher, parameters or {})
+        output = await self._convert(result, output_format, vector_keys)
+        summary = await result.consume()
+        self.query_log.record(
+            query_name, cypher, parameters, access_mode, started_at, summary, self._row_count(output)
+        )
+        return output
     
     async def execute_query(
         self, 
         cypher: str, 
         parameters: Optional[Dict[str, Any]] = None,
-        output_format: str | None = None,
-    ) -> Neo4jResult | DataFrame:
+        output_format: OutputFormat | None = None,
+        vector_keys: Optional[Sequence[str]] = None,
+        query_name: Optional[str] = None,
+    ) -> Neo4jResult | DataFrame | List[Dict[str, Any]] | Dict[str, Any]:
         """
-        Execute a single Cypher query using Neo4j driver.
+        Execute a single auto-commit Cypher query using Neo4j driver.
+        
+        Prefer execute_read/execute_write, which route to the right cluster member
+        and retry transient errors; auto-commit is needed for schema commands and
+        CALL { ... } IN TRANSACTIONS.
         
         Args:
             cypher: The Cypher query to execute
             parameters: Optional parameters for the query
+            output_format: Return the rows directly instead of a Neo4jResult:
+                'records' (list of dicts), 'columns' (dict of lists, no pandas),
+                'numpy' (columns with embeddings as float32 arrays),
+                'arrow' (pyarrow Table) or 'pandas' (DataFrame)
+            vector_keys: Embedding columns for 'numpy'/'arrow', detected if None
+            query_name: Name in the query log, the first line of the query if None
             
         Returns:
-            Neo4jResult with success status and data/error
+            Neo4jResult with success status and data/error, or the rows in output_format
         """
         try:
-            async with self.driver.session() as session:
-                result = await session.run(cypher, parameters or {})
-                
-                if output_format == 'pandas':
-                    return await to_df(result)
-                
-                # Get records and summary
-                records = await result.data()
-                summary = await result.consume()
-                
-                # Extract data in Neo4j format (list of records)
-                data = []
-                for record in records:
-                    # Convert record to dict-like format
-                    data.append(dict(record))
-                
-                # Calculate rows affected from counters
-                counters = summary.counters
-                rows_affected = (
-                    counters.nodes_created + 
-                    counters.relationships_created +
-                    counters.nodes_deleted +
-                    counters.relationships_deleted +
-                    counters.properties_set
-                )
-                
-                logger.info(f"Query executed successfully. Rows affected: {rows_affected}")
-                return Neo4jResult(
-                    success=True, 
-                    data=data, 
-                    rows_affected=rows_affected
+            async with self._session() as session:
+                output = await self._run(
+                    session, 'AUTO', cypher, parameters, output_format, vector_keys, query_name
                 )
+                if isinstance(output, Neo4jResult):
+                    logger.info(f"Query executed successfully. Rows affected: {output.rows_affected}")
+                return output
                 
         except Exception as e:
             error_msg = f"Driver error: {str(e)}"
             logger.error(f"Neo4j driver error: {error_msg}")
             return Neo4jResult(success=False, error=error_msg)
     
+    async def _execute_transaction(
+        self,
+        access_mode: str,
+        cypher: str,
+        parameters: Optional[Dict[str, Any]],
+        output_format: OutputFormat | None,
+        vector_keys: Optional[Sequence[str]],
+        bookmark_manager: Optional[AsyncBookmarkManager],
+        query_name: Optional[str],
+    ) -> Neo4jResult | DataFrame | List[Dict[str, Any]] | Dict[str, Any]:
+        async def work(tx: AsyncManagedTransaction):
+            # the result must be consumed inside the transaction function
+            return await self._run(
+                tx, access_mode, cypher, parameters, output_format, vector_keys, query_name
+            )
+        
+        try:
+            async with self._session(access_mode, bookmark_manager) as session:
+                if access_mode == READ_ACCESS:
+                    return await session.execute_read(work)
+                return await session.execute_write(work)
+                
+        except Exception as e:
+            error_msg = f"Driver error: {str(e)}"
+            logger.error(f"Neo4j driver error: {error_msg}", extra={'access_mode': access_mode})
+            return Neo4jResult(success=False, error=error_msg)
+    
+    async def execute_read(
+        self,
+        cypher: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        output_format: OutputFormat | None = None,
+        vector_keys: Optional[Sequence[str]] = None,
+        bookmark_manager: Optional[AsyncBookmarkManager] = None,
+        query_name: Optional[str] = None,
+    ) -> Neo4jResult | DataFrame | List[Dict[str, Any]] | Dict[str, Any]:
+        """
+        Execute a read-only query in a managed read transaction.
+        
+        Read transactions can be served by followers and read replicas, and
+        transient errors (leader switch, deadlock, ...) are retried by the driver
+        for up to settings.max_transaction_retry_time seconds.
+        
+        Args:
+            cypher: The Cypher query to execute
+            parameters: Optional parameters for the query
+            output_format: Same as execute_query
+            vector_keys: Embedding columns for 'numpy'/'arrow', detected if None
+            bookmark_manager: Shared by the queries of a request for causal consistency
+            query_name: Name in the query log, the first line of the query if None
+            
+        Returns:
+            Neo4jResult with success status and data/error, or the rows in output_format
+        """
+        return await self._execute_transaction(
+            READ_ACCESS, cypher, parameters, output_format, vector_keys, bookmark_manager, query_name
+        )
+    
+    async def execute_write(
+        self,
+        cypher: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        output_format: OutputFormat | None = None,
+        vector_keys: Optional[Sequence[str]] = None,
+        bookmark_manager: Optional[AsyncBookmarkManager] = None,
+        query_name: Optional[str] = None,
+    ) -> Neo4jResult | DataFrame | List[Dict[str, Any]] | Dict[str, Any]:
+        """
+        Execute a query in a managed write transaction on the leader.
+        
+        Transient errors are retried by the driver, so the query must be safe
+        to run more than once (MERGE rather than CREATE).
+        
+        Args:
+            cypher: The Cypher query to execute
+            parameters: Optional parameters for the query
+            output_format: Same as execute_query
+            vector_keys: Embedding columns for 'numpy'/'arrow', detected if None
+            bookmark_manager: Shared by the queries of a request for causal consistency
+            query_name: Name in the query log, the first line of the query if None
+            
+        Returns:
+            Neo4jResult with success status and data/error, or the rows in output_format
+        """
+        return await self._execute_transaction(
+            WRITE_ACCESS, cypher, parameters, output_format, vector_keys, bookmark_manager, query_name
+        )
+    
     async def execute_queries(
         self, 
-        queries: List[Dict[str, Any]]
+        queries: List[Dict[str, Any]],
+        bookmark_manager: Optional[AsyncBookmarkManager] = None,
     ) -> Neo4jResult:
         """
         Execute multiple Cypher queries in a single transaction using Neo4j driver.
         
         Args:
-            queries: List of query dictionaries with 'statement' and optional 'parameters'
+            queries: List of query dictionaries with 'statement', optional 'parameters'
+                and optional 'query_name' (name in the query log, the first line of
+                the statement if missing)
             
         Returns:
             Neo4jResult with success status and combined data/error
         """
         try:
-            async with self.driver.session() as session:
+            async with self._session(WRITE_ACCESS, bookmark_manager) as session:
                 async def execute_transaction(tx):
                     all_data = []
                     total_rows_affected = 0
                     
                     for query in queries:
+                        query_name = query.get("query_name") or default_query_name(query["statement"])
+                        profile = self.query_log.take_profile_request(query_name)
+                        started_at = time.perf_counter()
                         result = await tx.run(
-                            query["statement"], 
+                            f"PROFILE {query['statement']}" if profile else query["statement"],
                             query.get("parameters", {})
                         )
                         
                         # Get records and add to combined data
-                        records = await result.data()
-                        for record in records:
-                            all_data.append(dict(record))
+                        records = await to_records(result)
+                        all_data.extend(records)
                         
                         # Get summary for counters
                         summary = await result.consume()
+                        self.query_log.record(
+                            query_name,
+                            query["statement"],
+                            query.get("parameters"),
+                            WRITE_ACCESS,
+                            started_at,
+                            summary,
+                            len(records),
+                        )
                         counters = summary.counters
                         total_rows_affected += (
                             counters.nodes_created + 
@@ -160,28 +372,8 @@ class Neo4jService(BaseModel):
             True if Neo4j is healthy, False otherwise
         """
         try:
-            result = await self.execute_query("RETURN 1 as health")
+            result = await self.execute_read("RETURN 1 as health")
             return result.success and len(result.data) > 0
         except Exception as e:
             logger.error(f"Neo4j health check failed: {e}")
             return False
-    
-    async def create_indexes(self) -> Neo4jResult:
-        """
-        Create common indexes for better performance.
-        
-        Returns:
-            Neo4jResult indicating success/failure
-        """
-        index_queries = [
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:ORGANIZATION) ON (e.name)"},
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:PERSON) ON (e.name)"},
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:DOCUMENT) ON (e.name)"},
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:PROCEDURE) ON (e.name)"},
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:LOCATION) ON (e.name)"},
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:REQUIREMENT) ON (e.name)"},
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:FEE) ON (e.name)"},
-            {"statement": "CREATE INDEX entity_name_index IF NOT EXISTS FOR (e:TIMELINE) ON (e.name)"},
-        ]
-        
-        return await self.execute_queries(index_queries)
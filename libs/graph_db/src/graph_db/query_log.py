@@ -0,0 +1,184 @@
+"""In-memory log of Cypher query timings, slow queries and captured PROFILE plans."""
+
+from __future__ import annotations
+
+import heapq
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pydantic import Field, PrivateAttr
+
+from base import BaseModel
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_QUERY_NAME_LENGTH = 80
+
+
+def default_query_name(cypher: str) -> str:
+    """Name a query after its first non-empty line."""
+    first_line = next((line.strip() for line in cypher.splitlines() if line.strip()), '')
+    return first_line[:MAX_QUERY_NAME_LENGTH]
+
+
+def redact_parameters(parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Replace parameter values by their shape so that logs hold no user data or embeddings.
+
+    Numbers and booleans (``k``, thresholds, ...) are kept since they explain the plan.
+    """
+    redacted: Dict[str, Any] = {}
+    for key, value in (parameters or {}).items():
+        if value is None or isinstance(value, (bool, int, float)):
+            redacted[key] = value
+        elif isinstance(value, str):
+            redacted[key] = f'<str len={len(value)}>'
+        elif isinstance(value, (list, tuple)):
+            if value and all(isinstance(item, float) for item in value):
+                redacted[key] = f'<vector dim={len(value)}>'
+            else:
+                redacted[key] = f'<list len={len(value)}>'
+        elif isinstance(value, dict):
+            redacted[key] = f'<map keys={sorted(value)}>'
+        else:
+            redacted[key] = f'<{type(value).__name__}>'
+    return redacted
+
+
+def total_db_hits(plan: Optional[Dict[str, Any]]) -> int:
+    """Sum the db hits of a PROFILE plan and all its children."""
+    if not plan:
+        return 0
+    return plan.get('dbHits', 0) + sum(total_db_hits(child) for child in plan.get('children', []))
+
+
+class QueryExecution(BaseModel):
+    """Timing and result summary of one query execution."""
+    query_name: str
+    access_mode: str
+    duration_ms: float
+    result_available_after: Optional[int] = None
+    result_consumed_after: Optional[int] = None
+    rows: int = 0
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    db_hits: Optional[int] = None
+    plan: Optional[Dict[str, Any]] = None
+    executed_at: str
+
+
+class QueryStats(BaseModel):
+    """Aggregated timings of one query since startup."""
+    query_name: str
+    cypher: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slow_count: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class QueryLog(BaseModel):
+    """Records every query, logs the slow ones and keeps the slowest executions.
+
+    Call :meth:`request_profile` to have the next execution of a query run
+    with ``PROFILE``; its plan and db hits are then stored with the execution.
+    """
+
+    slow_query_threshold_ms: float = 500.0
+    max_slow_queries: int = 100
+    _stats: Dict[str, QueryStats] = PrivateAttr(default_factory=dict)
+    _slowest: List[tuple[float, int, QueryExecution]] = PrivateAttr(default_factory=list)
+    _profiles: Dict[str, QueryExecution] = PrivateAttr(default_factory=dict)
+    _profile_requests: set[str] = PrivateAttr(default_factory=set)
+    _sequence: int = PrivateAttr(default=0)
+
+    def request_profile(self, query_name: str) -> None:
+        """Run the next execution of ``query_name`` with PROFILE."""
+        self._profile_requests.add(query_name)
+
+    def take_profile_request(self, query_name: str) -> bool:
+        """Return whether this execution should be profiled, consuming the request."""
+        if query_name in self._profile_requests:
+            self._profile_requests.discard(query_name)
+            return True
+        return False
+
+    def record(
+        self,
+        query_name: str,
+        cypher: str,
+        parameters: Optional[Dict[str, Any]],
+        access_mode: str,
+        started_at: float,
+        summary: Any,
+        rows: int,
+    ) -> QueryExecution:
+        """Record one execution.
+
+        Args:
+            query_name: Name of the query
+            cypher: The executed Cypher
+            parameters: The raw parameters, redacted before being stored
+            access_mode: READ, WRITE or AUTO (auto-commit)
+            started_at: ``time.perf_counter()`` before the query was sent
+            summary: The neo4j ResultSummary
+            rows: Number of returned records
+
+        Returns:
+            QueryExecution: The recorded execution
+        """
+        duration_ms = (time.perf_counter() - started_at) * 1000
+        plan = getattr(summary, 'profile', None)
+        execution = QueryExecution(
+            query_name=query_name,
+            access_mode=access_mode,
+            duration_ms=round(duration_ms, 2),
+            result_available_after=getattr(summary, 'result_available_after', None),
+            result_consumed_after=getattr(summary, 'result_consumed_after', None),
+            rows=rows,
+            parameters=redact_parameters(parameters),
+            db_hits=total_db_hits(plan) if plan else None,
+            plan=plan,
+            executed_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+        stats = self._stats.setdefault(query_name, QueryStats(query_name=query_name, cypher=cypher))
+        stats.count += 1
+        stats.total_ms += duration_ms
+        stats.max_ms = max(stats.max_ms, duration_ms)
+
+        if plan:
+            self._profiles[query_name] = execution
+            logger.info(
+                'Query profiled',
+                extra={'query_name': query_name, 'db_hits': execution.db_hits, 'duration_ms': execution.duration_ms},
+            )
+
+        if duration_ms >= self.slow_query_threshold_ms:
+            stats.slow_count += 1
+            logger.warning('Slow query', extra=execution.model_dump(exclude={'plan'}))
+
+        # keep the slowest executions in a bounded min-heap
+        self._sequence += 1
+        entry = (duration_ms, self._sequence, execution)
+        if len(self._slowest) < self.max_slow_queries:
+            heapq.heappush(self._slowest, entry)
+        elif duration_ms > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+        return execution
+
+    def top_slow(self, limit: int = 20) -> List[QueryExecution]:
+        """The slowest executions since startup, slowest first."""
+        return [execution for _, _, execution in heapq.nlargest(limit, self._slowest)]
+
+    def stats(self) -> List[QueryStats]:
+        """Aggregated timings per query, by total time spent."""
+        return sorted(self._stats.values(), key=lambda stats: stats.total_ms, reverse=True)
+
+    def profiles(self) -> Dict[str, QueryExecution]:
+        """The last captured PROFILE of every profiled query."""
+        return dict(self._profiles)
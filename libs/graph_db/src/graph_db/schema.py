@@ -0,0 +1,377 @@
+"""Schema (constraints and indexes) of the knowledge graph written by the indexing service."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List, Optional
+
+from base import BaseModel
+from logger import get_logger
+
+from .neo4j_service import Neo4jService
+from .scope import course_index_name
+from .scope import course_label
+from .settings import Neo4jSchemaSetting
+
+logger = get_logger(__name__)
+
+# A property tuple is a composite constraint: a file name is unique per course.
+# Documents without a course_code are not covered and are merged by file name.
+UNIQUENESS_CONSTRAINTS = [
+    ('document_course_file_name_unique', 'Document', ('course_code', 'file_name')),
+    ('chunk_uid_unique', 'Chunk', 'uid'),
+    ('entity_name_unique', 'Entity', 'name'),
+    ('description_uid_unique', 'Description', 'uid'),
+    ('index_version_name_unique', 'IndexVersion', 'name'),
+    ('community_uid_unique', 'Community', 'uid'),
+]
+
+# Constraints replaced by the ones above, dropped on startup
+DROPPED_CONSTRAINTS = [
+    'document_file_name_unique',
+]
+
+PROPERTY_INDEXES = [
+    ('document_file_name_index', 'Document', 'file_name'),
+    ('description_chunk_uid_index', 'Description', 'chunk_uid'),
+    ('description_updated_at_index', 'Description', 'updated_at'),
+    ('entity_normalized_name_index', 'Entity', 'normalized_name'),
+]
+
+SHOW_INDEXES = """
+SHOW INDEXES
+YIELD name, state, populationPercent
+WHERE name IN $names
+RETURN name, state, populationPercent
+"""
+
+COURSE_CODES = """
+MATCH (doc:Document)
+WHERE doc.course_code IS NOT NULL
+RETURN DISTINCT doc.course_code AS course_code
+"""
+
+UNSCOPED_CHUNKS = """
+MATCH (chunk:Chunk)
+WHERE chunk.course_code IS NULL
+RETURN count(chunk) AS chunks
+"""
+
+# Chunks of the course Documents written without the course label, and their
+# Descriptions; <LABEL> is the course label
+BACKFILL_COURSE = """
+MATCH (doc:Document {course_code: $course_code})-[:CONTAINED]->(chunk:Chunk)
+WHERE NOT chunk:<LABEL>
+WITH doc, chunk LIMIT $batch_size
+SET chunk:<LABEL>,
+    chunk.course_code = doc.course_code,
+    chunk.week_number = doc.week_number
+WITH doc, chunk
+CALL {
+  WITH doc, chunk
+  MATCH (desc:Description {chunk_uid: chunk.uid})
+  SET desc:<LABEL>,
+      desc.course_code = doc.course_code,
+      desc.week_number = doc.week_number
+}
+RETURN count(chunk) AS chunks
+"""
+
+# Communities of the course written without its label
+BACKFILL_COURSE_COMMUNITIES = """
+MATCH (c:Community)
+WHERE $course_code IN c.course_codes AND NOT c:<LABEL>
+SET c:<LABEL>
+RETURN count(c) AS communities
+"""
+
+
+class IndexStatus(BaseModel):
+    """Population state of an index."""
+    name: str
+    state: str
+    population_percent: float = 0.0
+
+    @property
+    def is_online(self) -> bool:
+        return self.state == 'ONLINE'
+
+
+class Neo4jSchemaManager(BaseModel):
+    """Declares and applies the constraints and indexes of the knowledge graph.
+
+    Every statement uses ``IF NOT EXISTS`` so applying the schema is idempotent
+    and safe on every startup.
+    """
+
+    neo4j_service: Neo4jService
+    settings: Neo4jSchemaSetting
+    dimension: int
+
+    @property
+    def vector_indexes(self) -> List[tuple[str, str, str]]:
+        return [
+            (self.settings.description_index_name, 'Description', 'embedding'),
+            (self.settings.chunk_index_name, 'Chunk', 'embedding'),
+            (self.settings.community_index_name, 'Community', 'embedding'),
+        ]
+
+    @property
+    def entity_vector_index(self) -> tuple[str, str, str]:
+        """The index of the Entity name embeddings, used by entity resolution; not per course."""
+        return (self.settings.entity_index_name, 'Entity', 'name_embedding')
+
+    @property
+    def index_names(self) -> List[str]:
+        """Names of the indexes to wait for, including the ones backing the constraints."""
+        return [
+            *(name for name, _, _ in UNIQUENESS_CONSTRAINTS),
+            *(name for name, _, _ in PROPERTY_INDEXES),
+            *(name for name, _, _ in self.vector_indexes),
+            self.entity_vector_index[0],
+        ]
+
+    def course_vector_indexes(self, course_code: str) -> List[tuple[str, str, str]]:
+        """The vector indexes of one course, on its ``Course_<code>`` label."""
+        label = course_label(course_code)
+        return [
+            (course_index_name(name, course_code), label, prop)
+            for name, _, prop in self.vector_indexes
+        ]
+
+    def _vector_index_statement(self, name: str, label: str, prop: str) -> str:
+        return (
+            f"CREATE VECTOR INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop}) "
+            f"OPTIONS {{indexConfig: {{`vector.dimensions`: {self.dimension}, "
+            f"`vector.similarity_function`: '{self.settings.similarity_function}'}}}}"
+        )
+
+    @staticmethod
+    def _properties(prop: str | tuple[str, ...]) -> str:
+        if isinstance(prop, tuple):
+            return '(' + ', '.join(f'n.{name}' for name in prop) + ')'
+        return f'n.{prop}'
+
+    def statements(self) -> List[str]:
+        """Build the schema statements.
+
+        Returns:
+            List[str]: One Cypher schema statement per constraint or index.
+        """
+        statements = [f"DROP CONSTRAINT {name} IF EXISTS" for name in DROPPED_CONSTRAINTS]
+        statements += [
+            f"CREATE CONSTRAINT {name} IF NOT EXISTS FOR (n:{label}) REQUIRE {self._properties(prop)} IS UNIQUE"
+            for name, label, prop in UNIQUENESS_CONSTRAINTS
+        ]
+        statements += [
+            f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{prop})"
+            for name, label, prop in PROPERTY_INDEXES
+        ]
+        statements += [
+            self._vector_index_statement(name, label, prop)
+            for name, label, prop in self.vector_indexes
+        ]
+        statements.append(self._vector_index_statement(*self.entity_vector_index))
+        return statements
+
+    async def apply(self, statements: Optional[List[str]] = None) -> bool:
+        """Create the missing constraints and indexes.
+
+        Statements run one by one so that a constraint that cannot be created
+        (e.g. duplicated values in an existing graph) does not prevent the others.
+
+        Args:
+            statements (Optional[List[str]]): Statements to run, ``statements()`` if None.
+
+        Returns:
+            bool: True if every statement succeeded.
+        """
+        success = True
+        for statement in statements if statements is not None else self.statements():
+            result = await self.neo4j_service.execute_query(statement)
+            if not result.success:
+                success = False
+                logger.error(
+                    'Failed to apply schema statement',
+                    extra={'statement': statement, 'error': result.error},
+                )
+        return success
+
+    async def index_statuses(self, names: Optional[List[str]] = None) -> List[IndexStatus]:
+        """Read the population state of the schema indexes.
+
+        Args:
+            names (Optional[List[str]]): Indexes to read, ``index_names`` if None.
+
+        Returns:
+            List[IndexStatus]: The state of every existing schema index.
+        """
+        names = names if names is not None else self.index_names
+        result = await self.neo4j_service.execute_read(SHOW_INDEXES, {'names': names})
+        if not result.success:
+            logger.error('Failed to read index states', extra={'error': result.error})
+            return []
+        return [
+            IndexStatus(
+                name=record['name'],
+                state=record['state'],
+                population_percent=record['populationPercent'] or 0.0,
+            )
+            for record in result.data
+        ]
+
+    async def wait_until_online(self, timeout: Optional[float] = None, names: Optional[List[str]] = None) -> bool:
+        """Wait until every schema index is ONLINE, logging the population progress.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, ``settings.online_timeout`` if None.
+            names (Optional[List[str]]): Indexes to wait for, ``index_names`` if None.
+
+        Returns:
+            bool: True if every index is ONLINE, False on timeout or failed index.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout if timeout is not None else self.settings.online_timeout)
+        names = names if names is not None else self.index_names
+
+        while True:
+            statuses = await self.index_statuses(names)
+            pending = [status for status in statuses if not status.is_online]
+            missing = set(names) - {status.name for status in statuses}
+
+            failed = [status.name for status in pending if status.state == 'FAILED']
+            if failed:
+                logger.error('Schema indexes failed to populate', extra={'indexes': failed})
+                return False
+            if not pending:
+                if missing:
+                    # indexes that could not be created by apply() never show up
+                    logger.warning('Schema indexes missing', extra={'indexes': sorted(missing)})
+                    return False
+                logger.info('Schema indexes online', extra={'indexes': names})
+                return True
+
+            if loop.time() >= deadline:
+                logger.warning(
+                    'Schema indexes not online before timeout',
+                    extra={
+                        'pending': {status.name: status.state for status in pending},
+                    },
+                )
+                return False
+
+            logger.info(
+                'Waiting for schema indexes to populate',
+                extra={
+                    'progress': {
+                        status.name: f'{status.population_percent:.1f}%' for status in pending
+                    },
+                },
+            )
+            await asyncio.sleep(self.settings.poll_interval)
+
+    async def ensure(self) -> bool:
+        """Apply the schema and wait until its indexes are ONLINE.
+
+        Returns:
+            bool: True if the schema is fully applied and online.
+        """
+        applied = await self.apply()
+        online = await self.wait_until_online()
+        return applied and online
+
+    async def ensure_course(self, course_code: str) -> bool:
+        """Create the vector indexes of a course and wait until they are ONLINE.
+
+        Args:
+            course_code (str): The course code.
+
+        Returns:
+            bool: True if the course indexes are applied and online.
+        """
+        indexes = self.course_vector_indexes(course_code)
+        applied = await self.apply([self._vector_index_statement(*index) for index in indexes])
+        online = await self.wait_until_online(names=[name for name, _, _ in indexes])
+        return applied and online
+
+    async def backfill_course(self, course_code: str, batch_size: int = 1000) -> int:
+        """Label the Chunks, Descriptions and Communities of a course written without its label.
+
+        Only Documents stamped with ``course_code`` are covered; graphs indexed
+        before Documents carried their course have to be re-indexed.
+
+        Args:
+            course_code (str): The course code.
+            batch_size (int): Chunks labelled per write transaction.
+
+        Returns:
+            int: The number of labelled Chunks, -1 on failure.
+        """
+        cypher = BACKFILL_COURSE.replace('<LABEL>', course_label(course_code))
+        labelled = 0
+        while True:
+            rows = await self.neo4j_service.execute_write(
+                cypher,
+                {'course_code': course_code, 'batch_size': batch_size},
+                output_format='records',
+                query_name='BACKFILL_COURSE',
+            )
+            if not isinstance(rows, list):
+                logger.error('Course backfill failed', extra={'course_code': course_code, 'error': rows.error})
+                return -1
+            labelled += rows[0]['chunks']
+            if rows[0]['chunks'] < batch_size:
+                break
+
+        rows = await self.neo4j_service.execute_write(
+            BACKFILL_COURSE_COMMUNITIES.replace('<LABEL>', course_label(course_code)),
+            {'course_code': course_code},
+            output_format='records',
+            query_name='BACKFILL_COURSE_COMMUNITIES',
+        )
+        if not isinstance(rows, list):
+            logger.error('Course community backfill failed', extra={'course_code': course_code, 'error': rows.error})
+            return -1
+        if labelled or rows[0]['communities']:
+            logger.info(
+                'Course backfilled',
+                extra={'course_code': course_code, 'chunks': labelled, 'communities': rows[0]['communities']},
+            )
+        return labelled
+
+    async def ensure_courses(self) -> bool:
+        """Create the indexes of every indexed course and backfill its labels.
+
+        Returns:
+            bool: True if every course is indexed and backfilled.
+        """
+        rows = await self.neo4j_service.execute_read(
+            COURSE_CODES,
+            {},
+            output_format='records',
+            query_name='COURSE_CODES',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to read the indexed courses', extra={'error': rows.error})
+            return False
+
+        succeeded = True
+        for row in rows:
+            if not await self.ensure_course(row['course_code']):
+                succeeded = False
+                continue
+            if await self.backfill_course(row['course_code']) < 0:
+                succeeded = False
+
+        unscoped = await self.neo4j_service.execute_read(
+            UNSCOPED_CHUNKS,
+            {},
+            output_format='records',
+            query_name='UNSCOPED_CHUNKS',
+        )
+        if isinstance(unscoped, list) and unscoped[0]['chunks']:
+            logger.warning(
+                'Chunks without a course are only found by unscoped searches; re-index their documents',
+                extra={'chunks': unscoped[0]['chunks']},
+            )
+        return succeeded
@@ -0,0 +1,31 @@
+"""Course partitioning of the knowledge graph.
+
+Chunks and Descriptions of a course carry a ``Course_<code>`` label and
+``course_code`` / ``week_number`` properties; every course has its own
+vector indexes on that label, so a scoped search only scans its course.
+Chunks written before the label existed are backfilled from their Document
+(``Neo4jSchemaManager.ensure_courses``); Documents without a ``course_code``
+have to be re-indexed to be found by scoped searches.
+"""
+
+from __future__ import annotations
+
+import re
+
+
+def course_slug(course_code: str) -> str:
+    """Identifier-safe form of a course code (letters, digits and underscores)."""
+    slug = re.sub(r'[^0-9A-Za-z]+', '_', course_code.strip()).strip('_').upper()
+    if not slug:
+        raise ValueError(f'Invalid course code: {course_code!r}')
+    return slug
+
+
+def course_label(course_code: str) -> str:
+    """Label of the Chunk and Description nodes of a course."""
+    return f'Course_{course_slug(course_code)}'
+
+
+def course_index_name(index_name: str, course_code: str) -> str:
+    """Name of the per-course copy of a vector index."""
+    return f'{index_name}_{course_slug(course_code).lower()}'
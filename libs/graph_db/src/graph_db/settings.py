@@ -1,6 +1,21 @@
+from typing import Optional
+
 from base import BaseModel
 
 class Neo4jSetting(BaseModel):
     uri: str
     username: str
-    password: str
\ No newline at end of file
+    password: str
+    database: Optional[str] = None
+    max_transaction_retry_time: float = 30.0
+    slow_query_threshold_ms: float = 500.0
+    max_slow_queries: int = 100
+
+class Neo4jSchemaSetting(BaseModel):
+    description_index_name: str = 'description_index'
+    chunk_index_name: str = 'chunk_index'
+    community_index_name: str = 'community_index'
+    entity_index_name: str = 'entity_name_index'
+    similarity_function: str = 'cosine'
+    online_timeout: float = 300.0
+    poll_interval: float = 2.0
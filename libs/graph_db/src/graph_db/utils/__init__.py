@@ -1 +1,5 @@
-from .utils import to_df
\ No newline at end of file
+from .utils import to_arrow
+from .utils import to_columns
+from .utils import to_df
+from .utils import to_numpy
+from .utils import to_records
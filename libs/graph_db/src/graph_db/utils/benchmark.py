@@ -0,0 +1,126 @@
+"""Compare the result conversion modes on in-memory results shaped like the RAG queries.
+
+Usage:
+    python -m graph_db.utils.benchmark [iterations]
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+from neo4j import Record
+
+from .utils import to_columns
+from .utils import to_df
+from .utils import to_numpy
+from .utils import to_records
+
+
+class _StaticResult:
+    """Minimal stand-in for ``neo4j.AsyncResult`` replaying fixed records."""
+
+    def __init__(self, keys: List[str], rows: List[List[Any]]):
+        self._keys = tuple(keys)
+        self._records = [Record(zip(keys, row)) for row in rows]
+
+    def keys(self):
+        return self._keys
+
+    async def data(self):
+        return [record.data() for record in self._records]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+
+async def _legacy_to_df(result) -> pd.DataFrame:
+    # to_df before the columnar conversion, kept as the baseline
+    keys = result.keys()
+    df = defaultdict(list)
+    async for record in result:
+        for k in keys:
+            data = record.data()
+            df[k].append(data[k])
+    return pd.DataFrame(df)
+
+
+def _text(length: int) -> str:
+    return ''.join(random.choices('abcdefghij klmnopqrstuvwxyz', k=length))
+
+
+def _embedding(dimension: int = 1536) -> List[float]:
+    return [random.random() for _ in range(dimension)]
+
+
+RESULT_SHAPES: Dict[str, Callable[[], tuple[List[str], List[List[Any]]]]] = {
+    'entity_search (5 rows)': lambda: (
+        ['name', 'type', 'description_id', 'description', 'chunk_id', 'score'],
+        [[_text(20), 'concept', _text(36), _text(200), _text(36), random.random()] for _ in range(5)],
+    ),
+    'chunk_mapping (5 rows)': lambda: (
+        ['chunk_id', 'text', 'similarity_score'],
+        [[_text(36), _text(4000), random.random()] for _ in range(5)],
+    ),
+    'context_mapping (10 rows)': lambda: (
+        ['entity_name', 'chunk', 'entity_description', 'relationship_descriptions', 'file_name', 'similarity_score'],
+        [
+            [_text(20), _text(4000), _text(200), [_text(150) for _ in range(5)], _text(30), random.random()]
+            for _ in range(10)
+        ],
+    ),
+    'embeddings (500 rows)': lambda: (
+        ['uid', 'embedding'],
+        [[_text(36), _embedding()] for _ in range(500)],
+    ),
+}
+
+MODES = {
+    'legacy_pandas': _legacy_to_df,
+    'pandas': to_df,
+    'records': to_records,
+    'columns': to_columns,
+    'numpy': to_numpy,
+}
+
+
+async def benchmark(iterations: int = 20) -> dict[str, dict[str, float]]:
+    """Time every conversion mode on every result shape.
+
+    Args:
+        iterations (int): Conversions per mode and shape.
+
+    Returns:
+        dict[str, dict[str, float]]: Median microseconds per conversion, per shape and mode.
+    """
+    timings: dict[str, dict[str, float]] = {}
+    for shape_name, build in RESULT_SHAPES.items():
+        keys, rows = build()
+        result = _StaticResult(keys, rows)
+        timings[shape_name] = {}
+        for mode_name, convert in MODES.items():
+            samples = []
+            for _ in range(iterations):
+                start_time = time.perf_counter()
+                await convert(result)
+                samples.append((time.perf_counter() - start_time) * 1e6)
+            timings[shape_name][mode_name] = statistics.median(samples)
+    return timings
+
+
+if __name__ == '__main__':
+    number_of_iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    results = asyncio.run(benchmark(number_of_iterations))
+    for shape, modes in results.items():
+        print(shape)
+        for mode, microseconds in modes.items():
+            print(f'  {mode:>14}: {microseconds:10.1f} us')
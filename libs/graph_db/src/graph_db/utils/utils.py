@@ -1,8 +1,99 @@
-from collections import defaultdict
+from __future__ import annotations
 
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
 import pandas as pd
 from neo4j import AsyncResult
 
+
+async def to_records(result: AsyncResult) -> List[Dict[str, Any]]:
+    """Convert Cypher query result to a list of plain dicts
+
+    Args:
+        result (AsyncResult): Cypher Result Stream Buffer
+
+    Returns:
+        List[Dict[str, Any]]: One dict per record
+    """
+    keys = result.keys()
+    return [dict(zip(keys, record.values())) async for record in result]
+
+
+async def to_columns(result: AsyncResult) -> Dict[str, List[Any]]:
+    """Convert Cypher query result to columns, reading every record once
+
+    Args:
+        result (AsyncResult): Cypher Result Stream Buffer
+
+    Returns:
+        Dict[str, List[Any]]: Column name to column values
+    """
+    keys = result.keys()
+    rows = [record.values() async for record in result]
+    if not rows:
+        return {key: [] for key in keys}
+    return {key: list(values) for key, values in zip(keys, zip(*rows))}
+
+
+def _is_vector_column(values: List[Any]) -> bool:
+    if not values or not all(isinstance(value, list) and value for value in values):
+        return False
+    dimension = len(values[0])
+    return all(len(value) == dimension for value in values) and isinstance(values[0][0], float)
+
+
+async def to_numpy(
+    result: AsyncResult,
+    vector_keys: Optional[Sequence[str]] = None,
+) -> Dict[str, List[Any] | np.ndarray]:
+    """Convert Cypher query result to columns with embeddings as contiguous float32 arrays
+
+    Args:
+        result (AsyncResult): Cypher Result Stream Buffer
+        vector_keys (Optional[Sequence[str]]): Columns holding embeddings, detected
+            from the values (equal-length lists of floats) if None
+
+    Returns:
+        Dict[str, List[Any] | np.ndarray]: Column name to column values, embedding
+            columns as ``(rows, dimension)`` float32 arrays
+    """
+    columns = await to_columns(result)
+    if vector_keys is None:
+        vector_keys = [key for key, values in columns.items() if _is_vector_column(values)]
+    for key in vector_keys:
+        columns[key] = np.asarray(columns[key], dtype=np.float32)
+    return columns
+
+
+async def to_arrow(result: AsyncResult, vector_keys: Optional[Sequence[str]] = None):
+    """Convert Cypher query result to a pyarrow Table
+
+    Embedding columns become fixed-size lists of float32 backed by one
+    contiguous buffer. Requires the optional ``pyarrow`` dependency.
+
+    Args:
+        result (AsyncResult): Cypher Result Stream Buffer
+        vector_keys (Optional[Sequence[str]]): Columns holding embeddings, detected if None
+
+    Returns:
+        pyarrow.Table: The result table
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("output_format='arrow' requires pyarrow, install graph-db[arrow]") from e
+
+    columns = await to_numpy(result, vector_keys)
+    arrays = {}
+    for key, values in columns.items():
+        if isinstance(values, np.ndarray) and values.ndim == 2:
+            arrays[key] = pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), values.shape[1])
+        else:
+            arrays[key] = pa.array(values)
+    return pa.table(arrays)
+
+
 async def to_df(result: AsyncResult) -> pd.DataFrame:
     """Convert Cypher query result to pandas.DataFrame
 
@@ -12,10 +103,5 @@ async def to_df(result: AsyncResult) -> pd.DataFrame:
     Returns:
         pd.DataFrame: pandas.DataFrame
     """
-    keys = result.keys()
-    df = defaultdict(list)
-    async for record in result:
-        for k in keys:
-            data = record.data()
-            df[k].append(data[k])
-    return pd.DataFrame(df)
\ No newline at end of file
+    columns = await to_columns(result)
+    return pd.DataFrame(columns, columns=list(columns))
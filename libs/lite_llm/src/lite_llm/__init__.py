@@ -1,6 +1,7 @@
 from .services import LiteLLMService 
 from .models import LiteLLMInput
 from .models import LiteLLMEmbeddingInput
+from .models import LiteLLMBatchEmbeddingInput
 from .settings import LiteLLMSetting
 from .models import Role
 from .models import CompletionMessage
@@ -9,6 +10,7 @@ __all__ = [
     "LiteLLMService",
     "LiteLLMInput",
     "LiteLLMEmbeddingInput",
+    "LiteLLMBatchEmbeddingInput",
     "LiteLLMSetting",
     "Role",
     "CompletionMessage",
@@ -40,3 +40,9 @@ class LiteLLMEmbeddingInput(BaseModel):
 class LiteLLMEmbeddingOutput(BaseModel):
     embedding: list[float]
     
+
+class LiteLLMBatchEmbeddingInput(BaseModel):
+    texts: list[str]
+
+class LiteLLMBatchEmbeddingOutput(BaseModel):
+    embeddings: list[list[float]]
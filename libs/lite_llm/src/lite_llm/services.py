@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from typing import Any 
+from typing import AsyncIterator
 from typing import Optional
+import json
 import httpx
 from base import BaseService 
 from base import BaseModel
@@ -14,6 +16,8 @@ from .models import LiteLLMOutput
 from .models import Messages
 from .models import LiteLLMEmbeddingInput
 from .models import LiteLLMEmbeddingOutput
+from .models import LiteLLMBatchEmbeddingInput
+from .models import LiteLLMBatchEmbeddingOutput
 
 
 logger = get_logger(__name__)
@@ -157,6 +161,66 @@ class LiteLLMService(BaseService):
             return LiteLLMEmbeddingOutput(
                 embedding=[],
             )
+
+    async def batch_embedding_llm_async(
+        self,
+        inputs: LiteLLMBatchEmbeddingInput,
+    ) -> LiteLLMBatchEmbeddingOutput:
+        """Asynchronously embed several texts with a single request.
+
+        Args:
+            inputs (LiteLLMBatchEmbeddingInput): The texts to embed.
+
+        Returns:
+            LiteLLMBatchEmbeddingOutput: One embedding per text, in input order (empty on failure).
+        """
+        if not inputs.texts:
+            return LiteLLMBatchEmbeddingOutput(
+                embeddings=[],
+            )
+
+        payload = {
+            "model": self.litellm_setting.embedding_model,
+            "input": inputs.texts,
+            "output_dimensionality": self.litellm_setting.dimension,
+        }
+
+        try:
+            response = await self._async_client.post(
+                url=str(self.litellm_setting.url) + "v1/embeddings",
+                headers=self.headers,
+                json=payload,
+            )
+
+            if response.status_code == 200:
+                data = sorted(response.json()['data'], key=lambda item: item['index'])
+                return LiteLLMBatchEmbeddingOutput(
+                    embeddings=[item['embedding'] for item in data],
+                )
+            else:
+                logger.error(
+                    "Request failed with status code",
+                    extra={
+                        "status_code": response.status_code,
+                        "model": self.litellm_setting.embedding_model,
+                        "inputs": inputs.texts,
+                    }
+                )
+                return LiteLLMBatchEmbeddingOutput(
+                    embeddings=[],
+                )
+        except httpx.RequestError as e:
+            logger.exception(
+                "An error occurred while processing the request",
+                extra={
+                    "error": str(e),
+                    "inputs": inputs.texts,
+                    "model": self.litellm_setting.embedding_model,
+                }
+            )
+            return LiteLLMBatchEmbeddingOutput(
+                embeddings=[],
+            )
     
     def _inference_llm(
         self, 
@@ -350,6 +414,76 @@ class LiteLLMService(BaseService):
             reasoning_effort=inputs.reasoning_effort if inputs.reasoning_effort else None,
         )
         
+    async def stream_async(
+        self,
+        inputs: LiteLLMInput
+    ) -> AsyncIterator[str]:
+        """Stream the completion of the input as text deltas.
+
+        Args:
+            inputs (LiteLLMInput): The input to process. ``response_format`` is not
+                supported when streaming.
+
+        Yields:
+            str: The content deltas, in order.
+
+        Raises:
+            httpx.HTTPStatusError: If the completion request is rejected.
+            httpx.RequestError: If the request fails or the stream ends before ``[DONE]``.
+        """
+        if inputs.response_format:
+            raise ValueError("response_format is not supported when streaming")
+
+        model = inputs.model if inputs.model else self.litellm_setting.model
+        payload = self._build_payload(
+            messages=inputs.messages,
+            model=model,
+            response_format=None,
+            temperature=inputs.temperature if inputs.temperature else self.litellm_setting.temperature,
+            top_p=inputs.top_p if inputs.top_p else self.litellm_setting.top_p,
+            n=inputs.n if inputs.n else self.litellm_setting.n,
+            frequency_penalty=inputs.frequency_penalty if inputs.frequency_penalty else self.litellm_setting.frequency_penalty,
+            max_completion_tokens=inputs.max_completion_tokens if inputs.max_completion_tokens else self.litellm_setting.max_completion_tokens,
+            reasoning_effort=inputs.reasoning_effort if inputs.reasoning_effort else None,
+        )
+        payload["stream"] = True
+
+        try:
+            async with self._async_client.stream(
+                "POST",
+                url=str(self.litellm_setting.url) + "v1/chat/completions",
+                headers=self.headers,
+                json=payload,
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    logger.error(f"Request failed with status code {response.status_code}: {response.text}")
+                    response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        return
+                    choices = json.loads(data).get("choices") or []
+                    if choices and choices[0].get("delta", {}).get("content"):
+                        yield choices[0]["delta"]["content"]
+                # the connection closed before the end of the completion
+                raise httpx.RemoteProtocolError(
+                    "Stream ended before [DONE]",
+                    request=response.request,
+                )
+        except httpx.RequestError as e:
+            logger.exception(
+                "An error occurred while streaming the request",
+                extra={
+                    "error": str(e),
+                    "model": model,
+                }
+            )
+            raise
+
     def process_embedding(
         self,
         inputs: LiteLLMEmbeddingInput
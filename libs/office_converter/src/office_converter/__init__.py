@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from .service import OfficeConverterService
+from .settings import OfficeConverterSetting
+from .worker import OfficeConversionError
+from .worker import OfficeConversionTimeoutError
+from .worker import OfficeWorkerCrashedError
+
+__all__ = [
+    'OfficeConverterService',
+    'OfficeConverterSetting',
+    'OfficeConversionError',
+    'OfficeConversionTimeoutError',
+    'OfficeWorkerCrashedError',
+]
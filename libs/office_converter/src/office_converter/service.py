@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+from pydantic import PrivateAttr
+
+from base import BaseModel
+from logger import get_logger
+
+from .settings import OfficeConverterSetting
+from .worker import OfficeWorker
+from .worker import OfficeWorkerCrashedError
+from .worker import process_profile_root
+
+logger = get_logger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _file_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _copy_atomic(source_path: str, target_path: str) -> None:
+    # a unique temp file per call: same-content conversions may copy concurrently
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(target_path)),
+        prefix=f'{os.path.basename(target_path)}.',
+        suffix='.tmp',
+        delete=False,
+    ) as tmp_file:
+        tmp_path = tmp_file.name
+    try:
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, target_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class OfficeConverterService(BaseModel):
+    """Converts office documents to PDF on a pool of warm LibreOffice workers.
+
+    Conversions are queued on the first idle worker, so at most
+    ``settings.num_workers`` documents are converted at once and the event loop
+    is never blocked. Converted PDFs are cached by the SHA-256 of the input.
+    """
+
+    settings: OfficeConverterSetting
+    _workers: list[OfficeWorker] = PrivateAttr(default_factory=list)
+    _idle_workers: Optional[asyncio.Queue] = PrivateAttr(default=None)
+    _start_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+
+    async def start(self) -> None:
+        """Start the worker pool.
+
+        Falls back to one-shot conversions on per-worker profiles when the
+        LibreOffice ``uno`` bindings are not available to ``settings.uno_python``.
+        """
+        async with self._start_lock:
+            if self._idle_workers is not None:
+                return
+
+            use_listener = await self._has_uno()
+            if not use_listener:
+                logger.warning(
+                    'LibreOffice uno bindings not found, converting with one-shot soffice processes',
+                    extra={'uno_python': self.settings.uno_python},
+                )
+
+            self._workers = [
+                OfficeWorker(
+                    worker_index=index,
+                    settings=self.settings,
+                    use_listener=use_listener,
+                )
+                for index in range(self.settings.num_workers)
+            ]
+            results = await asyncio.gather(
+                *[worker.start() for worker in self._workers],
+                return_exceptions=True,
+            )
+            for worker, result in zip(self._workers, results):
+                if isinstance(result, Exception):
+                    # the worker is started again on its first conversion
+                    logger.error(
+                        'Office worker failed to start',
+                        extra={'worker_index': worker.worker_index, 'error': str(result)},
+                    )
+
+            self._idle_workers = asyncio.Queue()
+            for worker in self._workers:
+                self._idle_workers.put_nowait(worker)
+
+    async def stop(self) -> None:
+        """Stop every worker of the pool and remove the profiles of this process."""
+        await asyncio.gather(*[worker.stop() for worker in self._workers], return_exceptions=True)
+        self._workers = []
+        self._idle_workers = None
+        await asyncio.to_thread(
+            shutil.rmtree, process_profile_root(self.settings.profile_root), ignore_errors=True,
+        )
+
+    async def convert_to_pdf(self, input_path: str, output_dir: Optional[str] = None) -> str:
+        """Convert a document to PDF.
+
+        Args:
+            input_path (str): Path to the .pptx/.docx/... file.
+            output_dir (Optional[str]): Directory to save the .pdf file.
+                If None, saves to the same directory as the input file.
+
+        Returns:
+            str: Path to the output PDF file.
+
+        Raises:
+            FileNotFoundError: If the input file does not exist.
+            OfficeConversionError: If the document could not be converted.
+        """
+        if not os.path.isfile(input_path):
+            raise FileNotFoundError(f"File not found: {input_path}")
+
+        await self.start()
+
+        output_dir = output_dir or os.path.dirname(input_path) or '.'
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(self.settings.cache_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(input_path))[0] + '.pdf')
+
+        content_hash = await asyncio.to_thread(_file_hash, input_path)
+        cache_path = os.path.join(self.settings.cache_dir, f'{content_hash}.pdf')
+        if os.path.exists(cache_path):
+            await asyncio.to_thread(_copy_atomic, cache_path, output_path)
+            logger.info(
+                'Converted PDF found in cache',
+                extra={'input_path': input_path, 'content_hash': content_hash},
+            )
+            return output_path
+
+        worker: OfficeWorker = await self._idle_workers.get()
+        try:
+            for attempt in range(self.settings.max_retries + 1):
+                try:
+                    await worker.convert(input_path, output_path)
+                    break
+                except OfficeWorkerCrashedError as e:
+                    if attempt == self.settings.max_retries:
+                        raise
+                    logger.warning(
+                        'Office worker crashed, retrying conversion',
+                        extra={
+                            'worker_index': worker.worker_index,
+                            'input_path': input_path,
+                            'error': str(e),
+                        },
+                    )
+        finally:
+            self._idle_workers.put_nowait(worker)
+
+        await asyncio.to_thread(_copy_atomic, output_path, cache_path)
+        logger.info(
+            'Converted document to PDF',
+            extra={
+                'input_path': input_path,
+                'output_path': output_path,
+                'worker_index': worker.worker_index,
+            },
+        )
+        return output_path
+
+    async def _has_uno(self) -> bool:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.settings.uno_python,
+                '-c',
+                'import uno',
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+        return await process.wait() == 0
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from base import BaseModel
+
+
+class OfficeConverterSetting(BaseModel):
+    soffice_binary: str = 'soffice'
+    uno_python: str = '/usr/bin/python3'
+    num_workers: int = 2
+    # 0 picks a free port per worker start; a fixed base is only safe for a single process per host
+    base_port: int = 0
+    profile_root: str = 'app/office/profiles'
+    cache_dir: str = 'app/office/cache'
+    startup_timeout: float = 30.0
+    conversion_timeout: float = 120.0
+    max_conversions_per_worker: int = 200
+    max_retries: int = 1
@@ -0,0 +1,95 @@
+"""Convert one document to PDF through a running soffice listener.
+
+Executed with the Python interpreter that ships the LibreOffice ``uno``
+bindings, which is usually not the interpreter of the calling service:
+
+    python3 uno_convert.py <port> <input_path> <output_path>
+
+Exit codes:
+    0: converted.
+    1: the document could not be loaded or exported.
+    2: the soffice listener could not be reached.
+"""
+import os
+import sys
+import time
+
+import uno  # type:ignore
+from com.sun.star.beans import PropertyValue  # type:ignore
+from com.sun.star.connection import NoConnectException  # type:ignore
+
+EXIT_CONVERSION_FAILED = 1
+EXIT_CONNECTION_FAILED = 2
+
+PDF_EXPORT_FILTERS = (
+    ('com.sun.star.presentation.PresentationDocument', 'impress_pdf_Export'),
+    ('com.sun.star.text.TextDocument', 'writer_pdf_Export'),
+    ('com.sun.star.sheet.SpreadsheetDocument', 'calc_pdf_Export'),
+    ('com.sun.star.drawing.DrawingDocument', 'draw_pdf_Export'),
+)
+
+
+def _property(name, value):
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _connect(port, attempts=5):
+    local_context = uno.getComponentContext()
+    resolver = local_context.ServiceManager.createInstanceWithContext(
+        'com.sun.star.bridge.UnoUrlResolver', local_context
+    )
+    for attempt in range(attempts):
+        try:
+            return resolver.resolve(
+                f'uno:socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext'
+            )
+        except NoConnectException:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(0.5)
+
+
+def main():
+    port, input_path, output_path = int(sys.argv[1]), sys.argv[2], sys.argv[3]
+
+    try:
+        context = _connect(port)
+    except Exception as e:
+        print(f'Could not connect to soffice on port {port}: {e}', file=sys.stderr)
+        return EXIT_CONNECTION_FAILED
+
+    desktop = context.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', context)
+    document = None
+    try:
+        document = desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(os.path.abspath(input_path)),
+            '_blank',
+            0,
+            (_property('Hidden', True), _property('ReadOnly', True)),
+        )
+        if document is None:
+            print(f'Could not load {input_path}', file=sys.stderr)
+            return EXIT_CONVERSION_FAILED
+
+        filter_name = next(
+            (name for service, name in PDF_EXPORT_FILTERS if document.supportsService(service)),
+            'writer_pdf_Export',
+        )
+        document.storeToURL(
+            uno.systemPathToFileUrl(os.path.abspath(output_path)),
+            (_property('FilterName', filter_name),),
+        )
+        return 0
+    except Exception as e:
+        print(f'Could not convert {input_path}: {e}', file=sys.stderr)
+        return EXIT_CONVERSION_FAILED
+    finally:
+        if document is not None:
+            document.close(True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import signal
+import socket
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from pydantic import PrivateAttr
+
+from base import BaseModel
+from logger import get_logger
+
+from .settings import OfficeConverterSetting
+
+logger = get_logger(__name__)
+
+UNO_CONVERT_SCRIPT = str(Path(__file__).with_name('uno_convert.py'))
+EXIT_CONNECTION_FAILED = 2
+
+
+class OfficeConversionError(Exception):
+    """Raised when a document could not be converted to PDF."""
+
+
+class OfficeConversionTimeoutError(OfficeConversionError):
+    """Raised when a conversion did not finish within ``conversion_timeout``."""
+
+
+class OfficeWorkerCrashedError(OfficeConversionError):
+    """Raised when the soffice process of a worker died or became unreachable."""
+
+
+def process_profile_root(profile_root: str) -> str:
+    """Profile directory of the workers of the current process."""
+    return os.path.abspath(os.path.join(profile_root, str(os.getpid())))
+
+
+def _free_port() -> int:
+    """A TCP port that is free on the loopback interface right now."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _kill_process_group(process: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        os.killpg(process.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+class OfficeWorker(BaseModel):
+    """One long-lived headless soffice process with its own user profile.
+
+    LibreOffice locks its user profile, so every worker gets a dedicated
+    ``-env:UserInstallation`` directory and workers can convert in parallel.
+    Profiles live under ``<profile_root>/<pid>`` and, unless ``base_port`` is
+    set, the listener binds a free port picked at every start, so that
+    several services or uvicorn workers on one host never share either.
+    With ``use_listener`` the soffice process stays warm and documents are
+    converted through UNO by ``uno_convert.py``. Without it (no ``uno`` bindings
+    available) every conversion starts a one-shot soffice on the worker profile.
+    """
+
+    worker_index: int
+    settings: OfficeConverterSetting
+    use_listener: bool = True
+    _process: Optional[asyncio.subprocess.Process] = PrivateAttr(default=None)
+    _conversions: int = PrivateAttr(default=0)
+    _port: int = PrivateAttr(default=0)
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def profile_dir(self) -> str:
+        return os.path.join(process_profile_root(self.settings.profile_root), f'worker-{self.worker_index}')
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        """Start the soffice listener and wait until it accepts connections.
+
+        Raises:
+            OfficeConversionError: If soffice exits or does not listen within ``startup_timeout``.
+        """
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self._conversions = 0
+        if not self.use_listener:
+            return
+
+        if self.settings.base_port:
+            self._port = self.settings.base_port + self.worker_index
+        else:
+            # another process may take the port before soffice binds it: the
+            # startup then fails and the next start picks a new port
+            self._port = _free_port()
+        self._process = await asyncio.create_subprocess_exec(
+            self.settings.soffice_binary,
+            '--headless',
+            '--invisible',
+            '--nologo',
+            '--nodefault',
+            '--norestore',
+            '--nolockcheck',
+            f'-env:UserInstallation={Path(self.profile_dir).as_uri()}',
+            f'--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        await self._wait_until_listening()
+        logger.info(
+            'Office worker started',
+            extra={
+                'worker_index': self.worker_index,
+                'port': self.port,
+                'pid': self._process.pid,
+            },
+        )
+
+    async def stop(self) -> None:
+        """Terminate the soffice process of the worker, killing it if it does not exit."""
+        process, self._process = self._process, None
+        if process is None or process.returncode is not None:
+            return
+
+        _kill_process_group(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            _kill_process_group(process, signal.SIGKILL)
+            await process.wait()
+
+    async def restart(self) -> None:
+        await self.stop()
+        await self.start()
+
+    async def convert(self, input_path: str, output_path: str) -> None:
+        """Convert a document to PDF.
+
+        Args:
+            input_path (str): Path to the source document.
+            output_path (str): Path of the PDF to write.
+
+        Raises:
+            OfficeConversionTimeoutError: If the conversion timed out, the worker is restarted.
+            OfficeWorkerCrashedError: If soffice died during the conversion, the worker is restarted.
+            OfficeConversionError: If the document could not be converted.
+        """
+        if self.use_listener and (
+            not self.is_alive or self._conversions >= self.settings.max_conversions_per_worker
+        ):
+            # recycle long-running instances, LibreOffice slowly leaks memory
+            await self.restart()
+
+        self._conversions += 1
+        if self.use_listener:
+            await self._run(
+                self.settings.uno_python,
+                UNO_CONVERT_SCRIPT,
+                str(self.port),
+                input_path,
+                output_path,
+            )
+        else:
+            await self._convert_one_shot(input_path, output_path)
+
+        if not os.path.exists(output_path):
+            raise OfficeConversionError(f'Conversion reported success but {output_path} was not written')
+
+    async def _convert_one_shot(self, input_path: str, output_path: str) -> None:
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+            await self._run(
+                self.settings.soffice_binary,
+                '--headless',
+                '--norestore',
+                '--nolockcheck',
+                f'-env:UserInstallation={Path(self.profile_dir).as_uri()}',
+                '--convert-to',
+                'pdf',
+                '--outdir',
+                tmp_dir,
+                input_path,
+            )
+            converted_path = os.path.join(tmp_dir, os.path.splitext(os.path.basename(input_path))[0] + '.pdf')
+            if os.path.exists(converted_path):
+                shutil.move(converted_path, output_path)
+
+    async def _run(self, *cmd: str) -> None:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        try:
+            _, stderr = await asyncio.wait_for(
+                process.communicate(),
+                timeout=self.settings.conversion_timeout,
+            )
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            _kill_process_group(process, signal.SIGKILL)
+            await process.wait()
+            # the listener may be stuck on the document, start from a clean instance
+            await self.stop()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise OfficeConversionTimeoutError(
+                f'Conversion timed out after {self.settings.conversion_timeout}s'
+            ) from e
+
+        if process.returncode == 0:
+            return
+
+        message = stderr.decode('utf-8', errors='replace').strip()
+        if self.use_listener and (process.returncode == EXIT_CONNECTION_FAILED or not self.is_alive):
+            await self.stop()
+            raise OfficeWorkerCrashedError(f'Office worker {self.worker_index} crashed: {message}')
+        raise OfficeConversionError(f'Conversion failed with exit code {process.returncode}: {message}')
+
+    async def _wait_until_listening(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.settings.startup_timeout
+        while loop.time() < deadline:
+            if self._process.returncode is not None:
+                raise OfficeConversionError(
+                    f'soffice exited with code {self._process.returncode} during startup'
+                )
+            try:
+                _, writer = await asyncio.open_connection('127.0.0.1', self.port)
+                writer.close()
+                await writer.wait_closed()
+                return
+            except OSError:
+                await asyncio.sleep(0.2)
+
+        await self.stop()
+        raise OfficeConversionError(
+            f'soffice did not listen on port {self.port} within {self.settings.startup_timeout}s'
+        )
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from .lexical import CHUNK_KIND
+from .lexical import DESCRIPTION_KIND
+from .lexical import lexical_index_body
 from .opensearch import OpenSearchService
 from .opensearch import OpenSearchSettings
 from .opensearch import SearchInput
@@ -10,4 +13,7 @@ __all__ = [
     'SearchInput',
     'SearchOutput',
     'OpenSearchSettings',
+    'lexical_index_body',
+    'CHUNK_KIND',
+    'DESCRIPTION_KIND',
 ]
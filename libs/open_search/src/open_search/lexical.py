@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .settings import OpenSearchSettings
+
+CHUNK_KIND = 'chunk'
+DESCRIPTION_KIND = 'description'
+
+
+def lexical_index_body(settings: OpenSearchSettings) -> dict[str, Any]:
+    """BM25 index holding the chunks and descriptions of the knowledge graph.
+
+    Text is lowercased and ASCII-folded with the original token preserved, so
+    Vietnamese queries match with or without diacritics while exact forms
+    still score higher. Identifiers (course codes, formula names) stay intact
+    in the ``keyword`` sub-field of ``entity_name``.
+
+    Args:
+        settings (OpenSearchSettings): Shard and replica counts of the index.
+
+    Returns:
+        dict[str, Any]: The index creation body.
+    """
+    return {
+        'settings': {
+            'number_of_shards': settings.number_of_shards,
+            'number_of_replicas': settings.number_of_replicas,
+            'analysis': {
+                'filter': {
+                    'folding': {'type': 'asciifolding', 'preserve_original': True},
+                },
+                'analyzer': {
+                    'folded': {
+                        'type': 'custom',
+                        'tokenizer': 'standard',
+                        'filter': ['lowercase', 'folding'],
+                    },
+                },
+            },
+        },
+        'mappings': {
+            'properties': {
+                'uid': {'type': 'keyword'},
+                'kind': {'type': 'keyword'},
+                'description_type': {'type': 'keyword'},
+                'chunk_uid': {'type': 'keyword'},
+                'file_name': {'type': 'keyword'},
+                'course_code': {'type': 'keyword'},
+                'week_number': {'type': 'integer'},
+                'entity_name': {
+                    'type': 'text',
+                    'analyzer': 'folded',
+                    'fields': {'keyword': {'type': 'keyword', 'ignore_above': 256}},
+                },
+                'text': {'type': 'text', 'analyzer': 'folded'},
+            },
+        },
+    }
@@ -3,12 +3,15 @@ from __future__ import annotations
 from datetime import datetime
 from datetime import timedelta
 from typing import Any
+from typing import Optional
 
 from base import BaseModel
 from base import BaseService
 from logger import get_logger
 from opensearch_dsl import Document
 from opensearchpy import OpenSearch
+from opensearchpy import helpers
+from pydantic import PrivateAttr
 
 from .settings import OpenSearchSettings
 
@@ -27,18 +30,21 @@ class SearchOutput(BaseModel):
 
 class OpenSearchService(BaseService):
     settings: OpenSearchSettings
+    _client: Optional[OpenSearch] = PrivateAttr(default=None)
 
     @property
     def client(self) -> OpenSearch:
-        """Create and return an OpenSearch client."""
-        return OpenSearch(
-            hosts=[{'host': self.settings.host, 'port': self.settings.port}],
-            http_compress=True,  # enables gzip compression for request bodies
-            use_ssl=False,
-            verify_certs=False,
-            ssl_assert_hostname=False,
-            ssl_show_warn=False,
-        )
+        """Return the OpenSearch client, created once and reused (thread-safe connection pool)."""
+        if self._client is None:
+            self._client = OpenSearch(
+                hosts=[{'host': self.settings.host, 'port': self.settings.port}],
+                http_compress=True,  # enables gzip compression for request bodies
+                use_ssl=False,
+                verify_certs=False,
+                ssl_assert_hostname=False,
+                ssl_show_warn=False,
+            )
+        return self._client
 
     def index_exists(self, index_name: str) -> bool:
         """Check if an index exists in OpenSearch.
@@ -112,6 +118,70 @@ class OpenSearchService(BaseService):
                     f"Failed to add {document_class.__name__} document to index '{index_name}': {response}",
                 )
 
+    def bulk_index(
+        self,
+        index_name: str,
+        documents: list[dict[str, Any]],
+        id_field: str = 'uid',
+        refresh: bool = False,
+    ) -> tuple[int, int]:
+        """
+        Index (create or overwrite) plain documents with the bulk API.
+
+        Args:
+            index_name (str): The name of the index to write to.
+            documents (list[dict[str, Any]]): The documents, keyed by ``id_field``.
+            id_field (str): Field used as the document ``_id``. Defaults to 'uid'.
+            refresh (bool): Make the documents searchable before returning.
+
+        Returns:
+            tuple[int, int]: The number of indexed and failed documents.
+        """
+        if not documents:
+            return 0, 0
+
+        actions = (
+            {'_op_type': 'index', '_index': index_name, '_id': document[id_field], '_source': document}
+            for document in documents
+        )
+        try:
+            indexed, errors = helpers.bulk(
+                self.client,
+                actions,
+                raise_on_error=False,
+                refresh=refresh,
+            )
+        except Exception as e:
+            logger.error(f"Bulk indexing into '{index_name}' failed: {e}")
+            return 0, len(documents)
+
+        if errors:
+            logger.error(
+                f"Failed to index {len(errors)} documents into '{index_name}'",
+                extra={'errors': errors[:5]},
+            )
+        return indexed, len(errors)
+
+    def search_hits(self, index_name: str, query: dict[str, Any]) -> list[dict[str, Any]]:
+        """
+        Search an index and return the raw hits (``_id``, ``_score`` and ``_source``).
+
+        Args:
+            index_name (str): The name of the index to search.
+            query (dict[str, Any]): The search request body.
+
+        Returns:
+            list[dict[str, Any]]: The hits, best first; empty on error.
+        """
+        try:
+            response = self.client.search(index=index_name, body=query)
+            return response.get('hits', {}).get('hits', [])
+        except Exception as e:
+            logger.error(
+                f"Error occurred while searching in index '{index_name}': {e}",
+            )
+            return []
+
     def delete_old_documents(self, index_name: str, days: int = 3) -> None:
         """
         Delete documents older than a specified number of days from the index.
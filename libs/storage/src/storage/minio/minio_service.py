@@ -205,6 +205,31 @@ class MinioService(StorageBase):
                 return False
             raise
         
+    def get_object_metadata(self, input: MinioInput) -> dict[str, str]:
+        """Get the user metadata of an object in MinIO.
+
+        Args:
+            input (MinioInput): The input data for the stat operation.
+
+        Returns:
+            dict[str, str]: The user metadata with the ``x-amz-meta-`` prefix stripped.
+        Raises:
+            ValueError: If the bucket does not exist.
+        """
+        if not self.bucket_exists(input.bucket_name):
+            raise ValueError(f"Bucket '{input.bucket_name}' does not exist.")
+
+        stat = self._client.stat_object(
+            bucket_name=input.bucket_name,
+            object_name=input.object_name,
+        )
+        prefix = 'x-amz-meta-'
+        return {
+            key.lower()[len(prefix):]: value
+            for key, value in (stat.metadata or {}).items()
+            if key.lower().startswith(prefix)
+        }
+
     def get_data_from_file(self, input: MinioInput) -> str:
         """Get data from a file in MinIO.
 
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from .parser_cache_service import ParserCacheEntry
+from .parser_cache_service import ParserCacheService
+from .parser_cache_service import compute_content_hash
+from .parser_cache_service import compute_file_hash
+from .settings import ParserCacheSetting
+
+__all__ = [
+    'ParserCacheService',
+    'ParserCacheEntry',
+    'ParserCacheSetting',
+    'compute_content_hash',
+    'compute_file_hash',
+]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import io
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+from urllib.parse import quote
+from urllib.parse import unquote
+
+from base import BaseModel
+
+from ..minio import MinioInput
+from ..minio import MinioService
+from .settings import ParserCacheSetting
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_content_hash(data: bytes) -> str:
+    """Compute the SHA-256 hex digest of a document.
+
+    Args:
+        data (bytes): The raw bytes of the document.
+
+    Returns:
+        str: The hex digest.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def compute_file_hash(file_path: str) -> str:
+    """Compute the SHA-256 hex digest of a file without loading it in memory.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParserCacheEntry(BaseModel):
+    content_hash: str
+    parser_version: str
+    contents: str
+    metadata: dict[str, str] = {}
+
+
+class ParserCacheService(BaseModel):
+    """Parser output cache keyed by the source document hash and the parser version.
+
+    Entries live in a dedicated bucket so that identical lectures uploaded under
+    different names or courses share a single parse, while a re-uploaded file with
+    different bytes, or a new prompt/parser version, always misses.
+    """
+
+    minio_service: MinioService
+    settings: ParserCacheSetting
+
+    def object_name(self, content_hash: str, parser_version: str) -> str:
+        """Get the object name of a cache entry.
+
+        Args:
+            content_hash (str): The SHA-256 of the source document.
+            parser_version (str): The version of the parser that produced the output.
+
+        Returns:
+            str: The object name inside the cache bucket.
+        """
+        return f'{parser_version}/{content_hash[:2]}/{content_hash}.md'
+
+    def ensure_bucket(self) -> None:
+        """Create the cache bucket if it does not exist yet."""
+        if not self.minio_service.bucket_exists(self.settings.bucket_name):
+            self.minio_service.create_bucket(self.settings.bucket_name)
+
+    def get(self, content_hash: str, parser_version: str) -> Optional[ParserCacheEntry]:
+        """Get a cached parser output.
+
+        Args:
+            content_hash (str): The SHA-256 of the source document.
+            parser_version (str): The version of the parser.
+
+        Returns:
+            Optional[ParserCacheEntry]: The cache entry, or None on a miss.
+        """
+        minio_input = MinioInput(
+            bucket_name=self.settings.bucket_name,
+            object_name=self.object_name(content_hash, parser_version),
+        )
+        if not self.minio_service.check_object_exists(minio_input):
+            return None
+
+        metadata = self.minio_service.get_object_metadata(minio_input)
+        return ParserCacheEntry(
+            content_hash=content_hash,
+            parser_version=parser_version,
+            contents=self.minio_service.get_data_from_file(minio_input),
+            metadata={key: unquote(value) for key, value in metadata.items()},
+        )
+
+    def put(
+        self,
+        content_hash: str,
+        parser_version: str,
+        contents: str,
+        metadata: Optional[dict[str, str]] = None,
+    ) -> ParserCacheEntry:
+        """Store a parser output.
+
+        Args:
+            content_hash (str): The SHA-256 of the source document.
+            parser_version (str): The version of the parser.
+            contents (str): The parsed markdown.
+            metadata (Optional[dict[str, str]]): Extra metadata, e.g. the source file name.
+
+        Returns:
+            ParserCacheEntry: The stored entry.
+        """
+        entry_metadata = {
+            **(metadata or {}),
+            'content-hash': content_hash,
+            'parser-version': parser_version,
+            'created-at': datetime.now(timezone.utc).isoformat(),
+        }
+        self.minio_service.upload_data(
+            MinioInput(
+                bucket_name=self.settings.bucket_name,
+                object_name=self.object_name(content_hash, parser_version),
+                data=io.BytesIO(contents.encode('utf-8')),
+                content_type='text/markdown; charset=utf-8',
+                # S3 user metadata must be ASCII, file names are often not
+                metadata={key: quote(str(value)) for key, value in entry_metadata.items()},
+            )
+        )
+        return ParserCacheEntry(
+            content_hash=content_hash,
+            parser_version=parser_version,
+            contents=contents,
+            metadata=entry_metadata,
+        )
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from base import BaseModel
+
+
+class ParserCacheSetting(BaseModel):
+    bucket_name: str = 'parser-cache'
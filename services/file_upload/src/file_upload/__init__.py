@@ -11,6 +11,7 @@ from logger import get_logger
 from logger import setup_logging
 from storage.minio import MinioService, MinioInput
 from storage.minio import MinioSetting
+from storage.parser_cache import compute_content_hash
 
 
 setup_logging(json_logs=False, log_level='INFO')
@@ -137,7 +138,9 @@ async def upload_file(
                     bucket_name=bucket_name,
                     object_name=object_name,
                     file_path=temp_file_path,
-                    content_type=file.content_type or "application/octet-stream"
+                    content_type=file.content_type or "application/octet-stream",
+                    # lets the parser look up its content-hash cache without downloading the file
+                    metadata={"sha256": compute_content_hash(file_content)}
                 )
                 request.app.state.minio_service.upload_file(upload_input)
                 os.unlink(temp_file_path)
@@ -7,6 +7,7 @@
 # from logger import setup_logging
 # from lite_llm import LiteLLMService
 # from storage.minio import MinioService
+# from office_converter import OfficeConverterService
 
 # from generation.api.routers import quiz_router
 # from generation.api.routers import exam_router
@@ -27,9 +28,15 @@
 #     app.state.minio_service = MinioService(
 #         settings=app.state.settings.minio
 #     )
+#     app.state.office_converter = OfficeConverterService(
+#         settings=app.state.settings.office_converter
+#     )
+#     await app.state.office_converter.start()
     
 #     yield 
 
+#     await app.state.office_converter.stop()
+
 
 # app = FastAPI(
 #     title='Generation Service',
@@ -11,10 +11,10 @@ from lite_llm import CompletionMessage
 from lite_llm import Role
 from storage.minio import MinioService 
 from storage.minio import MinioInput
+from office_converter import OfficeConverterService
 from generation.domain.quiz_generation.prompts import CONCEPT_CARDS_SYSTEM_PROMPT
 from generation.domain.quiz_generation.prompts import CONCEPT_CARDS_USER_PROMPT
 from generation.shared.settings import ConceptCardExtractorSetting
-from generation.shared.utils import convert_pptx_to_pdf
 from generation.shared.models import FileType
 from generation.shared.utils import filter_files
 from generation.shared.utils import get_previous_lectures
@@ -56,6 +56,7 @@ class ConceptCardExtractorOutput(BaseModel):
 class ConceptCardExtractorService(BaseService):
     litellm_service: LiteLLMService
     minio_service: MinioService
+    office_converter: OfficeConverterService
     settings: ConceptCardExtractorSetting
     
     async def process(self, inputs: ConceptCardExtractorInput) -> ConceptCardExtractorOutput:
@@ -178,7 +179,7 @@ class ConceptCardExtractorService(BaseService):
             file_type = filename.split('.')[-1].lower()
             
             if file_type == FileType.PPTX:
-                pdf_path = convert_pptx_to_pdf(
+                pdf_path = await self.office_converter.convert_to_pdf(
                     input_path=file_path,
                     output_dir=inputs.course_code
                 )
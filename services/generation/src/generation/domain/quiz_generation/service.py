@@ -31,6 +31,7 @@ from base import BaseModel
 from base import BaseService
 from logger import get_logger
 from storage.minio import MinioService
+from office_converter import OfficeConverterService
 
 logger = get_logger(__name__)
 
@@ -55,6 +56,7 @@ class QuizGenerationService(BaseService):
     settings: QuizGenerationSetting
     litellm_service: LiteLLMService
     minio_service: MinioService
+    office_converter: OfficeConverterService
     chromadb_client: ClientAPI
     
     @property
@@ -62,7 +64,8 @@ class QuizGenerationService(BaseService):
         return ConceptCardExtractorService(
             litellm_service=self.litellm_service,
             settings=self.settings.concept_card_extractor,
-            minio_service=self.minio_service
+            minio_service=self.minio_service,
+            office_converter=self.office_converter
         )
     
     @property
@@ -521,6 +524,8 @@ if __name__ == "__main__":
         from chromadb import PersistentClient
         from storage.minio import MinioSetting
         from storage.minio import MinioService
+        from office_converter import OfficeConverterService
+        from office_converter import OfficeConverterSetting
         
         minio_setting = MinioSetting(
             endpoint="localhost:9000",
@@ -530,6 +535,7 @@ if __name__ == "__main__":
         )
         
         minio_service = MinioService(settings=minio_setting)
+        office_converter = OfficeConverterService(settings=OfficeConverterSetting())
         # Setup LiteLLM
         litellm_setting = LiteLLMSetting(
             url=HttpUrl("http://localhost:9510"),
@@ -653,6 +659,7 @@ if __name__ == "__main__":
             settings=quiz_settings,
             litellm_service=litellm_service,
             minio_service=minio_service,
+            office_converter=office_converter,
             chromadb_client=chromadb_client
         )
         
@@ -8,6 +8,7 @@ from pathlib import Path
 
 from lite_llm import LiteLLMSetting
 from storage.minio import MinioSetting
+from office_converter import OfficeConverterSetting
 from .quiz_settings import QuizGenerationSetting
 from .exam_settings import ExamGenerationSetting
 from .quiz_validator import QuizValidatorSetting
@@ -23,6 +24,7 @@ class Settings(BaseSettings):
     exam: ExamGenerationSetting
     litellm: LiteLLMSetting
     minio: MinioSetting
+    office_converter: OfficeConverterSetting
     
     quiz_validator: QuizValidatorSetting
 
@@ -2,4 +2,3 @@ from .generation import filter_files
 from .utils import get_settings
 from .generation import get_lecture_objectives
 from .generation import get_previous_lectures
-from .generation import convert_pptx_to_pdf
\ No newline at end of file
@@ -1,11 +1,24 @@
+import asyncio
 import uvicorn
 from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI 
 from lite_llm import LiteLLMService
+from graph_db import EntityNeighborhoods
 from graph_db import Neo4jService
+from graph_db import Neo4jSchemaManager
+from office_converter import OfficeConverterService
+from open_search import OpenSearchService
+from open_search import lexical_index_body
 from storage.minio import MinioService
+from storage.parser_cache import ParserCacheService
 from fastapi.middleware.cors import CORSMiddleware
 from indexing.api.main import router
+from indexing.application.indexing import run_indexing_job
+from indexing.domain.community import CommunityGate
+from indexing.domain.graph_builder import backfill_entity_keys
+from indexing.domain.job_queue import JobStore
+from indexing.domain.job_queue import JobWorkerPool
 from indexing.shared.utils import get_settings
 
 
@@ -18,11 +31,83 @@ async def lifespan(app: FastAPI):
     app.state.minio_service = MinioService(
         settings=app.state.settings.minio
     )
+    app.state.parser_cache_service = ParserCacheService(
+        minio_service=app.state.minio_service,
+        settings=app.state.settings.parser_cache,
+    )
+    await asyncio.to_thread(app.state.parser_cache_service.ensure_bucket)
+    app.state.office_converter = OfficeConverterService(
+        settings=app.state.settings.office_converter
+    )
+    await app.state.office_converter.start()
     app.state.neo4j_service = Neo4jService(
         settings=app.state.settings.neo4j
     )
+    await Neo4jSchemaManager(
+        neo4j_service=app.state.neo4j_service,
+        settings=app.state.settings.neo4j_schema,
+        dimension=app.state.settings.litellm.dimension,
+    ).ensure()
+    # label the chunks of courses indexed before the per-course vector indexes
+    app.state.course_backfill = asyncio.create_task(
+        Neo4jSchemaManager(
+            neo4j_service=app.state.neo4j_service,
+            settings=app.state.settings.neo4j_schema,
+            dimension=app.state.settings.litellm.dimension,
+        ).ensure_courses()
+    )
+    # stamp the normalized names that entity resolution links new entities through
+    app.state.entity_key_backfill = None
+    if app.state.settings.graph_builder.resolve_entities:
+        app.state.entity_key_backfill = asyncio.create_task(
+            backfill_entity_keys(app.state.neo4j_service)
+        )
+    # backfill the neighborhoods of a graph indexed before (or without) materialization
+    app.state.neighborhood_backfill = None
+    if app.state.settings.neighborhood.enabled:
+        app.state.neighborhood_backfill = asyncio.create_task(
+            EntityNeighborhoods(
+                neo4j_service=app.state.neo4j_service,
+                top_k=app.state.settings.neighborhood.top_k,
+                batch_size=app.state.settings.neighborhood.batch_size,
+            ).materialize()
+        )
+    app.state.opensearch_service = None
+    if app.state.settings.graph_builder.lexical_dual_write:
+        app.state.opensearch_service = OpenSearchService(
+            settings=app.state.settings.opensearch
+        )
+        await asyncio.to_thread(
+            app.state.opensearch_service.create_index,
+            app.state.settings.opensearch.index_name,
+            lexical_index_body(app.state.settings.opensearch),
+        )
+    # community updates of concurrent jobs run one at a time
+    app.state.community_gate = CommunityGate()
+    app.state.job_store = JobStore(
+        settings=app.state.settings.job_queue
+    )
+    await app.state.job_store.initialize()
+    app.state.job_worker_pool = JobWorkerPool(
+        store=app.state.job_store,
+        settings=app.state.settings.job_queue,
+        runner=partial(run_indexing_job, app),
+    )
+    await app.state.job_worker_pool.start()
     
     yield 
+    
+    await app.state.job_worker_pool.stop()
+    app.state.course_backfill.cancel()
+    await asyncio.gather(app.state.course_backfill, return_exceptions=True)
+    if app.state.entity_key_backfill is not None:
+        app.state.entity_key_backfill.cancel()
+        await asyncio.gather(app.state.entity_key_backfill, return_exceptions=True)
+    if app.state.neighborhood_backfill is not None:
+        app.state.neighborhood_backfill.cancel()
+        await asyncio.gather(app.state.neighborhood_backfill, return_exceptions=True)
+    await app.state.office_converter.stop()
+    await app.state.neo4j_service.close()
 
 
 app = FastAPI(
@@ -1,7 +1,8 @@
-from fastapi import Request 
+from fastapi import Request
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse 
-from indexing.application.indexing import IndexingApplication, IndexingApplicationInput
+from fastapi import status
+from fastapi.responses import JSONResponse
+from indexing.domain.job_queue import JobStore
 from base import BaseModel
 from logger import get_logger
 
@@ -12,15 +13,67 @@ class IndexingRequest(BaseModel):
     course_code: str
     week_number: int
 
+
 @router.post("/indexing")
-async def indexing_sync(request: Request, indexing_request: IndexingRequest):
-    indexing_app = IndexingApplication(request=request)
-    result = await indexing_app.run(IndexingApplicationInput(
+async def submit_indexing(request: Request, indexing_request: IndexingRequest):
+    """
+    Enqueue an indexing job for a course week and return its id immediately.
+    """
+    job_store: JobStore = request.app.state.job_store
+    job = await job_store.create(
         course_code=indexing_request.course_code,
-        week_number=indexing_request.week_number
-    ))
-    return JSONResponse(content={
-        'status': 'Indexing completed',
-        'course_code': indexing_request.course_code,
-        'week_number': indexing_request.week_number
-    })
+        week_number=indexing_request.week_number,
+    )
+    logger.info(
+        'Indexing job submitted',
+        extra={
+            'job_id': job.job_id,
+            'course_code': job.course_code,
+            'week_number': job.week_number,
+        }
+    )
+    return JSONResponse(
+        content=job.model_dump(mode='json'),
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@router.get("/indexing/{job_id}")
+async def get_indexing_job(request: Request, job_id: str):
+    """
+    Get the status and per-stage progress of an indexing job.
+    """
+    job_store: JobStore = request.app.state.job_store
+    job = await job_store.get(job_id)
+    if job is None:
+        return JSONResponse(
+            content={'message': f'Indexing job {job_id} not found'},
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    return JSONResponse(content=job.model_dump(mode='json'))
+
+
+@router.post("/indexing/{job_id}/cancel")
+async def cancel_indexing_job(request: Request, job_id: str):
+    """
+    Cancel a queued or running indexing job.
+    """
+    job_store: JobStore = request.app.state.job_store
+    job = await job_store.request_cancel(job_id)
+    if job is None:
+        return JSONResponse(
+            content={'message': f'Indexing job {job_id} not found'},
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    if job.is_terminal and not job.cancel_requested:
+        return JSONResponse(
+            content={
+                'message': f'Indexing job {job_id} already {job.status.value}',
+                **job.model_dump(mode='json'),
+            },
+            status_code=status.HTTP_409_CONFLICT,
+        )
+    return JSONResponse(
+        content=job.model_dump(mode='json'),
+        status_code=status.HTTP_202_ACCEPTED,
+    )
@@ -1,14 +1,22 @@
 from typing import Any
-from base import BaseModel 
-from base import BaseApplication 
-from fastapi import Request
+from typing import Optional
+from base import BaseModel
+from base import BaseApplication
+from fastapi import FastAPI
+from graph_db import EntityNeighborhoods
+from graph_db import IndexVersion
+from graph_db import Neo4jSchemaManager
 from uuid import uuid4
-from indexing.domain.parser import ParserInput 
-from indexing.domain.parser import ParserService 
-from indexing.domain.chunker import ChunkerInput 
+from indexing.domain.parser import ParserInput
+from indexing.domain.parser import ParserService
+from indexing.domain.chunker import ChunkerInput
 from indexing.domain.chunker import ChunkerService
-from indexing.domain.graph_builder import BuilderInput 
+from indexing.domain.community import CommunityService
+from indexing.domain.graph_builder import BuilderInput
 from indexing.domain.graph_builder import BuilderService
+from indexing.domain.job_queue import Job
+from indexing.domain.job_queue import JobStage
+from indexing.domain.job_queue import ProgressReporter
 
 
 from logger import get_logger
@@ -17,39 +25,84 @@ from logger import get_logger
 logger = get_logger(__name__)
 
 class IndexingApplicationInput(BaseModel):
-    course_code: str 
+    course_code: str
     week_number: int
-    
+
 
 class IndexingApplicationOutput(BaseModel):
-    pass 
+    file_names: list[str]
+    number_of_chunks: int
+    entities_created: int
+    relationships_created: int
+
 
 class IndexingApplication(BaseApplication):
-    
-    request: Request
+
+    app: FastAPI
+    progress_reporter: Optional[ProgressReporter] = None
 
     @property
     def parser(self) -> ParserService:
         return ParserService(
-            litellm_service=self.request.app.state.litellm_service,
-            minio_service=self.request.app.state.minio_service, 
-            settings=self.request.app.state.settings.parser,
+            litellm_service=self.app.state.litellm_service,
+            minio_service=self.app.state.minio_service,
+            parser_cache_service=self.app.state.parser_cache_service,
+            office_converter=self.app.state.office_converter,
+            settings=self.app.state.settings.parser,
         )
-        
+
     @property
     def chunker(self) -> ChunkerService:
         return ChunkerService(
-            chunker_setting=self.request.app.state.settings.chunker,
+            chunker_setting=self.app.state.settings.chunker,
         )
-        
+
     @property
     def builder(self) -> BuilderService:
         return BuilderService(
-            llm_service=self.request.app.state.litellm_service,
-            neo4j_service=self.request.app.state.neo4j_service,
+            llm_service=self.app.state.litellm_service,
+            neo4j_service=self.app.state.neo4j_service,
+            settings=self.app.state.settings.graph_builder,
+            progress_reporter=self.progress_reporter,
+            opensearch_service=self.app.state.opensearch_service,
+            entity_index_name=self.app.state.settings.neo4j_schema.entity_index_name,
+        )
+
+    @property
+    def community(self) -> CommunityService:
+        return CommunityService(
+            neo4j_service=self.app.state.neo4j_service,
+            llm_service=self.app.state.litellm_service,
+            settings=self.app.state.settings.community,
         )
-        
+
+    async def _set_stage(self, stage: JobStage) -> None:
+        if self.progress_reporter:
+            await self.progress_reporter.set_stage(stage)
+
+    async def _update_progress(self, **counters: Any) -> None:
+        if self.progress_reporter:
+            await self.progress_reporter.update(**counters)
+
     async def run(self, inputs: IndexingApplicationInput) -> IndexingApplicationOutput:
+        """Run parser, chunker and graph builder for one course week.
+
+        Every lecture file of the week is parsed, then chunked and built
+        separately so that each chunk is attached to the document it came from.
+        Any stage failure is logged and re-raised so that callers (the job
+        worker) can record which stage failed instead of reporting success.
+        A successful run materializes the entity neighborhoods it changed and
+        updates the community reports (one update at a time per process,
+        see CommunityGate); every run that wrote graph rows, even
+        one that failed afterwards, bumps the graph index version.
+
+        Args:
+            inputs (IndexingApplicationInput): The course code and week number to index.
+
+        Returns:
+            IndexingApplicationOutput: Counters describing the indexing run.
+        """
+        await self._set_stage(JobStage.PARSING)
         try:
             logger.info(
                 'Starting Parser Service',
@@ -64,11 +117,15 @@ class IndexingApplication(BaseApplication):
                     week_number=inputs.week_number
                 )
             )
+            if not parser_output.files:
+                raise ValueError('Parser produced no content')
+            await self._update_progress(files_parsed=len(parser_output.files))
             logger.info(
                 'Parser Service completed',
                 extra={
                     'course_code': inputs.course_code,
-                    'week_number': inputs.week_number
+                    'week_number': inputs.week_number,
+                    'file_names': [parsed_file.file_name for parsed_file in parser_output.files],
                 }
             )
         except Exception as e:
@@ -80,70 +137,184 @@ class IndexingApplication(BaseApplication):
                     'error': str(e)
                 }
             )
-            
-        try:
-            logger.info(
-                'Starting Chunker Service',
-                extra={
-                    'course_code': inputs.course_code,
-                    'week_number': inputs.week_number
-                }
-            )
-            chunker_output = self.chunker.process(
-                ChunkerInput(
-                    contents=parser_output.contents,
-                    file_name=parser_output.file_name,
+            raise
+
+        await self._set_stage(JobStage.CHUNKING)
+        chunks_per_file: dict[str, list[str]] = {}
+        for parsed_file in parser_output.files:
+            try:
+                logger.info(
+                    'Starting Chunker Service',
+                    extra={
+                        'file_name': parsed_file.file_name,
+                    }
                 )
-            )
-            logger.info(
-                'Chunker Service completed',
-                extra={
-                    "number_of_chunks": len(chunker_output.chunks),
-                }
-            )
-        except Exception as e:
-            logger.exception(
-                'Chunker Service failed',
+                chunker_output = self.chunker.process(
+                    ChunkerInput(
+                        contents=parsed_file.contents,
+                        file_name=parsed_file.file_name,
+                    )
+                )
+                if chunker_output is None or not chunker_output.chunks:
+                    raise ValueError('Chunker produced no chunks')
+                chunks_per_file[parsed_file.file_name] = chunker_output.chunks
+                logger.info(
+                    'Chunker Service completed',
+                    extra={
+                        'file_name': parsed_file.file_name,
+                        "number_of_chunks": len(chunker_output.chunks),
+                    }
+                )
+            except Exception as e:
+                logger.exception(
+                    'Chunker Service failed',
+                    extra={
+                        'file_name': parsed_file.file_name,
+                        'error': str(e)
+                    }
+                )
+                raise
+        number_of_chunks = sum(len(chunks) for chunks in chunks_per_file.values())
+        await self._update_progress(number_of_chunks=number_of_chunks)
+
+        await self._set_stage(JobStage.BUILDING)
+        # the per-course vector indexes exist before the first scoped write
+        course_ready = await Neo4jSchemaManager(
+            neo4j_service=self.app.state.neo4j_service,
+            settings=self.app.state.settings.neo4j_schema,
+            dimension=self.app.state.settings.litellm.dimension,
+        ).ensure_course(inputs.course_code)
+        if not course_ready:
+            logger.error(
+                'Course vector indexes are not online',
                 extra={
-                    'file_name': parser_output.file_name,
-                    'error': str(e)
+                    'course_code': inputs.course_code,
                 }
             )
-            
+            raise RuntimeError(f'Course vector indexes are not online: {inputs.course_code}')
+        entities_created = 0
+        relationships_created = 0
+        related_entities: set[str] = set()
+        builder = self.builder
         try:
-            logger.info(
-                'Starting Builder Service',
-                extra={
-                    'file_name': parser_output.file_name
-                }
-            )
-            builder_output = await self.builder.process(
-                BuilderInput(
-                    chunks=[
-                        {
-                            "chunk_id": str(uuid4()),
-                            "chunk_text": text
+            for file_name, chunks in chunks_per_file.items():
+                try:
+                    logger.info(
+                        'Starting Builder Service',
+                        extra={
+                            'file_name': file_name
+                        }
+                    )
+                    builder_output = await builder.process(
+                        BuilderInput(
+                            chunks=[
+                                {
+                                    "chunk_id": str(uuid4()),
+                                    "chunk_text": text
+                                }
+                                for text in chunks
+                            ],
+                            document_file_name=file_name,
+                            course_code=inputs.course_code,
+                            week_number=inputs.week_number,
+                        )
+                    )
+                    entities_created += builder_output.entities_created
+                    relationships_created += builder_output.relationships_created
+                    related_entities.update(builder_output.related_entities)
+                    logger.info(
+                        'Builder Service completed',
+                        extra={
+                            'file_name': file_name,
+                        }
+                    )
+                except Exception as e:
+                    logger.exception(
+                        'Builder Service failed',
+                        extra={
+                            'file_name': file_name,
+                            'error': str(e)
+                        }
+                    )
+                    raise
+
+            # bounded context lookups of the RAG local search read the materialized neighborhoods
+            neighborhood_settings = self.app.state.settings.neighborhood
+            if neighborhood_settings.enabled and related_entities:
+                neighborhood_stats = await EntityNeighborhoods(
+                    neo4j_service=self.app.state.neo4j_service,
+                    top_k=neighborhood_settings.top_k,
+                    batch_size=neighborhood_settings.batch_size,
+                ).materialize(sorted(related_entities))
+                if neighborhood_stats.failed_batches:
+                    logger.warning(
+                        'Entity neighborhoods partially materialized',
+                        extra={
+                            'course_code': inputs.course_code,
+                            'week_number': inputs.week_number,
+                            **neighborhood_stats.model_dump(),
+                        }
+                    )
+
+            # community reports answer the global questions of the RAG service
+            if self.app.state.settings.community.enabled and related_entities:
+                await self._set_stage(JobStage.SUMMARIZING)
+                community_output = await self.app.state.community_gate.run(self.community)
+                if community_output is None:
+                    logger.info(
+                        'Community Service skipped, a pending update covers this run',
+                        extra={
+                            'course_code': inputs.course_code,
+                            'week_number': inputs.week_number,
+                        }
+                    )
+                else:
+                    logger.info(
+                        'Community Service completed',
+                        extra={
+                            'course_code': inputs.course_code,
+                            'week_number': inputs.week_number,
+                            **community_output.model_dump(),
                         }
-                        for text in chunker_output.chunks
-                    ],
-                    document_file_name=parser_output.file_name
+                    )
+        finally:
+            # readers cache results per graph version (e.g. the RAG query cache);
+            # a failed or cancelled run may already have committed part of its rows
+            if any(builder.written.values()):
+                index_version = await IndexVersion(neo4j_service=self.app.state.neo4j_service).bump()
+                logger.info(
+                    'Index version bumped',
+                    extra={
+                        'course_code': inputs.course_code,
+                        'week_number': inputs.week_number,
+                        'index_version': index_version,
+                    }
                 )
-            )
-            logger.info(
-                'Builder Service completed',
-                extra={
-                    'file_name': parser_output.file_name,
-                }
-            )
-        except Exception as e:
-            logger.exception(
-                'Builder Service failed',
-                extra={
-                    'file_name': parser_output.file_name,
-                    'error': str(e)
-                }
-            )
-            
-        return IndexingApplicationOutput()
 
+        return IndexingApplicationOutput(
+            file_names=list(chunks_per_file.keys()),
+            number_of_chunks=number_of_chunks,
+            entities_created=entities_created,
+            relationships_created=relationships_created,
+        )
+
+
+async def run_indexing_job(app: FastAPI, job: Job, reporter: ProgressReporter) -> dict[str, Any]:
+    """Job runner executed by the indexing worker pool.
 
+    Args:
+        app (FastAPI): The application holding the shared services.
+        job (Job): The claimed job.
+        reporter (ProgressReporter): The progress reporter of the job.
+
+    Returns:
+        dict[str, Any]: The serialized indexing output stored as job result.
+    """
+    indexing_app = IndexingApplication(app=app, progress_reporter=reporter)
+    output = await indexing_app.run(
+        IndexingApplicationInput(
+            course_code=job.course_code,
+            week_number=job.week_number,
+        )
+    )
+    return output.model_dump()
@@ -0,0 +1,109 @@
+"""Parse every lecture of a course ahead of time so indexing hits the parser cache.
+
+Usage:
+    python -m indexing.application.warm_parser_cache <course_code> [week_number ...]
+
+Without week numbers, every ``tuan-<n>/`` folder of the course bucket is warmed.
+"""
+from __future__ import annotations
+
+import asyncio
+import re
+import sys
+
+from lite_llm import LiteLLMService
+from office_converter import OfficeConverterService
+from storage.minio import MinioService
+from storage.parser_cache import ParserCacheService
+
+from indexing.domain.parser import ParserInput
+from indexing.domain.parser import ParserService
+from indexing.shared.utils import get_settings
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+WEEK_FOLDER_PATTERN = re.compile(r'^tuan-(\d+)/$')
+
+
+def list_course_weeks(minio_service: MinioService, course_code: str) -> list[int]:
+    """List the week numbers that have a ``tuan-<n>/`` folder in the course bucket.
+
+    Args:
+        minio_service (MinioService): The MinIO service.
+        course_code (str): The course code, which is also the bucket name.
+
+    Returns:
+        list[int]: The sorted week numbers.
+    """
+    folders = minio_service.list_files(bucket_name=course_code, prefix='', recursive=False)
+    return sorted(
+        int(match.group(1))
+        for folder in folders
+        if (match := WEEK_FOLDER_PATTERN.match(folder))
+    )
+
+
+async def warm_parser_cache(course_code: str, week_numbers: list[int] | None = None) -> dict[int, list[str]]:
+    """Parse the lectures of a course week by week, filling the parser cache.
+
+    Files already in the cache are served from it, so the command is cheap to
+    re-run after uploading a few new or corrected lectures.
+
+    Args:
+        course_code (str): The course code.
+        week_numbers (list[int] | None): The weeks to warm, every week if None.
+
+    Returns:
+        dict[int, list[str]]: The names of the parsed files per week.
+    """
+    settings = get_settings()
+    minio_service = MinioService(settings=settings.minio)
+    parser_cache_service = ParserCacheService(
+        minio_service=minio_service,
+        settings=settings.parser_cache,
+    )
+    await asyncio.to_thread(parser_cache_service.ensure_bucket)
+    office_converter = OfficeConverterService(settings=settings.office_converter)
+    parser = ParserService(
+        litellm_service=LiteLLMService(litellm_setting=settings.litellm),
+        minio_service=minio_service,
+        parser_cache_service=parser_cache_service,
+        office_converter=office_converter,
+        settings=settings.parser,
+    )
+
+    if not week_numbers:
+        week_numbers = await asyncio.to_thread(list_course_weeks, minio_service, course_code)
+
+    parsed_files: dict[int, list[str]] = {}
+    await office_converter.start()
+    try:
+        for week_number in week_numbers:
+            output = await parser.process(
+                ParserInput(
+                    course_code=course_code,
+                    week_number=week_number,
+                )
+            )
+            parsed_files[week_number] = [parsed_file.file_name for parsed_file in output.files]
+            logger.info(
+                'Parser cache warmed',
+                extra={
+                    'course_code': course_code,
+                    'week_number': week_number,
+                    'file_names': parsed_files[week_number],
+                }
+            )
+    finally:
+        await office_converter.stop()
+
+    return parsed_files
+
+
+if __name__ == '__main__':
+    course = sys.argv[1]
+    weeks = [int(week) for week in sys.argv[2:]]
+    results = asyncio.run(warm_parser_cache(course, weeks or None))
+    for week, file_names in results.items():
+        print(f'tuan-{week}: {len(file_names)} file(s) parsed {file_names}')
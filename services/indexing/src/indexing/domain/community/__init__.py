@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from .louvain import louvain
+from .service import CommunityGate
+from .service import CommunityOutput
+from .service import CommunityReport
+from .service import CommunityService
+
+__all__ = [
+    'CommunityService',
+    'CommunityGate',
+    'CommunityOutput',
+    'CommunityReport',
+    'louvain',
+]
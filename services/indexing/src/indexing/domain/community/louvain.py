@@ -0,0 +1,116 @@
+"""Louvain community detection on a weighted undirected graph.
+
+Nodes are repeatedly moved to the neighbouring community with the largest
+modularity gain, then every community is collapsed into a single node and the
+moving starts over on the smaller graph, until no node moves.
+"""
+
+from __future__ import annotations
+
+import random
+from collections import defaultdict
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Tuple
+
+
+def _move_nodes(
+    adjacency: List[Dict[int, float]],
+    degrees: List[float],
+    total_weight: float,
+    resolution: float,
+    rng: random.Random,
+) -> Tuple[List[int], bool]:
+    """Local moving phase: the community of every node, and whether a node moved."""
+    community = list(range(len(adjacency)))
+    community_degree = list(degrees)
+    order = list(range(len(adjacency)))
+    moved = False
+    improved = True
+    while improved:
+        improved = False
+        rng.shuffle(order)
+        for node in order:
+            current = community[node]
+            degree = degrees[node]
+            links: Dict[int, float] = defaultdict(float)
+            for neighbour, weight in adjacency[node].items():
+                if neighbour != node:
+                    links[community[neighbour]] += weight
+
+            community_degree[current] -= degree
+            best = current
+            best_gain = links.get(current, 0.0) - resolution * community_degree[current] * degree / total_weight
+            for candidate, weight in links.items():
+                gain = weight - resolution * community_degree[candidate] * degree / total_weight
+                if gain > best_gain + 1e-12:
+                    best, best_gain = candidate, gain
+            community_degree[best] += degree
+
+            if best != current:
+                community[node] = best
+                improved = moved = True
+
+    # consecutive community ids
+    labels: Dict[int, int] = {}
+    return [labels.setdefault(label, len(labels)) for label in community], moved
+
+
+def _aggregate(adjacency: List[Dict[int, float]], community: List[int]) -> List[Dict[int, float]]:
+    """One node per community; internal links become self-loops."""
+    aggregated: List[Dict[int, float]] = [defaultdict(float) for _ in range(max(community) + 1)]
+    for node, neighbours in enumerate(adjacency):
+        for neighbour, weight in neighbours.items():
+            aggregated[community[node]][community[neighbour]] += weight
+    return [dict(neighbours) for neighbours in aggregated]
+
+
+def louvain(
+    edges: Dict[Tuple[Hashable, Hashable], float],
+    resolution: float = 1.0,
+    seed: int = 0,
+    max_levels: int = 10,
+) -> Dict[Hashable, int]:
+    """Partition the nodes of a graph into communities.
+
+    Args:
+        edges (Dict[Tuple[Hashable, Hashable], float]): Edge weights; (a, b) and
+            (b, a) are the same edge and their weights add up.
+        resolution (float): Higher values give smaller communities.
+        seed (int): Seed of the node visiting order.
+        max_levels (int): Maximum number of aggregation levels.
+
+    Returns:
+        Dict[Hashable, int]: The community id of every node.
+    """
+    nodes: Dict[Hashable, int] = {}
+    for source, target in edges:
+        nodes.setdefault(source, len(nodes))
+        nodes.setdefault(target, len(nodes))
+    if not nodes:
+        return {}
+
+    adjacency: List[Dict[int, float]] = [defaultdict(float) for _ in nodes]
+    for (source, target), weight in edges.items():
+        if weight <= 0:
+            continue
+        adjacency[nodes[source]][nodes[target]] += weight
+        adjacency[nodes[target]][nodes[source]] += weight
+    adjacency = [dict(neighbours) for neighbours in adjacency]
+
+    total_weight = sum(sum(neighbours.values()) for neighbours in adjacency)
+    if total_weight == 0:
+        return {node: index for node, index in nodes.items()}
+
+    rng = random.Random(seed)
+    membership = list(range(len(nodes)))
+    for _ in range(max_levels):
+        degrees = [sum(neighbours.values()) for neighbours in adjacency]
+        community, moved = _move_nodes(adjacency, degrees, total_weight, resolution, rng)
+        if not moved:
+            break
+        membership = [community[label] for label in membership]
+        adjacency = _aggregate(adjacency, community)
+
+    return {node: membership[index] for node, index in nodes.items()}
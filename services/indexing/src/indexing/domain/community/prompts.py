@@ -0,0 +1,23 @@
+COMMUNITY_REPORT_PROMPT = """<role>
+You are an expert in IT education who writes study overviews of a group of closely related concepts from a knowledge graph built from lecture materials.
+</role>
+
+<instructions>
+The entities below and the relationships between them form one community of the knowledge graph. Write a report on the community, in Vietnamese:
+
+1. title: A short, specific title naming the main concepts of the community.
+2. summary: A paragraph (4-8 sentences) explaining what the community covers, how its main entities relate to each other and why they matter in the course.
+3. findings: 3 to 8 key points a student should know, each one self-contained and grounded in the descriptions (keep formulas and parameters exactly as written).
+4. rating: The importance of the community for understanding the course, from 0 (marginal) to 10 (central).
+
+Only use information given in the descriptions; do not invent facts.
+</instructions>
+
+<entities>
+{entities}
+</entities>
+
+<relationships>
+{relationships}
+</relationships>
+"""
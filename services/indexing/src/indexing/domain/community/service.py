@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from collections import defaultdict
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from base import BaseModel
+from base import BaseService
+from pydantic import PrivateAttr
+from graph_db import Neo4jService
+from graph_db import course_label
+from lite_llm import CompletionMessage
+from lite_llm import LiteLLMEmbeddingInput
+from lite_llm import LiteLLMInput
+from lite_llm import LiteLLMService
+from lite_llm import Role
+from logger import get_logger
+
+from indexing.domain.community.louvain import louvain
+from indexing.domain.community.prompts import COMMUNITY_REPORT_PROMPT
+from indexing.shared.settings.community import CommunitySetting
+from indexing.shared.utils import tokens_calculator
+
+logger = get_logger(__name__)
+
+# Entity pairs linked by Relationship nodes, weighted by the number of relationships
+COMMUNITY_EDGES = """
+MATCH (source:Entity)-[:RELATED]->(r:Relationship)-[:RELATED]->(target:Entity)
+WHERE source <> target
+RETURN source.name AS source, target.name AS target, count(r) AS weight
+"""
+
+COMMUNITY_ENTITIES = """
+UNWIND $names AS name
+MATCH (e:Entity {name: name})-[:DESCRIBED]->(d:Description)
+WITH e, d ORDER BY d.updated_at DESC
+WITH e, collect(d) AS descriptions
+RETURN e.name AS name,
+       e.type AS type,
+       [d IN descriptions[..$descriptions_per_entity] | d.text] AS descriptions,
+       [d IN descriptions WHERE d.course_code IS NOT NULL | d.course_code] AS course_codes,
+       [d IN descriptions WHERE d.week_number IS NOT NULL | d.week_number] AS week_numbers,
+       descriptions[0].updated_at AS updated_at
+"""
+
+COMMUNITY_RELATIONSHIPS = """
+MATCH (source:Entity)-[:RELATED]->(r:Relationship)-[:RELATED]->(target:Entity)
+WHERE source.name IN $names AND target.name IN $names
+MATCH (r)-[:DESCRIBED]->(d:Description)
+RETURN source.name AS source, target.name AS target, d.text AS description, d.updated_at AS updated_at
+"""
+
+COMMUNITY_SIGNATURES = """
+MATCH (c:Community)
+RETURN c.uid AS uid, c.signature AS signature, c.course_codes AS course_codes
+"""
+
+# <LABELS> sets the course labels of the community (see graph_db.course_label),
+# read by the per-course community indexes, and removes the labels of the
+# courses it no longer has
+WRITE_COMMUNITY = """
+MERGE (c:Community {uid: $uid})
+<LABELS>
+SET c.signature = $signature,
+    c.title = $title,
+    c.summary = $summary,
+    c.findings = $findings,
+    c.rating = $rating,
+    c.size = size($names),
+    c.course_codes = $course_codes,
+    c.week_numbers = $week_numbers,
+    c.embedding = $embedding,
+    c.updated_at = timestamp()
+WITH c
+CALL {
+  WITH c
+  OPTIONAL MATCH (:Entity)-[old:IN_COMMUNITY]->(c)
+  DELETE old
+}
+UNWIND $names AS name
+MATCH (e:Entity {name: name})
+MERGE (e)-[:IN_COMMUNITY]->(c)
+RETURN count(e) AS members
+"""
+
+DELETE_COMMUNITIES = """
+MATCH (c:Community)
+WHERE NOT c.uid IN $uids
+DETACH DELETE c
+RETURN count(*) AS removed
+"""
+
+
+class CommunityReport(BaseModel):
+    title: str
+    summary: str
+    findings: List[str]
+    rating: float
+
+
+class CommunityOutput(BaseModel):
+    communities: int = 0
+    reports: int = 0
+    reused: int = 0
+    failed: int = 0
+    removed: int = 0
+
+
+class _Community(BaseModel):
+    uid: str
+    names: List[str]
+    # weighted degree of every member inside the community
+    strength: Dict[str, float]
+
+
+class CommunityService(BaseService):
+    """Detect communities of the Entity/Relationship graph and summarize them.
+
+    The entities are partitioned with Louvain over the relationship counts.
+    Every community of at least ``min_community_size`` entities gets a
+    ``Community`` node holding an LLM report (title, summary, findings,
+    rating), the embedding of its title and summary and the courses and weeks
+    of its entities, linked from its members by ``IN_COMMUNITY``. It carries
+    the label of every course, so that scoped searches read the per-course
+    community indexes.
+
+    A community is identified by its members; its report is only rewritten
+    when a member description or a relationship between members changed
+    since the previous run, so that repeated runs cost few LLM calls.
+    """
+
+    neo4j_service: Neo4jService
+    llm_service: LiteLLMService
+    settings: CommunitySetting
+
+    async def process(self, inputs: Optional[Any] = None) -> CommunityOutput:
+        output = CommunityOutput()
+        communities = await self._detect()
+        if communities is None:
+            output.failed += 1
+            return output
+        output.communities = len(communities)
+
+        rows = await self.neo4j_service.execute_read(
+            COMMUNITY_SIGNATURES,
+            {},
+            output_format='records',
+            query_name='COMMUNITY_SIGNATURES',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to read community signatures', extra={'error': rows.error})
+            output.failed += 1
+            return output
+        signatures = {row['uid']: row['signature'] for row in rows}
+        course_codes = {row['uid']: row['course_codes'] or [] for row in rows}
+
+        semaphore = asyncio.Semaphore(self.settings.max_concurrent_reports)
+
+        async def summarize(community: _Community) -> str:
+            async with semaphore:
+                try:
+                    return await self._summarize(
+                        community, signatures.get(community.uid), course_codes.get(community.uid, []),
+                    )
+                except Exception as e:
+                    logger.exception('Community report failed', extra={'community': community.uid, 'error': str(e)})
+                    return 'failed'
+
+        results = await asyncio.gather(*(summarize(community) for community in communities))
+        for result in results:
+            setattr(output, result, getattr(output, result) + 1)
+
+        # communities whose report failed keep their previous node and are retried next run
+        rows = await self.neo4j_service.execute_write(
+            DELETE_COMMUNITIES,
+            {'uids': [community.uid for community in communities]},
+            output_format='records',
+            query_name='DELETE_COMMUNITIES',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to delete outdated communities', extra={'error': rows.error})
+        else:
+            output.removed = rows[0]['removed']
+
+        logger.info('Community reports updated', extra=output.model_dump())
+        return output
+
+    async def _detect(self) -> Optional[List[_Community]]:
+        rows = await self.neo4j_service.execute_read(
+            COMMUNITY_EDGES,
+            {},
+            output_format='records',
+            query_name='COMMUNITY_EDGES',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to read the entity graph', extra={'error': rows.error})
+            return None
+
+        edges: Dict[tuple[str, str], float] = defaultdict(float)
+        for row in rows:
+            edges[(row['source'], row['target'])] += row['weight']
+        partition = await asyncio.to_thread(
+            louvain, edges, self.settings.resolution, self.settings.seed,
+        )
+
+        strength: Dict[str, float] = defaultdict(float)
+        for (source, target), weight in edges.items():
+            if partition[source] == partition[target]:
+                strength[source] += weight
+                strength[target] += weight
+        members: Dict[int, List[str]] = defaultdict(list)
+        for name, community in partition.items():
+            members[community].append(name)
+
+        communities = []
+        for names in members.values():
+            if len(names) < self.settings.min_community_size:
+                continue
+            names = sorted(names)
+            communities.append(
+                _Community(
+                    uid=hashlib.sha256('\n'.join(names).encode()).hexdigest()[:16],
+                    names=names,
+                    strength={name: strength[name] for name in names},
+                )
+            )
+        return communities
+
+    async def _summarize(
+        self,
+        community: _Community,
+        previous_signature: Optional[str],
+        previous_course_codes: List[str],
+    ) -> str:
+        """Write the report of a community if it changed.
+
+        Returns:
+            str: The ``CommunityOutput`` counter of the outcome.
+        """
+        parameters = {'names': community.names, 'descriptions_per_entity': self.settings.descriptions_per_entity}
+        entities = await self.neo4j_service.execute_read(
+            COMMUNITY_ENTITIES,
+            parameters,
+            output_format='records',
+            query_name='COMMUNITY_ENTITIES',
+        )
+        relationships = await self.neo4j_service.execute_read(
+            COMMUNITY_RELATIONSHIPS,
+            parameters,
+            output_format='records',
+            query_name='COMMUNITY_RELATIONSHIPS',
+        )
+        if not isinstance(entities, list) or not isinstance(relationships, list):
+            logger.error('Failed to read the community context', extra={'community': community.uid})
+            return 'failed'
+
+        updated_at = max((row['updated_at'] or 0 for row in [*entities, *relationships]), default=0)
+        signature = f'{community.uid}:{updated_at}'
+        if signature == previous_signature:
+            return 'reused'
+
+        report = await self._report(community, entities, relationships)
+        if report is None:
+            return 'failed'
+
+        embedding = await self.llm_service.embedding_llm_async(
+            inputs=LiteLLMEmbeddingInput(text=f'{report.title}\n{report.summary}')
+        )
+        course_codes = sorted({code for row in entities for code in row['course_codes']})
+        rows = await self.neo4j_service.execute_write(
+            WRITE_COMMUNITY.replace('<LABELS>', self._label_statements(course_codes, previous_course_codes)),
+            {
+                'uid': community.uid,
+                'signature': signature,
+                'title': report.title,
+                'summary': report.summary,
+                'findings': report.findings,
+                'rating': report.rating,
+                'names': community.names,
+                'course_codes': course_codes,
+                'week_numbers': sorted({week for row in entities for week in row['week_numbers']}),
+                'embedding': embedding.embedding,
+            },
+            output_format='records',
+            query_name='WRITE_COMMUNITY',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to write community', extra={'community': community.uid, 'error': rows.error})
+            return 'failed'
+        return 'reports'
+
+    @staticmethod
+    def _label_statements(course_codes: List[str], previous_course_codes: List[str]) -> str:
+        """SET and REMOVE clauses moving a community from its previous course labels to the current ones."""
+        labels = {course_label(code) for code in course_codes}
+        stale = {course_label(code) for code in previous_course_codes} - labels
+        clauses = [f'REMOVE c:{label}' for label in sorted(stale)]
+        clauses += [f'SET c:{label}' for label in sorted(labels)]
+        return '\n'.join(clauses)
+
+    async def _report(
+        self,
+        community: _Community,
+        entities: List[Dict[str, Any]],
+        relationships: List[Dict[str, Any]],
+    ) -> Optional[CommunityReport]:
+        """Ask the LLM for the report of the best connected members, within ``max_input_tokens``."""
+        entities = sorted(entities, key=lambda row: community.strength.get(row['name'], 0.0), reverse=True)
+        entities = entities[: self.settings.max_entities_per_community]
+        kept = {row['name'] for row in entities}
+        relationships = [row for row in relationships if row['source'] in kept and row['target'] in kept]
+        relationships.sort(
+            key=lambda row: community.strength[row['source']] + community.strength[row['target']],
+            reverse=True,
+        )
+        relationships = relationships[: self.settings.max_relationships_per_community]
+
+        entity_lines = [f"- {row['name']} ({row['type']}): {' '.join(row['descriptions'])}" for row in entities]
+        relationship_lines = [f"- {row['source']} -> {row['target']}: {row['description']}" for row in relationships]
+        # entities and relationships alternate so that both keep a share of the budget
+        candidates = [
+            (kind, line)
+            for position in range(max(len(entity_lines), len(relationship_lines)))
+            for kind, lines in (('entities', entity_lines), ('relationships', relationship_lines))
+            if position < len(lines)
+            for line in (lines[position],)
+        ]
+        budget = self.settings.max_input_tokens
+        kept_lines: Dict[str, List[str]] = {'entities': [], 'relationships': []}
+        for kind, line in candidates:
+            tokens = tokens_calculator(line)
+            if tokens > budget:
+                continue
+            budget -= tokens
+            kept_lines[kind].append(line)
+
+        output = await self.llm_service.process_async(
+            inputs=LiteLLMInput(
+                messages=[
+                    CompletionMessage(
+                        role=Role.USER,
+                        content=COMMUNITY_REPORT_PROMPT.format(
+                            entities='\n'.join(kept_lines['entities']),
+                            relationships='\n'.join(kept_lines['relationships']) or '-',
+                        ),
+                    )
+                ],
+                response_format=CommunityReport,
+            )
+        )
+        if not isinstance(output.response, CommunityReport):
+            logger.error('Community report generation failed', extra={'community': community.uid})
+            return None
+        return output.response
+
+
+class CommunityGate(BaseModel):
+    """Runs the community updates of the process one at a time.
+
+    An update reads and replaces the communities of the whole graph, so two
+    concurrent updates would delete each other's Community nodes. An update
+    requested while another one runs waits for it; one requested while an
+    update is already waiting is skipped, since the waiting update starts
+    after the rows of the request were written.
+    """
+
+    _lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _waiting: bool = PrivateAttr(default=False)
+
+    async def run(self, service: CommunityService) -> Optional[CommunityOutput]:
+        """Run a community update.
+
+        Args:
+            service (CommunityService): The service running the update.
+
+        Returns:
+            Optional[CommunityOutput]: The update counters, None if skipped.
+        """
+        if self._waiting:
+            return None
+        self._waiting = waiting = True
+        try:
+            async with self._lock:
+                self._waiting = waiting = False
+                return await service.process()
+        finally:
+            # cancelled while waiting: the next request waits in its place
+            if waiting:
+                self._waiting = False
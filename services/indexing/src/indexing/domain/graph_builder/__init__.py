@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from .entity_keys import backfill_entity_keys
 from .service import BuilderInput
 from .service import BuilderOutput
 from .service import BuilderService
@@ -8,4 +9,5 @@ __all__ = [
     'BuilderService',
     'BuilderInput', 
     'BuilderOutput',
+    'backfill_entity_keys',
 ]
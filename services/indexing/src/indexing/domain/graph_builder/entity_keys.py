@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from graph_db import Neo4jService
+from logger import get_logger
+
+from indexing.domain.graph_builder.resolution import normalize_entity_name
+
+logger = get_logger(__name__)
+
+ENTITIES_WITHOUT_KEY = """
+MATCH (entity:Entity)
+WHERE entity.normalized_name IS NULL
+RETURN entity.name AS name
+LIMIT $batch_size
+"""
+
+SET_ENTITY_KEYS = """
+UNWIND $rows AS row
+MATCH (entity:Entity {name: row.name})
+SET entity.normalized_name = row.normalized_name
+RETURN count(entity) AS entities
+"""
+
+
+async def backfill_entity_keys(neo4j_service: Neo4jService, batch_size: int = 1000) -> int:
+    """Stamp the normalized name on the Entities written before it was persisted.
+
+    Entity resolution links the entities of a new document to the graph
+    through ``Entity.normalized_name``; the normalization is done in Python,
+    so older Entities are read and written back in batches.
+
+    Args:
+        neo4j_service (Neo4jService): The graph database.
+        batch_size (int): Entities stamped per write transaction.
+
+    Returns:
+        int: The number of stamped Entities, -1 on failure.
+    """
+    stamped = 0
+    while True:
+        rows = await neo4j_service.execute_read(
+            ENTITIES_WITHOUT_KEY,
+            {'batch_size': batch_size},
+            output_format='records',
+            query_name='ENTITIES_WITHOUT_KEY',
+        )
+        if not isinstance(rows, list):
+            logger.error('Failed to read the entities without a normalized name', extra={'error': rows.error})
+            return -1
+        if not rows:
+            break
+
+        result = await neo4j_service.execute_write(
+            SET_ENTITY_KEYS,
+            {
+                'rows': [
+                    {'name': row['name'], 'normalized_name': normalize_entity_name(row['name'])}
+                    for row in rows
+                ],
+            },
+            output_format='records',
+            query_name='SET_ENTITY_KEYS',
+        )
+        if not isinstance(result, list):
+            logger.error('Failed to stamp the entity normalized names', extra={'error': result.error})
+            return -1
+        stamped += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    if stamped:
+        logger.info('Entity normalized names backfilled', extra={'entities': stamped})
+    return stamped
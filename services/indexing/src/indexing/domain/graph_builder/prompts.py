@@ -1,4 +1,4 @@
-GRAPH_EXTRACTION_PROMPT = """<role>
+GRAPH_EXTRACTION_INSTRUCTIONS = """<role>
 You are an expert in analyzing IT knowledge documents and educational materials, specialized in extracting structured information to build knowledge graphs for generating multiple-choice questions (MCQs) in the IT domain. You have particular expertise in extracting mathematical formulas, equations, and technical details.
 </role>
 
@@ -87,7 +87,9 @@ From the provided text, extract entities and relationships to build a knowledge
 - Focus on extracting knowledge that can be used to generate educational questions
 - **PRIORITY: Do not miss any mathematical formulas, algorithms, parameters, or equations mentioned in the text**
 </constraints>
+"""
 
+GRAPH_EXTRACTION_PROMPT = GRAPH_EXTRACTION_INSTRUCTIONS + """
 <output>
 Định dạng kết quả như sau:
 
@@ -108,3 +110,34 @@ Ví dụ với tập trung vào công thức toán:
 The context: {input_text}
 
 Result:"""
+
+
+# Several chunks share one call: every record carries the reference of the chunk it was extracted from
+GRAPH_EXTRACTION_PACKED_PROMPT = GRAPH_EXTRACTION_INSTRUCTIONS + """
+<packed_input>
+The context contains several independent chunks, each wrapped as [CHUNK]<|>chunk_ref ... [/CHUNK].
+- Process every chunk separately, exactly as if it were the only text provided.
+- Only create relationships between entities extracted from the same chunk.
+- If the same entity appears in several chunks, output it once per chunk with the description from that chunk.
+- Start every record with the chunk_ref of the chunk it was extracted from.
+</packed_input>
+
+<output>
+Định dạng kết quả như sau:
+
+[ENTITY]<|>chunk_ref<|>entity_name<|>entity_type<|>detailed_entity_description[/ENTITY]
+[RELATIONSHIP]<|>chunk_ref<|>source_entity<|>target_entity<|>relationship_type<|>detailed_relationship_description[/RELATIONSHIP]
+
+Ví dụ:
+[ENTITY]<|>C1<|>Support Vector Machine<|>concept<|>Support Vector Machine là một thuật toán phân loại mạnh mẽ tìm siêu phẳng tối ưu để phân tách các lớp dữ liệu với margin tối đa.[/ENTITY]
+[ENTITY]<|>C1<|>w^T x + b = 0<|>formula<|>w^T x + b = 0 là phương trình định nghĩa siêu phẳng phân tách trong Support Vector Machine, trong đó w là vector trọng số, x là vector đặc trưng, và b là bias term.[/ENTITY]
+[ENTITY]<|>C2<|>C<|>parameter<|>C là tham số regularization trong SVM điều khiển sự cân bằng giữa việc tối đa hóa margin và tối thiểu hóa lỗi phân loại.[/ENTITY]
+[ENTITY]<|>C2<|>ξᵢ<|>parameter<|>ξᵢ (slack variables) là các biến nới lỏng trong Soft Margin SVM cho phép một số điểm dữ liệu vi phạm margin.[/ENTITY]
+[RELATIONSHIP]<|>C1<|>Support Vector Machine<|>w^T x + b = 0<|>uses<|>Support Vector Machine sử dụng phương trình w^T x + b = 0 để định nghĩa siêu phẳng phân tách tối ưu.[/RELATIONSHIP]
+[RELATIONSHIP]<|>C2<|>C<|>ξᵢ<|>controls<|>Tham số C kiểm soát penalty cho các slack variables ξᵢ trong hàm mục tiêu: min(1/2||w||² + C∑ξᵢ).[/RELATIONSHIP]
+</output>
+
+The chunks:
+{input_text}
+
+Result:"""
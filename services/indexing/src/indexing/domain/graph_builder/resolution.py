@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import numpy as np
+
+NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+
+def normalize_entity_name(name: str) -> str:
+    """Normalize an entity name for exact matching.
+
+    Case, unicode composition, punctuation and repeated whitespace are
+    ignored; diacritics are kept since they are meaningful in Vietnamese.
+
+    Args:
+        name (str): The extracted entity name.
+
+    Returns:
+        str: The normalized name.
+    """
+    name = unicodedata.normalize('NFKC', name).casefold()
+    return NON_WORD_PATTERN.sub(' ', name).strip()
+
+
+def _acronym(normalized_name: str) -> Optional[str]:
+    words = normalized_name.split()
+    if len(words) < 2:
+        return None
+    return ''.join(word[0] for word in words)
+
+
+def cluster_names(
+    names: List[str],
+    embeddings: Dict[str, List[float]],
+    threshold: float,
+    types: Optional[Dict[str, str]] = None,
+) -> Dict[str, int]:
+    """Cluster normalized names by cosine similarity of their embeddings.
+
+    Clusters are built by complete linkage: two clusters are merged, most
+    similar pair first, only when every pair of their names has a cosine
+    similarity of at least ``threshold``, so that a chain of similar names
+    never joins two distant ones. Names of different types are never merged.
+
+    An acronym then joins the cluster of its expansion (e.g. "svm" and
+    "support vector machine") only when all the names it abbreviates are in
+    a single cluster of the same type; an ambiguous acronym such as "lr"
+    ("linear regression", "learning rate") stays alone.
+
+    Args:
+        names (List[str]): Distinct normalized names.
+        embeddings (Dict[str, List[float]]): Name embeddings, names without one
+            are only linked by acronym.
+        threshold (float): Minimum cosine similarity of every pair of a cluster.
+        types (Optional[Dict[str, str]]): The entity type of every name.
+
+    Returns:
+        Dict[str, int]: The cluster label of every name.
+    """
+    types = types or {}
+    labels = list(range(len(names)))
+    members: Dict[int, List[int]] = {index: [index] for index in range(len(names))}
+
+    def merge(left: int, right: int) -> None:
+        left, right = labels[left], labels[right]
+        keep, drop = min(left, right), max(left, right)
+        for index in members[drop]:
+            labels[index] = keep
+        members[keep].extend(members.pop(drop))
+
+    embedded = [index for index, name in enumerate(names) if embeddings.get(name)]
+    if len(embedded) > 1:
+        matrix = np.asarray([embeddings[names[index]] for index in embedded], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        similarity = matrix @ matrix.T
+        position = {index: row for row, index in enumerate(embedded)}
+        pairs = np.argwhere(np.triu(similarity >= threshold, k=1))
+        order = np.argsort(-similarity[pairs[:, 0], pairs[:, 1]], kind='stable') if len(pairs) else []
+        for left, right in pairs[order]:
+            left, right = embedded[left], embedded[right]
+            if labels[left] == labels[right] or types.get(names[left]) != types.get(names[right]):
+                continue
+            rows = [position[index] for index in members[labels[left]]]
+            columns = [position[index] for index in members[labels[right]]]
+            if similarity[np.ix_(rows, columns)].min() >= threshold:
+                merge(left, right)
+
+    positions = {name: index for index, name in enumerate(names)}
+    expansions: Dict[str, List[int]] = {}
+    for index, name in enumerate(names):
+        acronym = _acronym(name)
+        if acronym and len(acronym) > 1 and acronym in positions and acronym != name:
+            expansions.setdefault(acronym, []).append(index)
+    for acronym, indexes in expansions.items():
+        if len({labels[index] for index in indexes}) != 1:
+            continue
+        expansion = indexes[0]
+        if types.get(acronym) == types.get(names[expansion]) and labels[positions[acronym]] != labels[expansion]:
+            merge(positions[acronym], expansion)
+
+    return {name: labels[index] for index, name in enumerate(names)}
+
+
+def resolve_names(
+    entities: List[Dict],
+    name_embeddings: Dict[str, List[float]],
+    threshold: float,
+) -> Dict[str, str]:
+    """Find the names that refer to the same concept.
+
+    Names are clustered by :func:`cluster_names`, each name with its most
+    frequent type. Every cluster of names is written under its most
+    frequent surface form (the longest one on ties).
+
+    Args:
+        entities (List[Dict]): Extracted entities.
+        name_embeddings (Dict[str, List[float]]): Embeddings of the normalized names.
+        threshold (float): Minimum cosine similarity to merge two names.
+
+    Returns:
+        Dict[str, str]: The canonical name of every normalized name.
+    """
+    names = list(dict.fromkeys(normalize_entity_name(entity['entity_name']) for entity in entities))
+    name_types: Dict[str, Counter] = {}
+    for entity in entities:
+        name_types.setdefault(normalize_entity_name(entity['entity_name']), Counter())[entity['entity_type']] += 1
+    labels = cluster_names(
+        names,
+        name_embeddings,
+        threshold,
+        types={name: counter.most_common(1)[0][0] for name, counter in name_types.items()},
+    )
+
+    surface_forms: Dict[int, Counter] = {}
+    for entity in entities:
+        label = labels[normalize_entity_name(entity['entity_name'])]
+        surface_forms.setdefault(label, Counter())[entity['entity_name']] += 1
+
+    canonical_names = {
+        label: max(counter.items(), key=lambda item: (item[1], len(item[0])))[0]
+        for label, counter in surface_forms.items()
+    }
+    return {name: canonical_names[label] for name, label in labels.items()}
+
+
+def entity_types(entities: List[Dict], name_map: Dict[str, str]) -> Dict[str, str]:
+    """The most frequent type of every canonical name."""
+    types: Dict[str, Counter] = {}
+    for entity in entities:
+        canonical = name_map[normalize_entity_name(entity['entity_name'])]
+        types.setdefault(canonical, Counter())[entity['entity_type']] += 1
+    return {name: counter.most_common(1)[0][0] for name, counter in types.items()}
+
+
+def link_known_names(
+    name_map: Dict[str, str],
+    name_embeddings: Dict[str, List[float]],
+    known_names: Dict[str, str],
+    candidates: Dict[str, List[Dict]],
+    threshold: float,
+) -> Dict[str, str]:
+    """Point the canonical names at the entities already in the graph.
+
+    A cluster of names takes the name of a known entity whose normalized name
+    is one of its names (the one shared by most of its names); otherwise the
+    name of the most similar candidate whose name embedding is at least
+    ``threshold`` similar to every embedded name of the cluster, the complete
+    linkage of :func:`cluster_names`.
+
+    Args:
+        name_map (Dict[str, str]): Canonical name of every normalized name.
+        name_embeddings (Dict[str, List[float]]): Embeddings of the normalized names.
+        known_names (Dict[str, str]): Graph entity name of every known normalized name.
+        candidates (Dict[str, List[Dict]]): Graph entities similar to every canonical
+            name (``name`` and ``embedding``), most similar first.
+        threshold (float): Minimum cosine similarity to link two names.
+
+    Returns:
+        Dict[str, str]: The name map, with the linked canonical names replaced.
+    """
+    clusters: Dict[str, List[str]] = {}
+    for name, canonical in name_map.items():
+        clusters.setdefault(canonical, []).append(name)
+
+    linked: Dict[str, str] = {}
+    for canonical, names in clusters.items():
+        matches = Counter(known_names[name] for name in names if name in known_names)
+        if matches:
+            linked[canonical] = min(matches, key=lambda known: (-matches[known], known))
+            continue
+        embedded = [name_embeddings[name] for name in names if name_embeddings.get(name)]
+        if not embedded:
+            continue
+        matrix = np.asarray(embedded, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        for candidate in candidates.get(canonical, []):
+            vector = np.asarray(candidate['embedding'], dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm and (matrix @ (vector / norm)).min() >= threshold:
+                linked[canonical] = candidate['name']
+                break
+
+    return {name: linked.get(canonical, canonical) for name, canonical in name_map.items()}
+
+
+def merge_entities(entities: List[Dict], name_map: Dict[str, str], max_descriptions: int) -> List[Dict]:
+    """Merge the entities of every canonical name into one entity.
+
+    The distinct descriptions of an entity, at most ``max_descriptions`` in
+    extraction order, are merged into a single description. The merged entity
+    keeps every chunk that mentions it (``chunk_ids``); its description is
+    mapped back to the first one (``chunk_id``).
+
+    Args:
+        entities (List[Dict]): Extracted entities.
+        name_map (Dict[str, str]): Canonical name of every normalized name.
+        max_descriptions (int): Maximum number of descriptions merged per entity.
+
+    Returns:
+        List[Dict]: One entity per canonical name.
+    """
+    types = entity_types(entities, name_map)
+    merged: Dict[str, Dict] = {}
+    seen_descriptions: Dict[str, set] = {}
+    for entity in entities:
+        name = name_map[normalize_entity_name(entity['entity_name'])]
+        description_key = normalize_entity_name(entity['entity_description'])
+        if name not in merged:
+            merged[name] = {
+                'chunk_id': entity['chunk_id'],
+                'chunk_ids': [entity['chunk_id']],
+                'entity_name': name,
+                'entity_type': types[name],
+                'entity_description': entity['entity_description'],
+            }
+            seen_descriptions[name] = {description_key}
+            continue
+        if entity['chunk_id'] not in merged[name]['chunk_ids']:
+            merged[name]['chunk_ids'].append(entity['chunk_id'])
+        if description_key not in seen_descriptions[name] and len(seen_descriptions[name]) < max_descriptions:
+            merged[name]['entity_description'] += ' ' + entity['entity_description']
+            seen_descriptions[name].add(description_key)
+
+    return list(merged.values())
+
+
+def resolve_relationships(relationships: List[Dict], name_map: Dict[str, str]) -> List[Optional[Dict]]:
+    """Point relationships at the canonical entity names.
+
+    Args:
+        relationships (List[Dict]): Extracted relationships.
+        name_map (Dict[str, str]): Canonical name of every normalized name.
+
+    Returns:
+        List[Optional[Dict]]: The resolved relationships, in input order; None
+            for relationships that became self-loops or duplicates.
+    """
+    resolved: List[Optional[Dict]] = []
+    seen = set()
+    for rel in relationships:
+        source = name_map.get(normalize_entity_name(rel['source_entity']), rel['source_entity'])
+        target = name_map.get(normalize_entity_name(rel['target_entity']), rel['target_entity'])
+        key = (rel['chunk_id'], source, target, rel['relationship'], normalize_entity_name(rel['relationship_description']))
+        if source == target or key in seen:
+            resolved.append(None)
+            continue
+        seen.add(key)
+        resolved.append({**rel, 'source_entity': source, 'target_entity': target})
+    return resolved
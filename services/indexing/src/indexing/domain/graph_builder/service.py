@@ -3,15 +3,33 @@
 from __future__ import annotations
 
 import asyncio
-import re
 import uuid
-from typing import List, Dict
+from typing import List, Dict, Optional
+from pydantic import Field
 from base import BaseModel
 from base import BaseService
 from logger import get_logger
 from lite_llm import LiteLLMService, LiteLLMInput, CompletionMessage, Role, LiteLLMEmbeddingInput
 from graph_db import Neo4jService
+from open_search import OpenSearchService
+from neo4j.api import AsyncBookmarkManager
 from indexing.domain.graph_builder.prompts import GRAPH_EXTRACTION_PROMPT
+from indexing.domain.graph_builder.prompts import GRAPH_EXTRACTION_PACKED_PROMPT
+from indexing.domain.graph_builder.resolution import entity_types
+from indexing.domain.graph_builder.resolution import link_known_names
+from indexing.domain.graph_builder.resolution import merge_entities
+from indexing.domain.graph_builder.resolution import normalize_entity_name
+from indexing.domain.graph_builder.resolution import resolve_names
+from indexing.domain.graph_builder.resolution import resolve_relationships
+from indexing.domain.graph_builder.utils import ExtractionStreamParser
+from indexing.domain.graph_builder.utils import chunk_refs
+from indexing.domain.graph_builder.utils import compact_embedding
+from indexing.domain.graph_builder.utils import format_packed_chunks
+from indexing.domain.graph_builder.utils import pack_chunks
+from indexing.domain.graph_builder.writer import CHUNK, ENTITY, RELATIONSHIP
+from indexing.domain.graph_builder.writer import GraphWriter
+from indexing.shared.settings.graph_builder import GraphBuilderSetting
+from indexing.domain.job_queue import ProgressReporter
 
 logger = get_logger(__name__)
 
@@ -21,12 +39,32 @@ logger = get_logger(__name__)
 class BuilderInput(BaseModel):
     chunks: List[Dict[str, str]]
     document_file_name: str
+    course_code: Optional[str] = None
+    week_number: Optional[int] = None
 
 
 class BuilderOutput(BaseModel):
     message: str
     entities_created: int
     relationships_created: int
+    # Các entity có relationship vừa được ghi (neighborhood cần materialize lại)
+    related_entities: List[str] = []
+
+
+class _BuildRun(BaseModel):
+    """Trạng thái của một lần build: các task embedding chạy song song với extraction."""
+
+    document_file_name: str
+    chunk_texts: Dict[str, str]
+    embedding_semaphore: asyncio.Semaphore
+    # Mọi lệnh ghi đi qua một writer duy nhất nên MERGE theo tên entity không bị race
+    writer: GraphWriter
+    chunk_nodes: Dict[str, asyncio.Task] = Field(default_factory=dict)
+    # Entities chờ resolution và embedding của tên (theo tên đã chuẩn hoá)
+    entities: List[Dict] = Field(default_factory=list)
+    name_embeddings: Dict[str, asyncio.Task] = Field(default_factory=dict)
+    entity_tasks: List[asyncio.Task] = Field(default_factory=list)
+    relationship_embeddings: List[tuple[Dict, asyncio.Task]] = Field(default_factory=list)
 
 
 class BuilderService(BaseService):
@@ -34,108 +72,405 @@ class BuilderService(BaseService):
     
     llm_service: LiteLLMService
     neo4j_service: Neo4jService
+    settings: GraphBuilderSetting
+    progress_reporter: Optional[ProgressReporter] = None
+    opensearch_service: Optional[OpenSearchService] = None
+    # Vector index trên embedding tên của Entity, dùng để nối entity với graph khi resolution
+    entity_index_name: str = 'entity_name_index'
+    # Số rows đã ghi theo loại qua mọi lần process, kể cả các lần lỗi
+    written: Dict[str, int] = Field(default_factory=dict)
+    
+    async def _report(self, **deltas: int) -> None:
+        """Tăng các bộ đếm tiến độ của job (nếu có)."""
+        if self.progress_reporter:
+            await self.progress_reporter.increment(**deltas)
     
     async def process(self, input_data: BuilderInput) -> BuilderOutput:
-        """Xử lý toàn bộ pipeline theo schema mới."""
+        """Xử lý toàn bộ pipeline theo schema mới.
+
+        Kết quả extraction được stream từ LLM: mỗi entity hoàn chỉnh được embedding và
+        đưa vào GraphWriter ngay trong khi LLM vẫn đang sinh phần còn lại; writer ghi
+        xuống Neo4j theo batch. Relationships được embedding ngay nhưng chỉ được đưa
+        vào writer sau khi mọi entity đã vào hàng đợi.
+        """
         logger.info(f"Bắt đầu xử lý {len(input_data.chunks)} chunks cho document {input_data.document_file_name}")
         
-        all_entities = []
-        all_relationships = []
-        
-        # 1. Extract entities và relationships từ từng chunk
-        for chunk in input_data.chunks:
-            entities, relationships = await self._extract_from_chunk(
-                chunk["chunk_id"], 
-                chunk["chunk_text"]
-            )
-            all_entities.extend(entities)
-            all_relationships.extend(relationships)
-        
-        logger.info(f"Đã extract {len(all_entities)} entities và {len(all_relationships)} relationships")
-        
-        # 2. Tạo Document node trước
-        await self._create_document_node(input_data.document_file_name)
+        # 1. Tạo Document node trước để entity có thể được ghi ngay khi extract xong
+        # Các lệnh ghi của lần build dùng chung bookmark để luôn thấy Document node vừa tạo
+        bookmark_manager = self.neo4j_service.bookmark_manager()
+        await self._create_document_node(
+            input_data.document_file_name,
+            bookmark_manager,
+            course_code=input_data.course_code,
+            week_number=input_data.week_number,
+        )
         
-        # 3. Tạo schema với entities
-        entities_created = await self._create_entities_with_schema(
-            all_entities, input_data.document_file_name, input_data.chunks
+        run = _BuildRun(
+            document_file_name=input_data.document_file_name,
+            chunk_texts={chunk["chunk_id"]: chunk["chunk_text"] for chunk in input_data.chunks},
+            embedding_semaphore=asyncio.Semaphore(self.settings.max_concurrent_embeddings),
+            writer=GraphWriter(
+                neo4j_service=self.neo4j_service,
+                batch_size=self.settings.write_batch_size,
+                flush_interval=self.settings.write_flush_interval,
+                max_queued_rows=self.settings.max_queued_rows,
+                progress_reporter=self.progress_reporter,
+                bookmark_manager=bookmark_manager,
+                opensearch_service=self.opensearch_service if self.settings.lexical_dual_write else None,
+                lexical_index_name=self.opensearch_service.settings.index_name if self.opensearch_service else None,
+                course_code=input_data.course_code,
+                week_number=input_data.week_number,
+            ),
         )
+        run.writer.start()
+        
+        try:
+            # 2. Extract entities và relationships, gộp các chunk nhỏ vào chung một lần gọi LLM
+            if self.settings.pack_chunks:
+                packs = pack_chunks(
+                    input_data.chunks,
+                    self.settings.max_tokens_per_pack,
+                    self.settings.max_chunks_per_pack,
+                )
+            else:
+                packs = [[chunk] for chunk in input_data.chunks]
+            logger.info(f"Gộp {len(input_data.chunks)} chunks thành {len(packs)} lần gọi extraction")
+            
+            total_entities = 0
+            total_relationships = 0
+            for pack in packs:
+                entities, relationships = await self._extract(pack, run)
+                total_entities += entities
+                total_relationships += relationships
+                await self._report(
+                    extraction_calls=1,
+                    chunks_extracted=len(pack),
+                    entities_extracted=entities,
+                    relationships_extracted=relationships,
+                )
+            
+            logger.info(f"Đã extract {total_entities} entities và {total_relationships} relationships")
+            
+            # 3. Gộp các entity trùng nhau trước khi ghi
+            if self.settings.resolve_entities:
+                await self._resolve_entities(run)
+            
+            # 4. Chờ mọi entity vào hàng đợi ghi
+            await asyncio.gather(*run.entity_tasks)
+            
+            # 5. Tạo relationships với schema
+            await self._create_relationships_with_schema(run)
+        except BaseException:
+            # Lỗi hoặc bị huỷ: dừng các task embedding/ghi còn chạy
+            for task in self._pending_tasks(run):
+                task.cancel()
+            raise
+        finally:
+            # Không còn task nào đưa row vào writer sau khi writer đóng
+            await asyncio.gather(*self._pending_tasks(run), return_exceptions=True)
+            # 6. Ghi nốt các batch còn lại
+            written = await run.writer.close()
+            for kind, count in written.items():
+                self.written[kind] = self.written.get(kind, 0) + count
         
-        # 4. Tạo relationships với schema
-        relationships_created = await self._create_relationships_with_schema(all_relationships)
+        entities_created = written.get(ENTITY, 0)
+        relationships_created = written.get(RELATIONSHIP, 0)
+        logger.info(f"Đã tạo {entities_created}/{total_entities} entities và {relationships_created}/{total_relationships} relationships với schema và embedding")
+        if run.writer.failed:
+            logger.warning(f"Không ghi được một số rows: {run.writer.failed}")
+        if run.writer.lexical_failed:
+            logger.warning(f"Không index được {run.writer.lexical_failed} documents vào OpenSearch")
         
         return BuilderOutput(
             message=f"Thành công! Tạo {entities_created} entities và {relationships_created} relationships theo schema mới",
             entities_created=entities_created,
-            relationships_created=relationships_created
+            relationships_created=relationships_created,
+            related_entities=sorted(run.writer.related_entities),
         )
     
-    async def _extract_from_chunk(self, chunk_id: str, chunk_text: str) -> tuple[List[Dict], List[Dict]]:
-        """Extract entities và relationships từ một chunk bằng LLM."""
+    def _pending_tasks(self, run: _BuildRun) -> List[asyncio.Task]:
+        """Các task embedding/ghi entity chưa xong của lần build."""
+        tasks = [
+            *run.entity_tasks,
+            *run.chunk_nodes.values(),
+            *run.name_embeddings.values(),
+            *(task for _, task in run.relationship_embeddings),
+        ]
+        return [task for task in tasks if not task.done()]
+    
+    async def _extract(self, pack: List[Dict[str, str]], run: _BuildRun) -> tuple[int, int]:
+        """Extract entities và relationships từ một pack chunk bằng LLM.
+
+        Mỗi record hoàn chỉnh được đưa vào pipeline ngay khi nhận được: entity được
+        embedding và ghi (hoặc giữ lại cho resolution, trong khi chunk và tên entity
+        được embedding trước), relationship được embedding trước để ghi sau.
+
+        Returns:
+            tuple[int, int]: Số entities và relationships đã extract.
+        """
+        chunk_ids = [chunk["chunk_id"] for chunk in pack]
+        if len(pack) == 1:
+            prompt = GRAPH_EXTRACTION_PROMPT.format(input_text=pack[0]["chunk_text"])
+            parser = ExtractionStreamParser(chunk_id=pack[0]["chunk_id"])
+        else:
+            # Mỗi chunk được đánh dấu bằng một mã ngắn (C1, C2, ...) để gán lại đúng chunk_id
+            prompt = GRAPH_EXTRACTION_PACKED_PROMPT.format(input_text=format_packed_chunks(pack))
+            parser = ExtractionStreamParser(refs=chunk_refs(pack))
+        
+        llm_input = LiteLLMInput(
+            messages=[
+                CompletionMessage(
+                    role=Role.USER,
+                    content=prompt
+                )
+            ],
+        )
+        
+        counts = {"entities": 0, "relationships": 0}
+        
+        def dispatch(records: tuple[List[Dict], List[Dict]]) -> None:
+            entities, relationships = records
+            for entity in entities:
+                if self.settings.resolve_entities:
+                    run.entities.append(entity)
+                    self._get_chunk_node(entity["chunk_id"], run)
+                    self._get_name_embedding(entity["entity_name"], run)
+                else:
+                    run.entity_tasks.append(asyncio.create_task(self._write_entity(entity, run)))
+            for rel in relationships:
+                run.relationship_embeddings.append(
+                    (rel, asyncio.create_task(self._embed(rel["relationship_description"], run)))
+                )
+            counts["entities"] += len(entities)
+            counts["relationships"] += len(relationships)
+        
         try:
-            # Gọi LLM để extract
-            llm_input = LiteLLMInput(
-                messages=[
-                    CompletionMessage(
-                        role=Role.USER,
-                        content=GRAPH_EXTRACTION_PROMPT.format(input_text=chunk_text)
-                    )
-                ],
-            )
-            
-            response = await self.llm_service.process_async(llm_input)
-            extracted_text = response.response
-            
-            print(extracted_text)
-            
-            # Parse kết quả
-            entities = []
-            relationships = []
-            
-            # Regex để tìm entities: [ENTITY]<|>name<|>type<|>description[/ENTITY]
-            entity_pattern = r'\[ENTITY\]<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+?)\[/ENTITY\]'
-            entity_matches = re.findall(entity_pattern, extracted_text, re.DOTALL)
-            
-            for match in entity_matches:
-                entities.append({
-                    'chunk_id': chunk_id,
-                    'entity_name': match[0].strip(),
-                    'entity_type': match[1].strip().lower(),  # lowercase type
-                    'entity_description': match[2].strip()
-                })
-            
-            # Regex để tìm relationships: [RELATIONSHIP]<|>source<|>target<|>relation<|>description[/RELATIONSHIP]
-            rel_pattern = r'\[RELATIONSHIP\]<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+?)\[/RELATIONSHIP\]'
-            rel_matches = re.findall(rel_pattern, extracted_text, re.DOTALL)
-            
-            for match in rel_matches:
-                relationships.append({
-                    'chunk_id': chunk_id,
-                    'source_entity': match[0].strip(),
-                    'target_entity': match[1].strip(),
-                    'relationship': match[2].strip().lower(),  # lowercase type
-                    'relationship_description': match[3].strip()
-                })
-            
-            logger.info(f"Chunk {chunk_id}: {len(entities)} entities, {len(relationships)} relationships")
-            return entities, relationships
-            
+            if self.settings.stream_extraction:
+                async for delta in self.llm_service.stream_async(llm_input):
+                    dispatch(parser.feed(delta))
+            else:
+                response = await self.llm_service.process_async(llm_input)
+                # process_async trả về response rỗng khi request lỗi
+                if not isinstance(response.response, str) or not response.response:
+                    raise ValueError("LLM không trả về kết quả extraction")
+                dispatch(parser.feed(response.response))
+            dispatch(parser.close())
         except Exception as e:
-            logger.error(f"Lỗi extract chunk {chunk_id}: {e}")
-            return [], []
+            # Extraction lỗi hoặc bị cắt giữa chừng không được coi là "không có entity":
+            # lần build thất bại (các task đã dispatch được huỷ trong process)
+            logger.error(f"Lỗi extract chunks {chunk_ids}: {e}")
+            raise
+        
+        if parser.dropped:
+            logger.warning(f"Bỏ qua {parser.dropped} records có mã chunk không hợp lệ trong pack {chunk_ids}")
+        logger.info(f"Chunks {chunk_ids}: {counts['entities']} entities, {counts['relationships']} relationships")
+        return counts["entities"], counts["relationships"]
+    
+    def _get_name_embedding(self, entity_name: str, run: _BuildRun) -> asyncio.Task:
+        """Lấy task embedding tên entity, mỗi tên đã chuẩn hoá chỉ được embedding một lần."""
+        name = normalize_entity_name(entity_name)
+        if name not in run.name_embeddings:
+            run.name_embeddings[name] = asyncio.create_task(self._embed(entity_name, run))
+        return run.name_embeddings[name]
+    
+    async def _resolve_entities(self, run: _BuildRun) -> None:
+        """Gộp các entity cùng chỉ một khái niệm (SVM / Support Vector Machine / svm).
+
+        Tên được chuẩn hoá rồi gom cụm theo cosine similarity của embedding tên; mỗi cụm
+        được nối với Entity đã có trong graph (của các document trước) nếu khớp tên chuẩn
+        hoá hoặc embedding tên. Mỗi entity chỉ còn một description gộp từ mọi chunk nhắc
+        tới nó. Relationships được trỏ về tên chuẩn, bỏ các self-loop và bản trùng.
+        """
+        names = list(run.name_embeddings)
+        embeddings = await asyncio.gather(*run.name_embeddings.values(), return_exceptions=True)
+        # Tên không embedding được chỉ được gộp theo tên chuẩn hoá
+        name_embeddings = {
+            name: embedding
+            for name, embedding in zip(names, embeddings)
+            if not isinstance(embedding, BaseException)
+        }
+        name_map = resolve_names(run.entities, name_embeddings, self.settings.entity_similarity_threshold)
+        name_map = await self._link_known_names(run, name_map, name_embeddings)
+        entities = merge_entities(run.entities, name_map, self.settings.max_entity_descriptions)
+        for entity in entities:
+            entity["name_embedding"] = name_embeddings.get(normalize_entity_name(entity["entity_name"]))
+        
+        relationship_embeddings = []
+        resolved_relationships = resolve_relationships(
+            [rel for rel, _ in run.relationship_embeddings], name_map
+        )
+        for rel, (_, embedding_task) in zip(resolved_relationships, run.relationship_embeddings):
+            if rel is None:
+                embedding_task.cancel()
+            else:
+                relationship_embeddings.append((rel, embedding_task))
+        
+        logger.info(
+            f"Resolution: {len(run.entities)} -> {len(entities)} entities, "
+            f"{len(set(name_map))} -> {len(set(name_map.values()))} tên, "
+            f"{len(run.relationship_embeddings)} -> {len(relationship_embeddings)} relationships"
+        )
+        run.relationship_embeddings = relationship_embeddings
+        run.entity_tasks.extend(asyncio.create_task(self._write_entity(entity, run)) for entity in entities)
+    
+    async def _link_known_names(
+        self,
+        run: _BuildRun,
+        name_map: Dict[str, str],
+        name_embeddings: Dict[str, List[float]],
+    ) -> Dict[str, str]:
+        """Nối tên chuẩn của các cụm với các Entity đã có trong graph.
+
+        Cụm có tên chuẩn hoá trùng Entity.normalized_name lấy tên của Entity đó; các cụm
+        còn lại được tìm trên vector index embedding tên (cùng type). Lỗi đọc graph chỉ
+        làm mất bước nối, các entity vẫn được ghi theo tên chuẩn của lần build.
+        """
+        known = await self.neo4j_service.execute_read(
+            """
+            MATCH (entity:Entity)
+            WHERE entity.normalized_name IN $names
+            RETURN entity.normalized_name AS normalized_name, entity.name AS name
+            ORDER BY name
+            """,
+            {"names": list(name_map)},
+            output_format="records",
+            query_name="KNOWN_ENTITY_NAMES",
+        )
+        if not isinstance(known, list):
+            logger.warning(f"Không đọc được các entity đã có trong graph: {known.error}")
+            return name_map
+        known_names: Dict[str, str] = {}
+        for record in known:
+            known_names.setdefault(record["normalized_name"], record["name"])
+        
+        types = entity_types(run.entities, name_map)
+        linked = {name_map[name] for name in known_names}
+        clusters = [
+            {
+                "name": canonical,
+                "type": types[canonical],
+                "embedding": name_embeddings[normalize_entity_name(canonical)],
+            }
+            for canonical in dict.fromkeys(name_map.values())
+            if canonical not in linked and name_embeddings.get(normalize_entity_name(canonical))
+        ]
+        candidates: Dict[str, List[Dict]] = {}
+        if clusters:
+            similar = await self.neo4j_service.execute_read(
+                """
+                UNWIND $clusters AS cluster
+                CALL db.index.vector.queryNodes($index_name, $top_k, cluster.embedding)
+                YIELD node, score
+                WHERE score >= $threshold AND node.type = cluster.type AND node.name_embedding IS NOT NULL
+                RETURN cluster.name AS cluster, node.name AS name, node.name_embedding AS embedding
+                ORDER BY cluster, score DESC
+                """,
+                {
+                    "clusters": clusters,
+                    "index_name": self.entity_index_name,
+                    "top_k": self.settings.entity_candidates,
+                    "threshold": self.settings.entity_similarity_threshold,
+                },
+                output_format="records",
+                query_name="SIMILAR_ENTITY_NAMES",
+            )
+            if isinstance(similar, list):
+                for record in similar:
+                    candidates.setdefault(record["cluster"], []).append(record)
+            else:
+                logger.warning(f"Không tìm được entity tương tự trong graph: {similar.error}")
+        
+        linked_map = link_known_names(
+            name_map,
+            name_embeddings,
+            known_names,
+            candidates,
+            self.settings.entity_similarity_threshold,
+        )
+        linked_count = len({canonical for name, canonical in name_map.items() if linked_map[name] != canonical})
+        logger.info(f"Resolution: {linked_count} entities được nối với entity đã có trong graph")
+        return linked_map
+    
+    async def _embed(self, text: str, run: _BuildRun) -> List[float]:
+        """Tạo embedding, giới hạn số request đồng thời."""
+        async with run.embedding_semaphore:
+            result = await self.llm_service.embedding_llm_async(
+                inputs=LiteLLMEmbeddingInput(
+                    text=text,
+                )
+            )
+        return result.embedding
+    
+    def _get_chunk_node(self, chunk_id: str, run: _BuildRun) -> asyncio.Task:
+        """Lấy task tạo Chunk node, mỗi chunk chỉ được embedding và đưa vào writer một lần."""
+        if chunk_id not in run.chunk_nodes:
+            run.chunk_nodes[chunk_id] = asyncio.create_task(self._create_chunk_node(chunk_id, run))
+        return run.chunk_nodes[chunk_id]
+    
+    async def _create_chunk_node(self, chunk_id: str, run: _BuildRun) -> str:
+        """Embedding chunk và đưa Chunk node vào writer, trả về chunk_uid."""
+        chunk_uid = str(uuid.uuid4())
+        chunk_text = run.chunk_texts.get(chunk_id, "Unknown chunk text")
+        chunk_embedding = await self._embed(chunk_text, run)
+        
+        await run.writer.put(
+            CHUNK,
+            {
+                "file_name": run.document_file_name,
+                "chunk_uid": chunk_uid,
+                "chunk_text": chunk_text,
+                "chunk_embedding": chunk_embedding,
+            },
+        )
+        return chunk_uid
     
-    async def _create_document_node(self, file_name: str) -> bool:
-        """Tạo Document node với thuộc tính file_name và uid."""
+    async def _create_document_node(
+        self,
+        file_name: str,
+        bookmark_manager: Optional[AsyncBookmarkManager] = None,
+        course_code: Optional[str] = None,
+        week_number: Optional[int] = None,
+    ) -> bool:
+        """Tạo Document node với thuộc tính file_name, uid và phạm vi (course_code, week_number).
+
+        Document được định danh bởi (course_code, file_name): cùng một file ở hai môn học
+        là hai Document khác nhau. Document không có course_code được MERGE theo file_name
+        trong số các Document không có course_code.
+        """
         try:
             document_uid = str(uuid.uuid4())
             
-            cypher = f"""
-            MERGE (doc:Document {{file_name: '{file_name}'}})
-            SET doc.uid = '{document_uid}',
+            if course_code is not None:
+                merge = "MERGE (doc:Document {course_code: $course_code, file_name: $file_name})"
+            else:
+                merge = """
+            OPTIONAL MATCH (existing:Document {file_name: $file_name})
+            WHERE existing.course_code IS NULL
+            WITH existing LIMIT 1
+            FOREACH (missing IN CASE WHEN existing IS NULL THEN [1] ELSE [] END |
+                CREATE (:Document {file_name: $file_name})
+            )
+            WITH count(*) AS created
+            MATCH (doc:Document {file_name: $file_name})
+            WHERE doc.course_code IS NULL"""
+            
+            cypher = merge + """
+            SET doc.uid = $document_uid,
+                doc.course_code = $course_code,
+                doc.week_number = $week_number,
                 doc.created_at = datetime()
             """
             
-            result = await self.neo4j_service.execute_query(cypher)
+            result = await self.neo4j_service.execute_write(
+                cypher,
+                {
+                    "file_name": file_name,
+                    "document_uid": document_uid,
+                    "course_code": course_code,
+                    "week_number": week_number,
+                },
+                bookmark_manager=bookmark_manager,
+            )
             if result.success:
                 logger.info(f"Tạo Document node thành công: {file_name} (uid: {document_uid})")
                 return True
@@ -147,170 +482,74 @@ class BuilderService(BaseService):
             logger.error(f"Lỗi tạo Document node: {e}")
             return False
     
-    async def _create_entities_with_schema(self, entities: List[Dict], document_file_name: str, chunks: List[Dict]) -> int:
-        """Tạo entities theo schema mới với các thuộc tính đầy đủ và embedding."""
-        if not entities:
-            return 0
-            
-        # Tạo mapping chunk_id -> chunk_text
-        chunk_texts = {chunk["chunk_id"]: chunk["chunk_text"] for chunk in chunks}
-        
-        # Tạo mapping chunk_id -> chunk_uid (mỗi chunk_id chỉ có 1 chunk_uid duy nhất)
-        chunk_uids = {}
-        chunk_embeddings = {}
-        
-        # Tạo embedding cho mỗi chunk text
-        for chunk in chunks:
-            chunk_id = chunk["chunk_id"]
-            chunk_text = chunk["chunk_text"]
-            chunk_uids[chunk_id] = str(uuid.uuid4())
+    async def _write_entity(self, entity: Dict, run: _BuildRun) -> bool:
+        """Embedding description và đưa entity vào writer ngay khi được extract."""
+        try:
+            # Chunk node (tạo một lần) và embedding của description chạy song song.
+            # Chunk row luôn vào hàng đợi trước entity row tham chiếu tới nó.
+            # Entity đã resolution được nhắc tới ở nhiều chunk; description gắn với chunk đầu tiên
+            chunk_ids = entity.get('chunk_ids', [entity['chunk_id']])
+            chunk_uids, desc_embedding = await asyncio.gather(
+                asyncio.gather(*(self._get_chunk_node(chunk_id, run) for chunk_id in chunk_ids)),
+                self._embed(entity['entity_description'], run),
+            )
             
-            # Tạo embedding cho chunk text
-            embedding_result = await self.llm_service.embedding_llm_async(
-                inputs=LiteLLMEmbeddingInput(
-                    text=chunk_text,
-                )
+            await run.writer.put(
+                ENTITY,
+                {
+                    "chunk_uid": chunk_uids[0],
+                    "mentioned_chunk_uids": list(chunk_uids),
+                    "name": entity['entity_name'],
+                    "normalized_name": normalize_entity_name(entity['entity_name']),
+                    "name_embedding": entity.get('name_embedding'),
+                    "entity_type": entity['entity_type'],
+                    "entity_uid": str(uuid.uuid4()),
+                    "desc_uid": str(uuid.uuid4()),
+                    "description": entity['entity_description'],
+                    "desc_embedding": desc_embedding,
+                    "desc_compact_embedding": compact_embedding(
+                        desc_embedding, self.settings.compact_embedding_dimension
+                    ),
+                },
             )
-            chunk_embeddings[chunk_id] = embedding_result.embedding
-        
-        created_count = 0
-        
-        for entity in entities:
-            try:
-                # Generate UIDs
-                entity_uid = str(uuid.uuid4())
-                desc_uid = str(uuid.uuid4())
-                
-                # Get chunk_uid and embedding from mapping
-                chunk_id = entity['chunk_id']
-                chunk_uid = chunk_uids[chunk_id]
-                chunk_embedding = chunk_embeddings[chunk_id]
-                
-                # Escape quotes
-                name = entity['entity_name'].replace("'", "\\'").replace('"', '\\"')
-                description = entity['entity_description'].replace("'", "\\'").replace('"', '\\"')
-                entity_type = entity['entity_type']
-                chunk_text = chunk_texts.get(chunk_id, "Unknown chunk text").replace("'", "\\'").replace('"', '\\"')
-
-                # Tạo embedding cho entity description
-                desc_embedding_result = await self.llm_service.embedding_llm_async(
-                    inputs=LiteLLMEmbeddingInput(
-                        text=entity['entity_description'],
-                    )
-                )
-                desc_embedding = desc_embedding_result.embedding
-
-                # Tạo theo schema mới với chunk và description có embedding
-                cypher = f"""
-                // Tìm Document
-                MATCH (doc:Document {{file_name: '{document_file_name}'}})
-                
-                // Tạo hoặc tìm Chunk theo uid với embedding
-                MERGE (chunk:Chunk {{uid: '{chunk_uid}'}})
-                ON CREATE SET chunk.text = '{chunk_text}',
-                              chunk.embedding = {chunk_embedding}
-
-                // Tạo Entity với name (unique), type (lowercase), uid
-                MERGE (entity:Entity {{name: '{name}'}})
-                SET entity.type = '{entity_type}',
-                    entity.uid = '{entity_uid}'
-                
-                // Tạo Description cho Entity với embedding
-                MERGE (desc:Description {{uid: '{desc_uid}'}})
-                SET desc.chunk_uid = '{chunk_uid}',
-                    desc.text = '{description}',
-                    desc.type = 'ENTITY',
-                    desc.embedding = {desc_embedding}
+            return True
                 
-                // Tạo relationships theo schema
-                MERGE (doc)-[:CONTAINED]->(chunk)
-                MERGE (chunk)-[:MENTIONED]->(entity)
-                MERGE (entity)-[:DESCRIBED]->(desc)      
-                """
-
-                result = await self.neo4j_service.execute_query(cypher)
-
-                if result.success:
-                    created_count += 1
-                    logger.debug(f"Tạo entity với schema: {name} (type: {entity_type})")
-                else:
-                    logger.error(f"Lỗi tạo entity {name}: {result.error}")
-                    
-            except Exception as e:
-                logger.error(f"Lỗi xử lý entity {entity.get('entity_name', 'unknown')}: {e}")
-        
-        logger.info(f"Đã tạo {created_count}/{len(entities)} entities với schema và embedding")
-        return created_count
+        except Exception as e:
+            logger.error(f"Lỗi xử lý entity {entity.get('entity_name', 'unknown')}: {e}")
+            return False
     
-    async def _create_relationships_with_schema(self, relationships: List[Dict]) -> int:
-        """Tạo relationships với schema mới và Description nodes với embedding."""
-        if not relationships:
-            return 0
-            
-        created_count = 0
+    async def _create_relationships_with_schema(self, run: _BuildRun) -> int:
+        """Đưa relationships (kèm embedding của description) vào writer.
+
+        Schema: Entity -> RELATED -> Relationship -> RELATED -> Entity và Relationship -> DESCRIBED -> Description.
+        """
+        queued_count = 0
         
-        for rel in relationships:
+        for rel, embedding_task in run.relationship_embeddings:
             try:
-                # Generate UIDs
-                relationship_uid = str(uuid.uuid4())
-                desc_uid = str(uuid.uuid4())
+                # Embedding đã được tạo trong lúc extraction
+                desc_embedding = await embedding_task
                 
-                # Get chunk_id to find the correct chunk_uid
-                chunk_id = rel['chunk_id']
-                
-                # Escape quotes
-                source = rel['source_entity'].replace("'", "\\'").replace('"', '\\"')
-                target = rel['target_entity'].replace("'", "\\'").replace('"', '\\"')
-                rel_type = rel['relationship']
-                description = rel['relationship_description'].replace("'", "\\'").replace('"', '\\"')
-                
-                # Tạo embedding cho relationship description
-                desc_embedding_result = await self.llm_service.embedding_llm_async(
-                    inputs=LiteLLMEmbeddingInput(
-                        text=rel['relationship_description'],
-                    )
+                await run.writer.put(
+                    RELATIONSHIP,
+                    {
+                        "source": rel['source_entity'],
+                        "target": rel['target_entity'],
+                        "relationship_uid": str(uuid.uuid4()),
+                        "desc_uid": str(uuid.uuid4()),
+                        "description": rel['relationship_description'],
+                        "desc_embedding": desc_embedding,
+                        "desc_compact_embedding": compact_embedding(
+                            desc_embedding, self.settings.compact_embedding_dimension
+                        ),
+                    },
                 )
-                desc_embedding = desc_embedding_result.embedding
-                
-                # Tạo schema: Entity -> RELATED -> Relationship -> RELATED -> Entity và Relationship -> DESCRIBED -> Description
-                cypher = f"""
-                // Tìm source và target entities
-                MATCH (source:Entity {{name: '{source}'}})
-                MATCH (target:Entity {{name: '{target}'}})
-                
-                // Tìm Chunk node để lấy uid của nó
-                MATCH (chunk:Chunk)-[:MENTIONED]->(source)
-                WITH source, target, chunk.uid as chunk_uid
-                
-                // Tạo Relationship node chỉ có uid
-                MERGE (relationship:Relationship {{uid: '{relationship_uid}'}})
-                
-                // Tạo Description cho relationship với chunk_uid và embedding
-                MERGE (desc:Description {{uid: '{desc_uid}'}})
-                SET desc.chunk_uid = chunk_uid,
-                    desc.text = '{description}',
-                    desc.type = 'RELATIONSHIP',
-                    desc.embedding = {desc_embedding}
-                
-                // Tạo schema relationships
-                MERGE (source)-[:RELATED]->(relationship)
-                MERGE (relationship)-[:RELATED]->(target)
-                MERGE (relationship)-[:DESCRIBED]->(desc)
-                """
-                
-                result = await self.neo4j_service.execute_query(cypher)
-                
-                if result.success:
-                    created_count += 1
-                    logger.debug(f"Tạo relationship schema: {source} -> {rel_type} -> {target}")
-                else:
-                    logger.error(f"Lỗi tạo relationship {source} -> {target}: {result.error}")
+                queued_count += 1
                     
             except Exception as e:
                 logger.error(f"Lỗi xử lý relationship {rel.get('source_entity', 'unknown')} -> {rel.get('target_entity', 'unknown')}: {e}")
         
-        logger.info(f"Đã tạo {created_count}/{len(relationships)} relationships với schema và embedding")
-        return created_count
+        return queued_count
 
 
 # Test function với schema mới
@@ -348,7 +587,8 @@ async def test_service():
     
     service = BuilderService(
         llm_service=litellm,
-        neo4j_service=neo4j_service
+        neo4j_service=neo4j_service,
+        settings=GraphBuilderSetting()
     )
     
     test_input = BuilderInput(
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import math
+import re
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from pydantic import PrivateAttr
+
+from base import BaseModel
+from indexing.shared.utils import tokens_calculator
+
+# [ENTITY]<|>name<|>type<|>description[/ENTITY]
+ENTITY_PATTERN = re.compile(r'\[ENTITY\]<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+?)\[/ENTITY\]', re.DOTALL)
+# [RELATIONSHIP]<|>source<|>target<|>relation<|>description[/RELATIONSHIP]
+RELATIONSHIP_PATTERN = re.compile(
+    r'\[RELATIONSHIP\]<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+?)\[/RELATIONSHIP\]',
+    re.DOTALL,
+)
+# Packed variants start every record with the reference of the chunk it came from
+PACKED_ENTITY_PATTERN = re.compile(
+    r'\[ENTITY\]<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+?)\[/ENTITY\]',
+    re.DOTALL,
+)
+PACKED_RELATIONSHIP_PATTERN = re.compile(
+    r'\[RELATIONSHIP\]<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+)<\|>([^<|>]+?)\[/RELATIONSHIP\]',
+    re.DOTALL,
+)
+
+RECORD_CLOSING_TAGS = ('[/ENTITY]', '[/RELATIONSHIP]')
+
+
+def pack_chunks(chunks: List[Dict[str, str]], max_tokens: int, max_chunks: int) -> List[List[Dict[str, str]]]:
+    """Group consecutive chunks into packs that fit in one extraction call.
+
+    Chunks are packed greedily in document order; a chunk that alone exceeds
+    ``max_tokens`` gets a pack of its own.
+
+    Args:
+        chunks (List[Dict[str, str]]): Chunks with ``chunk_id`` and ``chunk_text``.
+        max_tokens (int): Maximum number of chunk text tokens per pack.
+        max_chunks (int): Maximum number of chunks per pack.
+
+    Returns:
+        List[List[Dict[str, str]]]: The packs, in document order.
+    """
+    packs: List[List[Dict[str, str]]] = []
+    current: List[Dict[str, str]] = []
+    current_tokens = 0
+
+    for chunk in chunks:
+        chunk_tokens = tokens_calculator(chunk['chunk_text'])
+        if current and (current_tokens + chunk_tokens > max_tokens or len(current) >= max_chunks):
+            packs.append(current)
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += chunk_tokens
+
+    if current:
+        packs.append(current)
+    return packs
+
+
+def chunk_refs(pack: List[Dict[str, str]]) -> Dict[str, str]:
+    """Map the short references used in a packed prompt to chunk ids.
+
+    Args:
+        pack (List[Dict[str, str]]): The chunks of the pack.
+
+    Returns:
+        Dict[str, str]: ``C1``, ``C2``, ... to chunk id, in pack order.
+    """
+    return {f'C{index}': chunk['chunk_id'] for index, chunk in enumerate(pack, start=1)}
+
+
+def format_packed_chunks(pack: List[Dict[str, str]]) -> str:
+    """Render the chunks of a pack delimited by their short references.
+
+    Args:
+        pack (List[Dict[str, str]]): The chunks of the pack.
+
+    Returns:
+        str: The text inserted in the packed extraction prompt.
+    """
+    return '\n\n'.join(
+        f'[CHUNK]<|>{ref}\n{chunk["chunk_text"]}\n[/CHUNK]'
+        for ref, chunk in zip(chunk_refs(pack), pack)
+    )
+
+
+def compact_embedding(embedding: List[float], dimension: int) -> Optional[List[float]]:
+    """Matryoshka prefix of an embedding, renormalized to unit length.
+
+    Args:
+        embedding (List[float]): The full embedding.
+        dimension (int): Dimension of the compact copy, 0 to disable.
+
+    Returns:
+        Optional[List[float]]: The compact embedding, None when disabled or not shorter.
+    """
+    if not dimension or not embedding or dimension >= len(embedding):
+        return None
+    prefix = embedding[:dimension]
+    norm = math.sqrt(sum(value * value for value in prefix)) or 1.0
+    return [value / norm for value in prefix]
+
+
+def _entity(chunk_id: str, name: str, entity_type: str, description: str) -> Dict:
+    return {
+        'chunk_id': chunk_id,
+        'entity_name': name.strip(),
+        'entity_type': entity_type.strip().lower(),
+        'entity_description': description.strip(),
+    }
+
+
+def _relationship(chunk_id: str, source: str, target: str, relationship: str, description: str) -> Dict:
+    return {
+        'chunk_id': chunk_id,
+        'source_entity': source.strip(),
+        'target_entity': target.strip(),
+        'relationship': relationship.strip().lower(),
+        'relationship_description': description.strip(),
+    }
+
+
+def parse_extraction(text: str, chunk_id: str) -> tuple[List[Dict], List[Dict]]:
+    """Parse the entity and relationship records extracted from a single chunk.
+
+    Args:
+        text (str): The LLM response.
+        chunk_id (str): The id of the chunk.
+
+    Returns:
+        tuple[List[Dict], List[Dict]]: The entities and relationships.
+    """
+    entities = [_entity(chunk_id, *match) for match in ENTITY_PATTERN.findall(text)]
+    relationships = [_relationship(chunk_id, *match) for match in RELATIONSHIP_PATTERN.findall(text)]
+    return entities, relationships
+
+
+def parse_packed_extraction(text: str, refs: Dict[str, str]) -> tuple[List[Dict], List[Dict], int]:
+    """Parse the records of a packed extraction and attribute them to their chunk.
+
+    Args:
+        text (str): The LLM response.
+        refs (Dict[str, str]): Short chunk references to chunk ids.
+
+    Returns:
+        tuple[List[Dict], List[Dict], int]: The entities, the relationships and
+            the number of records dropped because of an unknown chunk reference.
+    """
+    entities: List[Dict] = []
+    relationships: List[Dict] = []
+    dropped = 0
+
+    for ref, *fields in PACKED_ENTITY_PATTERN.findall(text):
+        chunk_id = refs.get(ref.strip().upper())
+        if chunk_id is None:
+            dropped += 1
+            continue
+        entities.append(_entity(chunk_id, *fields))
+
+    for ref, *fields in PACKED_RELATIONSHIP_PATTERN.findall(text):
+        chunk_id = refs.get(ref.strip().upper())
+        if chunk_id is None:
+            dropped += 1
+            continue
+        relationships.append(_relationship(chunk_id, *fields))
+
+    return entities, relationships, dropped
+
+
+class ExtractionStreamParser(BaseModel):
+    """Incrementally parse extraction records from a streamed completion.
+
+    Text is buffered until a record closing tag arrives; everything up to the
+    last closing tag is parsed and released, the rest waits for more text.
+    Pass ``chunk_id`` for a single-chunk extraction or ``refs`` for a packed one.
+    """
+
+    chunk_id: Optional[str] = None
+    refs: Optional[Dict[str, str]] = None
+    dropped: int = 0
+    _buffer: str = PrivateAttr(default='')
+
+    def feed(self, text: str) -> tuple[List[Dict], List[Dict]]:
+        """Add streamed text and return the records completed by it.
+
+        Args:
+            text (str): The next delta of the completion.
+
+        Returns:
+            tuple[List[Dict], List[Dict]]: The completed entities and relationships.
+        """
+        self._buffer += text
+        if ']' not in text:
+            return [], []
+
+        end = max(
+            (self._buffer.rfind(tag) + len(tag) for tag in RECORD_CLOSING_TAGS if tag in self._buffer),
+            default=0,
+        )
+        if not end:
+            return [], []
+
+        completed, self._buffer = self._buffer[:end], self._buffer[end:]
+        return self._parse(completed)
+
+    def close(self) -> tuple[List[Dict], List[Dict]]:
+        """Parse whatever is left once the stream has ended.
+
+        Returns:
+            tuple[List[Dict], List[Dict]]: The remaining entities and relationships.
+        """
+        remaining, self._buffer = self._buffer, ''
+        return self._parse(remaining)
+
+    def _parse(self, text: str) -> tuple[List[Dict], List[Dict]]:
+        if self.refs is None:
+            return parse_extraction(text, self.chunk_id)
+        entities, relationships, dropped = parse_packed_extraction(text, self.refs)
+        self.dropped += dropped
+        return entities, relationships
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+
+from neo4j.api import AsyncBookmarkManager
+from pydantic import Field
+from pydantic import PrivateAttr
+
+from base import BaseModel
+from graph_db import Neo4jService
+from graph_db import course_label
+from graph_db import course_slug
+from logger import get_logger
+from open_search import CHUNK_KIND
+from open_search import DESCRIPTION_KIND
+from open_search import OpenSearchService
+
+from indexing.domain.job_queue import ProgressReporter
+
+logger = get_logger(__name__)
+
+CHUNK = 'chunk'
+ENTITY = 'entity'
+RELATIONSHIP = 'relationship'
+
+# Statements of a flush run in this order, so that rows only reference nodes
+# written by the same or an earlier flush. Descriptions are stamped with
+# updated_at so that readers (e.g. the RAG vector mirror) can sync incrementally.
+# Chunks and Descriptions are stamped with the course and week of the run;
+# <SCOPE:var> lines add the course label (see graph_db.course_label).
+# An entity row is linked to every chunk that mentions it (mentioned_chunk_uids,
+# which includes chunk_uid) and keeps its normalized name and name embedding,
+# against which the entities of later documents are resolved.
+WRITE_STATEMENTS = {
+    CHUNK: """
+    UNWIND $rows AS row
+    MATCH (doc:Document {file_name: row.file_name})
+    WHERE doc.course_code = $course_code OR ($course_code IS NULL AND doc.course_code IS NULL)
+    MERGE (chunk:Chunk {uid: row.chunk_uid})
+    ON CREATE SET chunk.text = row.chunk_text,
+                  chunk.embedding = row.chunk_embedding
+    SET chunk.file_name = row.file_name,
+        chunk.course_code = $course_code,
+        chunk.week_number = $week_number
+    <SCOPE:chunk>
+    MERGE (doc)-[:CONTAINED]->(chunk)
+    RETURN 'chunk' AS kind, count(*) AS written
+    """,
+    ENTITY: """
+    UNWIND $rows AS row
+    MATCH (chunk:Chunk {uid: row.chunk_uid})
+    MERGE (entity:Entity {name: row.name})
+    SET entity.type = row.entity_type,
+        entity.uid = row.entity_uid,
+        entity.normalized_name = row.normalized_name,
+        entity.name_embedding = coalesce(entity.name_embedding, row.name_embedding)
+    MERGE (desc:Description {uid: row.desc_uid})
+    SET desc.chunk_uid = row.chunk_uid,
+        desc.text = row.description,
+        desc.type = 'ENTITY',
+        desc.embedding = row.desc_embedding,
+        desc.embedding_compact = row.desc_compact_embedding,
+        desc.course_code = $course_code,
+        desc.week_number = $week_number,
+        desc.updated_at = timestamp()
+    <SCOPE:desc>
+    MERGE (entity)-[:DESCRIBED]->(desc)
+    WITH entity, desc, row
+    UNWIND row.mentioned_chunk_uids AS mentioned_uid
+    MATCH (mentioned:Chunk {uid: mentioned_uid})
+    MERGE (mentioned)-[:MENTIONED]->(entity)
+    RETURN 'entity' AS kind, count(DISTINCT desc) AS written
+    """,
+    RELATIONSHIP: """
+    UNWIND $rows AS row
+    MATCH (source:Entity {name: row.source})
+    MATCH (target:Entity {name: row.target})
+    MATCH (chunk:Chunk)-[:MENTIONED]->(source)
+    WITH row, source, target, head(collect(chunk.uid)) AS chunk_uid
+    MERGE (relationship:Relationship {uid: row.relationship_uid})
+    MERGE (desc:Description {uid: row.desc_uid})
+    SET desc.chunk_uid = chunk_uid,
+        desc.text = row.description,
+        desc.type = 'RELATIONSHIP',
+        desc.embedding = row.desc_embedding,
+        desc.embedding_compact = row.desc_compact_embedding,
+        desc.course_code = $course_code,
+        desc.week_number = $week_number,
+        desc.updated_at = timestamp()
+    <SCOPE:desc>
+    MERGE (source)-[:RELATED]->(relationship)
+    MERGE (relationship)-[:RELATED]->(target)
+    MERGE (relationship)-[:DESCRIBED]->(desc)
+    RETURN 'relationship' AS kind, count(*) AS written
+    """,
+}
+
+# Names of the statements in the Neo4j query log
+QUERY_NAMES = {
+    CHUNK: 'GRAPH_WRITE_CHUNK',
+    ENTITY: 'GRAPH_WRITE_ENTITY',
+    RELATIONSHIP: 'GRAPH_WRITE_RELATIONSHIP',
+}
+
+
+class GraphWriter(BaseModel):
+    """Write-behind writer that persists graph rows to Neo4j in batches.
+
+    Producers enqueue chunk, entity and relationship rows with :meth:`put`; a
+    single background task flushes them once ``batch_size`` rows are queued or
+    ``flush_interval`` seconds have passed since the first queued row. Every
+    flush is one small write transaction. The queue holds at most
+    ``max_queued_rows`` rows, so producers wait when Neo4j falls behind.
+
+    With a ``course_code``, the written Chunks and Descriptions are stamped
+    with the course (label and property) and ``week_number``.
+
+    With an ``opensearch_service``, every flush also bulk-indexes the chunk
+    and description texts into the BM25 index ``lexical_index_name`` once
+    the Neo4j transaction has committed, so that a failed batch never leaves
+    lexical hits whose uids are missing from the graph.
+    """
+
+    neo4j_service: Neo4jService
+    batch_size: int = 200
+    flush_interval: float = 1.0
+    max_queued_rows: int = 2000
+    progress_reporter: Optional[ProgressReporter] = None
+    bookmark_manager: Optional[AsyncBookmarkManager] = None
+    opensearch_service: Optional[OpenSearchService] = None
+    lexical_index_name: Optional[str] = None
+    course_code: Optional[str] = None
+    week_number: Optional[int] = None
+    written: Dict[str, int] = Field(default_factory=dict)
+    failed: Dict[str, int] = Field(default_factory=dict)
+    lexical_failed: int = 0
+    # endpoints of the written relationships, whose neighborhoods changed
+    related_entities: Set[str] = Field(default_factory=set)
+    _queue: Optional[asyncio.Queue] = PrivateAttr(default=None)
+    _task: Optional[asyncio.Task] = PrivateAttr(default=None)
+
+    def start(self) -> None:
+        """Start the background flush task."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued_rows)
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, kind: str, row: Dict[str, Any]) -> None:
+        """Queue a row for writing, waiting while the queue is full.
+
+        Args:
+            kind (str): ``chunk``, ``entity`` or ``relationship``.
+            row (Dict[str, Any]): The parameters of the row.
+        """
+        if kind not in WRITE_STATEMENTS:
+            raise ValueError(f'Unknown graph row kind: {kind}')
+        self.start()
+        await self._queue.put((kind, row))
+
+    async def close(self) -> Dict[str, int]:
+        """Flush the queued rows and stop the background task.
+
+        Returns:
+            Dict[str, int]: The number of rows written per kind.
+        """
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+            self._task = None
+        return self.written
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[tuple[str, Dict[str, Any]]]) -> None:
+        rows: Dict[str, List[Dict[str, Any]]] = {kind: [] for kind in WRITE_STATEMENTS}
+        for kind, row in batch:
+            rows[kind].append(row)
+
+        queries = [
+            {
+                'statement': self._statement(statement),
+                'parameters': {
+                    'rows': rows[kind],
+                    'course_code': self.course_code,
+                    'week_number': self.week_number,
+                },
+                'query_name': QUERY_NAMES[kind],
+            }
+            for kind, statement in WRITE_STATEMENTS.items()
+            if rows[kind]
+        ]
+        result = await self.neo4j_service.execute_queries(queries, bookmark_manager=self.bookmark_manager)
+        if not result.success:
+            for kind, kind_rows in rows.items():
+                if kind_rows:
+                    self.failed[kind] = self.failed.get(kind, 0) + len(kind_rows)
+            logger.error(
+                'Graph batch write failed',
+                extra={
+                    'rows': {kind: len(kind_rows) for kind, kind_rows in rows.items()},
+                    'error': result.error,
+                },
+            )
+            return
+
+        if self.opensearch_service is not None:
+            await self._index_lexical(rows)
+
+        written = {record['kind']: record['written'] for record in result.data}
+        for row in rows[RELATIONSHIP]:
+            self.related_entities.update((row['source'], row['target']))
+        for kind, count in written.items():
+            self.written[kind] = self.written.get(kind, 0) + count
+            if count < len(rows[kind]):
+                self.failed[kind] = self.failed.get(kind, 0) + len(rows[kind]) - count
+
+        if self.progress_reporter:
+            await self.progress_reporter.increment(
+                entities_written=written.get(ENTITY, 0),
+                relationships_written=written.get(RELATIONSHIP, 0),
+            )
+        logger.debug('Graph batch written', extra={'written': written})
+
+    def _statement(self, statement: str) -> str:
+        """Fill the <SCOPE:var> lines: the course label, or nothing without a course."""
+        label = course_label(self.course_code) if self.course_code else None
+        lines = []
+        for line in statement.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('<SCOPE:') and stripped.endswith('>'):
+                if label:
+                    indent = line[: len(line) - len(line.lstrip())]
+                    lines.append(f'{indent}SET {stripped[len("<SCOPE:"):-1]}:{label}')
+                continue
+            lines.append(line)
+        return '\n'.join(lines)
+
+    async def _index_lexical(self, rows: Dict[str, List[Dict[str, Any]]]) -> None:
+        documents = [
+            {
+                'uid': row['chunk_uid'],
+                'kind': CHUNK_KIND,
+                'text': row['chunk_text'],
+                'file_name': row['file_name'],
+            }
+            for row in rows[CHUNK]
+        ]
+        documents.extend(
+            {
+                'uid': row['desc_uid'],
+                'kind': DESCRIPTION_KIND,
+                'description_type': 'ENTITY',
+                'entity_name': row['name'],
+                'text': row['description'],
+                'chunk_uid': row['chunk_uid'],
+            }
+            for row in rows[ENTITY]
+        )
+        documents.extend(
+            {
+                'uid': row['desc_uid'],
+                'kind': DESCRIPTION_KIND,
+                'description_type': 'RELATIONSHIP',
+                'entity_name': f"{row['source']} {row['target']}",
+                'text': row['description'],
+            }
+            for row in rows[RELATIONSHIP]
+        )
+        # the course slug, so that lexical and graph scopes agree on spelling variants
+        course_code = course_slug(self.course_code) if self.course_code else None
+        for document in documents:
+            document['course_code'] = course_code
+            document['week_number'] = self.week_number
+        _, failed = await asyncio.to_thread(
+            self.opensearch_service.bulk_index, self.lexical_index_name, documents,
+        )
+        self.lexical_failed += failed
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from .models import Job
+from .models import HeartbeatStatus
+from .models import JobStage
+from .models import JobStatus
+from .service import JobRunner
+from .service import JobWorkerPool
+from .service import ProgressReporter
+from .store import JobStore
+
+__all__ = [
+    'HeartbeatStatus',
+    'Job',
+    'JobStage',
+    'JobStatus',
+    'JobRunner',
+    'JobStore',
+    'JobWorkerPool',
+    'ProgressReporter',
+]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from enum import Enum
+from typing import Any
+from typing import Optional
+
+from base import BaseModel
+
+
+class JobStatus(str, Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class JobStage(str, Enum):
+    QUEUED = 'queued'
+    PARSING = 'parsing'
+    CHUNKING = 'chunking'
+    BUILDING = 'building'
+    SUMMARIZING = 'summarizing'
+    DONE = 'done'
+
+
+class HeartbeatStatus(str, Enum):
+    ALIVE = 'alive'
+    CANCEL_REQUESTED = 'cancel_requested'
+    # the job was reclaimed by another worker or finished elsewhere
+    LOST = 'lost'
+
+
+class Job(BaseModel):
+    job_id: str
+    course_code: str
+    week_number: int
+    status: JobStatus
+    stage: JobStage
+    progress: dict[str, Any] = {}
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    worker_id: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
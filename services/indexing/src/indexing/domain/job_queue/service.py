@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+from uuid import uuid4
+
+from pydantic import Field
+from pydantic import PrivateAttr
+
+from base import BaseModel
+from logger import get_logger
+
+from indexing.shared.settings.job_queue import JobQueueSetting
+from indexing.domain.job_queue.models import HeartbeatStatus
+from indexing.domain.job_queue.models import Job
+from indexing.domain.job_queue.models import JobStage
+from indexing.domain.job_queue.models import JobStatus
+from indexing.domain.job_queue.store import JobStore
+
+logger = get_logger(__name__)
+
+
+class ProgressReporter(BaseModel):
+    """Collects per-stage progress counters of a running job and flushes them to the store.
+
+    Counters are kept in memory and written at most once per
+    ``flush_interval`` seconds so that per-entity updates stay cheap.
+    """
+
+    store: JobStore
+    job_id: str
+    flush_interval: float = 1.0
+    stage: JobStage = JobStage.QUEUED
+    progress: dict[str, Any] = Field(default_factory=dict)
+    _last_flush: float = PrivateAttr(default=0.0)
+
+    async def set_stage(self, stage: JobStage) -> None:
+        """Move the job to a new stage and flush immediately.
+
+        Args:
+            stage (JobStage): The new stage.
+        """
+        self.stage = stage
+        await self.flush()
+
+    async def update(self, **counters: Any) -> None:
+        """Set absolute values for progress counters.
+
+        Args:
+            **counters (Any): Counter names and their values.
+        """
+        self.progress.update(counters)
+        await self._maybe_flush()
+
+    async def increment(self, **deltas: int) -> None:
+        """Increment progress counters.
+
+        Args:
+            **deltas (int): Counter names and the amount to add.
+        """
+        for key, delta in deltas.items():
+            self.progress[key] = self.progress.get(key, 0) + delta
+        await self._maybe_flush()
+
+    async def flush(self) -> None:
+        """Write the current stage and counters to the store."""
+        self._last_flush = time.monotonic()
+        await self.store.update_progress(self.job_id, self.stage, dict(self.progress))
+
+    async def _maybe_flush(self) -> None:
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+
+JobRunner = Callable[[Job, ProgressReporter], Awaitable[dict[str, Any]]]
+
+
+class JobWorkerPool(BaseModel):
+    """Pool of asyncio workers executing queued jobs from a ``JobStore``.
+
+    Each worker claims one job at a time, runs it as a separate task and
+    heart-beats it every ``poll_interval`` seconds. The heartbeat also picks up
+    cancel requests issued by any process sharing the store, and stops the job
+    when another worker reclaimed it after a missed heartbeat. Every worker
+    claims under its own id (``<worker_id>-<index>``).
+    """
+
+    store: JobStore
+    settings: JobQueueSetting
+    runner: JobRunner
+    worker_id: str = Field(default_factory=lambda: uuid4().hex)
+    _workers: list[asyncio.Task] = PrivateAttr(default_factory=list)
+    _stopping: Optional[asyncio.Event] = PrivateAttr(default=None)
+
+    async def start(self) -> None:
+        """Start the configured number of workers."""
+        self._stopping = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._work(index), name=f'indexing-worker-{index}')
+            for index in range(self.settings.num_workers)
+        ]
+        logger.info(
+            'Indexing worker pool started',
+            extra={
+                'worker_id': self.worker_id,
+                'num_workers': self.settings.num_workers,
+            },
+        )
+
+    async def stop(self) -> None:
+        """Stop all workers, putting their running jobs back in the queue."""
+        if self._stopping is None:
+            return
+        self._stopping.set()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info('Indexing worker pool stopped', extra={'worker_id': self.worker_id})
+
+    async def _work(self, index: int) -> None:
+        worker_id = f'{self.worker_id}-{index}'
+        while not self._stopping.is_set():
+            try:
+                job = await self.store.claim_next(worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception(
+                    'Error while claiming indexing job',
+                    extra={'worker_index': index, 'error': str(e)},
+                )
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.settings.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._execute(job, worker_id)
+
+    async def _execute(self, job: Job, worker_id: str) -> None:
+        reporter = ProgressReporter(
+            store=self.store,
+            job_id=job.job_id,
+            flush_interval=self.settings.progress_flush_interval,
+            progress=dict(job.progress),
+        )
+        task = asyncio.create_task(self.runner(job, reporter))
+        cancel_requested = False
+
+        logger.info(
+            'Indexing job started',
+            extra={
+                'job_id': job.job_id,
+                'worker_id': worker_id,
+                'course_code': job.course_code,
+                'week_number': job.week_number,
+            },
+        )
+
+        try:
+            while not task.done():
+                done, _ = await asyncio.wait({task}, timeout=self.settings.poll_interval)
+                if done:
+                    break
+                heartbeat = await self.store.heartbeat(job.job_id, worker_id)
+                if heartbeat == HeartbeatStatus.LOST:
+                    # Another worker owns the job now: stop without touching its row.
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    logger.warning('Indexing job ownership lost', extra={'job_id': job.job_id, 'worker_id': worker_id})
+                    return
+                if heartbeat == HeartbeatStatus.CANCEL_REQUESTED and not cancel_requested:
+                    cancel_requested = True
+                    task.cancel()
+        except asyncio.CancelledError:
+            # The worker itself is shutting down: stop the job and hand it back to the queue.
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await self.store.requeue(job.job_id, worker_id)
+            logger.warning('Indexing job requeued on shutdown', extra={'job_id': job.job_id})
+            raise
+
+        try:
+            result = task.result()
+        except asyncio.CancelledError:
+            await reporter.flush()
+            if await self._finish(job, worker_id, JobStatus.CANCELLED, error='Cancelled by user'):
+                logger.info('Indexing job cancelled', extra={'job_id': job.job_id})
+            return
+        except Exception as e:
+            await reporter.flush()
+            await self._finish(job, worker_id, JobStatus.FAILED, error=f'[{reporter.stage.value}] {e}')
+            logger.exception(
+                'Indexing job failed',
+                extra={'job_id': job.job_id, 'stage': reporter.stage.value, 'error': str(e)},
+            )
+            return
+
+        reporter.stage = JobStage.DONE
+        await reporter.flush()
+        if await self._finish(job, worker_id, JobStatus.COMPLETED, result=result):
+            logger.info('Indexing job completed', extra={'job_id': job.job_id})
+
+    async def _finish(self, job: Job, worker_id: str, status: JobStatus, **kwargs: Any) -> bool:
+        """Finish a job unless another worker reclaimed it meanwhile."""
+        if await self.store.finish(job.job_id, worker_id, status, **kwargs):
+            return True
+        logger.warning('Indexing job ownership lost', extra={'job_id': job.job_id, 'worker_id': worker_id})
+        return False
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any
+from typing import Optional
+from uuid import uuid4
+
+from base import BaseModel
+from logger import get_logger
+
+from indexing.shared.settings.job_queue import JobQueueSetting
+from indexing.domain.job_queue.models import HeartbeatStatus
+from indexing.domain.job_queue.models import Job
+from indexing.domain.job_queue.models import JobStage
+from indexing.domain.job_queue.models import JobStatus
+
+logger = get_logger(__name__)
+
+
+CREATE_JOBS_TABLE = """
+CREATE TABLE IF NOT EXISTS indexing_jobs (
+    job_id TEXT PRIMARY KEY,
+    course_code TEXT NOT NULL,
+    week_number INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    progress TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    heartbeat_at REAL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+CREATE_STATUS_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_indexing_jobs_status
+ON indexing_jobs (status, created_at)
+"""
+
+
+class JobStore(BaseModel):
+    """SQLite backed job queue shared by every worker process of the service.
+
+    Every mutation runs inside a ``BEGIN IMMEDIATE`` transaction so that two
+    uvicorn workers polling the same database never claim the same job.
+    """
+
+    settings: JobQueueSetting
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.settings.database_path,
+            timeout=30.0,
+            isolation_level=None,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA busy_timeout=30000')
+        return connection
+
+    def _to_job(self, row: sqlite3.Row | None) -> Optional[Job]:
+        if row is None:
+            return None
+        return Job(
+            job_id=row['job_id'],
+            course_code=row['course_code'],
+            week_number=row['week_number'],
+            status=JobStatus(row['status']),
+            stage=JobStage(row['stage']),
+            progress=json.loads(row['progress'] or '{}'),
+            result=json.loads(row['result']) if row['result'] else None,
+            error=row['error'],
+            cancel_requested=bool(row['cancel_requested']),
+            worker_id=row['worker_id'],
+            created_at=row['created_at'],
+            started_at=row['started_at'],
+            finished_at=row['finished_at'],
+        )
+
+    async def initialize(self) -> None:
+        """Create the jobs table if it does not exist yet."""
+        await asyncio.to_thread(self._initialize)
+
+    def _initialize(self) -> None:
+        directory = os.path.dirname(self.settings.database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute(CREATE_JOBS_TABLE)
+            connection.execute(CREATE_STATUS_INDEX)
+
+    async def create(self, course_code: str, week_number: int) -> Job:
+        """Enqueue a new indexing job.
+
+        Args:
+            course_code (str): The course code to index.
+            week_number (int): The week number to index.
+
+        Returns:
+            Job: The queued job.
+        """
+        return await asyncio.to_thread(self._create, course_code, week_number)
+
+    def _create(self, course_code: str, week_number: int) -> Job:
+        job_id = uuid4().hex
+        with closing(self._connect()) as connection:
+            connection.execute(
+                """
+                INSERT INTO indexing_jobs (job_id, course_code, week_number, status, stage, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, course_code, week_number, JobStatus.QUEUED.value, JobStage.QUEUED.value, time.time()),
+            )
+            row = connection.execute('SELECT * FROM indexing_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return self._to_job(row)
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            Optional[Job]: The job, or None if it does not exist.
+        """
+        return await asyncio.to_thread(self._get, job_id)
+
+    def _get(self, job_id: str) -> Optional[Job]:
+        with closing(self._connect()) as connection:
+            row = connection.execute('SELECT * FROM indexing_jobs WHERE job_id = ?', (job_id,)).fetchone()
+        return self._to_job(row)
+
+    async def claim_next(self, worker_id: str) -> Optional[Job]:
+        """Atomically claim the oldest queued job, or a running job whose worker stopped heart-beating.
+
+        Stale running jobs with a pending cancel request are cancelled instead of reclaimed.
+
+        Args:
+            worker_id (str): The id of the claiming worker.
+
+        Returns:
+            Optional[Job]: The claimed job, or None if the queue is empty.
+        """
+        return await asyncio.to_thread(self._claim_next, worker_id)
+
+    def _claim_next(self, worker_id: str) -> Optional[Job]:
+        now = time.time()
+        stale_before = now - self.settings.heartbeat_timeout
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                """
+                UPDATE indexing_jobs
+                SET status = ?, error = 'Cancelled by user', finished_at = ?
+                WHERE status = ? AND heartbeat_at < ? AND cancel_requested = 1
+                """,
+                (JobStatus.CANCELLED.value, now, JobStatus.RUNNING.value, stale_before),
+            )
+            row = connection.execute(
+                """
+                SELECT job_id FROM indexing_jobs
+                WHERE (status = ? OR (status = ? AND heartbeat_at < ?))
+                  AND cancel_requested = 0
+                ORDER BY created_at
+                LIMIT 1
+                """,
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value, stale_before),
+            ).fetchone()
+            if row is None:
+                connection.execute('COMMIT')
+                return None
+
+            connection.execute(
+                """
+                UPDATE indexing_jobs
+                SET status = ?, worker_id = ?, heartbeat_at = ?, started_at = COALESCE(started_at, ?)
+                WHERE job_id = ?
+                """,
+                (JobStatus.RUNNING.value, worker_id, now, now, row['job_id']),
+            )
+            claimed = connection.execute('SELECT * FROM indexing_jobs WHERE job_id = ?', (row['job_id'],)).fetchone()
+            connection.execute('COMMIT')
+            return self._to_job(claimed)
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> HeartbeatStatus:
+        """Refresh the heartbeat of a running job.
+
+        Args:
+            job_id (str): The job id.
+            worker_id (str): The id of the worker owning the job.
+
+        Returns:
+            HeartbeatStatus: LOST if the worker no longer owns the running job,
+                CANCEL_REQUESTED if a cancel has been requested, ALIVE otherwise.
+        """
+        return await asyncio.to_thread(self._heartbeat, job_id, worker_id)
+
+    def _heartbeat(self, job_id: str, worker_id: str) -> HeartbeatStatus:
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                'UPDATE indexing_jobs SET heartbeat_at = ? WHERE job_id = ? AND worker_id = ? AND status = ?',
+                (time.time(), job_id, worker_id, JobStatus.RUNNING.value),
+            )
+            if cursor.rowcount == 0:
+                return HeartbeatStatus.LOST
+            row = connection.execute(
+                'SELECT cancel_requested FROM indexing_jobs WHERE job_id = ?',
+                (job_id,),
+            ).fetchone()
+        if row and row['cancel_requested']:
+            return HeartbeatStatus.CANCEL_REQUESTED
+        return HeartbeatStatus.ALIVE
+
+    async def update_progress(self, job_id: str, stage: JobStage, progress: dict[str, Any]) -> None:
+        """Persist the current stage and progress counters of a job.
+
+        Args:
+            job_id (str): The job id.
+            stage (JobStage): The current stage.
+            progress (dict[str, Any]): The full progress snapshot.
+        """
+        await asyncio.to_thread(self._update_progress, job_id, stage, progress)
+
+    def _update_progress(self, job_id: str, stage: JobStage, progress: dict[str, Any]) -> None:
+        with closing(self._connect()) as connection:
+            connection.execute(
+                'UPDATE indexing_jobs SET stage = ?, progress = ? WHERE job_id = ?',
+                (stage.value, json.dumps(progress), job_id),
+            )
+
+    async def finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        status: JobStatus,
+        result: Optional[dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Move a running job owned by a worker to a terminal status.
+
+        Args:
+            job_id (str): The job id.
+            worker_id (str): The id of the worker owning the job.
+            status (JobStatus): The terminal status.
+            result (Optional[dict[str, Any]]): The job result, if any.
+            error (Optional[str]): The error message, if any.
+
+        Returns:
+            bool: False if the worker no longer owns the running job.
+        """
+        return await asyncio.to_thread(self._finish, job_id, worker_id, status, result, error)
+
+    def _finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        status: JobStatus,
+        result: Optional[dict[str, Any]],
+        error: Optional[str],
+    ) -> bool:
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                """
+                UPDATE indexing_jobs
+                SET status = ?, result = ?, error = ?, finished_at = ?
+                WHERE job_id = ? AND worker_id = ? AND status = ?
+                """,
+                (
+                    status.value,
+                    json.dumps(result) if result is not None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                    worker_id,
+                    JobStatus.RUNNING.value,
+                ),
+            )
+        return cursor.rowcount > 0
+
+    async def requeue(self, job_id: str, worker_id: str) -> None:
+        """Put a running job back in the queue, e.g. when its worker shuts down.
+
+        Args:
+            job_id (str): The job id.
+            worker_id (str): The id of the worker owning the job.
+        """
+        await asyncio.to_thread(self._requeue, job_id, worker_id)
+
+    def _requeue(self, job_id: str, worker_id: str) -> None:
+        with closing(self._connect()) as connection:
+            connection.execute(
+                """
+                UPDATE indexing_jobs SET status = ?, worker_id = NULL, heartbeat_at = NULL
+                WHERE job_id = ? AND worker_id = ? AND status = ?
+                """,
+                (JobStatus.QUEUED.value, job_id, worker_id, JobStatus.RUNNING.value),
+            )
+
+    async def request_cancel(self, job_id: str) -> Optional[Job]:
+        """Request cancellation of a job.
+
+        Queued jobs are cancelled immediately, running jobs are flagged and
+        stopped by their worker on its next heartbeat.
+
+        Args:
+            job_id (str): The job id.
+
+        Returns:
+            Optional[Job]: The updated job, or None if it does not exist.
+        """
+        return await asyncio.to_thread(self._request_cancel, job_id)
+
+    def _request_cancel(self, job_id: str) -> Optional[Job]:
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                """
+                UPDATE indexing_jobs
+                SET status = ?, cancel_requested = 1, finished_at = ?
+                WHERE job_id = ? AND status = ?
+                """,
+                (JobStatus.CANCELLED.value, time.time(), job_id, JobStatus.QUEUED.value),
+            )
+            connection.execute(
+                'UPDATE indexing_jobs SET cancel_requested = 1 WHERE job_id = ? AND status = ?',
+                (job_id, JobStatus.RUNNING.value),
+            )
+            row = connection.execute('SELECT * FROM indexing_jobs WHERE job_id = ?', (job_id,)).fetchone()
+            connection.execute('COMMIT')
+            return self._to_job(row)
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
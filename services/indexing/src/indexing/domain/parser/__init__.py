@@ -1,3 +1,4 @@
 from .service import ParserInput
 from .service import ParserService 
-from .service import ParserOutput
\ No newline at end of file
+from .service import ParserOutput
+from .service import ParsedFile
\ No newline at end of file
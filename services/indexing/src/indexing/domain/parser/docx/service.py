@@ -9,11 +9,11 @@ from lite_llm import CompletionMessage
 from lite_llm import Role
 from base import BaseModel
 from base import BaseService
+from office_converter import OfficeConverterService
 from logger import get_logger
 
 from indexing.shared.settings.parser import ParserSetting
 from indexing.domain.parser.docx.prompts import DOCX_SYSTEM_PROMPT
-from indexing.domain.parser.docx.utils import convert_docx_to_pdf
 
 
 logger = get_logger(__name__)
@@ -30,6 +30,7 @@ class DOCXOutput(BaseModel):
 
 class DOCXService(BaseService):
     litellm_service: LiteLLMService
+    office_converter: OfficeConverterService
     settings: ParserSetting
 
     async def process(self, inputs: DOCXInput) -> DOCXOutput:
@@ -44,8 +45,10 @@ class DOCXService(BaseService):
         file_name = os.path.basename(inputs.file_path)
         file_path = inputs.file_path
 
+        pdf_path = ""
+
         try:
-            pdf_path = convert_docx_to_pdf(
+            pdf_path = await self.office_converter.convert_to_pdf(
                 input_path=file_path,
                 output_dir=self.settings.upload_folder_path
             )
@@ -0,0 +1,62 @@
+"""Compare single-call, sharded and hybrid PDF parsing latency on a local file.
+
+Usage:
+    python -m indexing.domain.parser.pdf.benchmark <path/to/lecture.pdf> [runs]
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from lite_llm import LiteLLMService
+
+from indexing.shared.models import PDFParseMode
+from indexing.shared.utils import get_settings
+from indexing.domain.parser.pdf.service import PDFInput
+from indexing.domain.parser.pdf.service import PDFService
+
+
+async def benchmark(pdf_path: str, runs: int = 1) -> dict[str, list[float]]:
+    """Parse the same PDF in every parse mode and collect wall-clock latencies.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        runs (int): Number of runs per mode.
+
+    Returns:
+        dict[str, list[float]]: Latencies in seconds per parse mode.
+    """
+    settings = get_settings()
+    litellm_service = LiteLLMService(litellm_setting=settings.litellm)
+    latencies: dict[str, list[float]] = {}
+
+    for mode in (PDFParseMode.SINGLE, PDFParseMode.SHARDED, PDFParseMode.HYBRID):
+        service = PDFService(
+            litellm_service=litellm_service,
+            settings=settings.parser.model_copy(update={'pdf_parse_mode': mode}),
+        )
+        latencies[mode.value] = []
+        for _ in range(runs):
+            # PDFService deletes its input, so always work on a copy
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                copy_path = os.path.join(tmp_dir, os.path.basename(pdf_path))
+                shutil.copy(pdf_path, copy_path)
+                start_time = time.perf_counter()
+                output = await service.process(PDFInput(file_path=copy_path))
+                latencies[mode.value].append(time.perf_counter() - start_time)
+                print(f'{mode.value}: {latencies[mode.value][-1]:.2f}s, {len(output.contents)} chars')
+
+    return latencies
+
+
+if __name__ == '__main__':
+    path = sys.argv[1]
+    number_of_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    results = asyncio.run(benchmark(path, number_of_runs))
+    for mode_name, values in results.items():
+        print(f'{mode_name:>8}: median {statistics.median(values):.2f}s over {len(values)} run(s)')
@@ -136,4 +136,12 @@ Create a complete markdown file with:
 - Standard markdown formatting, easy to read and understand
 - 100% preservation of information from the original PDF
 </output>
-"""
\ No newline at end of file
+"""
+
+PDF_SHARD_USER_PROMPT = """
+The attached PDF contains pages {start_page} to {end_page} of a longer document ({total_pages} pages in total). It is one part of a document that is converted in several parts and stitched back together.
+- Convert only the attached pages, in order, following all the rules above.
+- Number pages with their position in the ORIGINAL document: the first attached page is page {start_page}, the last one is page {end_page}.
+- Do NOT add a main document title or a table of contents unless they appear on the attached pages.
+- Do NOT add any introduction or closing remarks about the part you are converting.
+"""
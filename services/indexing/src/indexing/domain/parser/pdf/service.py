@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import os
+import asyncio
 import base64
-import shutil
+import time
 
 from lite_llm import LiteLLMService
 from lite_llm import LiteLLMInput
@@ -10,12 +11,19 @@ from lite_llm import CompletionMessage
 from lite_llm import Role
 from base import BaseModel
 from base import BaseService
+from indexing.shared.models import PDFParseMode
 from indexing.shared.settings.parser import ParserSetting
 from logger import get_logger
 
 from indexing.domain.parser.pdf.prompts import PDF_SYSTEM_PROMPT
 from indexing.domain.parser.pdf.prompts import PDF_SYSTEM_PROMPT_PPTX
+from indexing.domain.parser.pdf.prompts import PDF_SHARD_USER_PROMPT
+from indexing.domain.parser.pdf.text_layer import analyze_pdf
+from indexing.domain.parser.pdf.utils import PDFShard
+from indexing.domain.parser.pdf.utils import extract_pdf_pages
 from indexing.domain.parser.pdf.utils import is_powerpoint_pdf
+from indexing.domain.parser.pdf.utils import renumber_slide_headers
+from indexing.domain.parser.pdf.utils import split_pdf_into_shards
 
 logger = get_logger(__name__)
 
@@ -32,10 +40,15 @@ class PDFOutput(BaseModel):
 class PDFService(BaseService):
     litellm_service: LiteLLMService
     settings: ParserSetting
-    
+
     async def process(self, inputs: PDFInput) -> PDFOutput:
         """Process the PDF file and extract contents.
 
+        Depending on ``settings.pdf_parse_mode`` the whole file is sent in a
+        single LLM call, split into page shards that are parsed concurrently
+        and stitched back together in page order, or converted from its text
+        layer with only the complex pages sent to the LLM.
+
         Args:
             inputs (PDFInput): The input containing the file path.
 
@@ -46,28 +59,28 @@ class PDFService(BaseService):
         file_path = inputs.file_path
 
         try:
-            with open(file_path, 'rb') as f:
-                file_bytes = f.read()
-                
+            start_time = time.perf_counter()
             is_pptx = is_powerpoint_pdf(file_path)
+            system_prompt = PDF_SYSTEM_PROMPT if not is_pptx else PDF_SYSTEM_PROMPT_PPTX
 
-            output = await self.litellm_service.process_async(
-                inputs=LiteLLMInput(
-                    messages=[
-                        CompletionMessage(
-                            role=Role.SYSTEM,
-                            content=PDF_SYSTEM_PROMPT if not is_pptx else PDF_SYSTEM_PROMPT_PPTX
-                        ),
-                        CompletionMessage(
-                            role=Role.USER,
-                            file_url=f"data:application/pdf;base64,{base64.b64encode(file_bytes).decode('utf-8')}"
-                        )
-                    ]
-                )
+            if self.settings.pdf_parse_mode == PDFParseMode.SHARDED:
+                contents = await self._parse_sharded(file_path, system_prompt)
+            elif self.settings.pdf_parse_mode == PDFParseMode.HYBRID:
+                contents = await self._parse_hybrid(file_path, system_prompt, is_pptx)
+            else:
+                contents = await self._parse_single(file_path, system_prompt)
+
+            logger.info(
+                'Parsed PDF file',
+                extra={
+                    'file_name': file_name,
+                    'parse_mode': self.settings.pdf_parse_mode.value,
+                    'elapsed_seconds': round(time.perf_counter() - start_time, 3),
+                },
             )
 
             return PDFOutput(
-                contents=output.response,
+                contents=contents,
                 file_name=file_name,
             )
         except Exception as e:
@@ -83,10 +96,161 @@ class PDFService(BaseService):
                 contents="",
                 file_name=file_name,
             )
-            
+
         finally:
             self._delete_files(file_path)
 
+    async def _parse_single(self, file_path: str, system_prompt: str) -> str:
+        """Parse the whole PDF file with a single LLM call.
+
+        Args:
+            file_path (str): Path to the PDF file.
+            system_prompt (str): The system prompt to use.
+
+        Returns:
+            str: The markdown contents.
+        """
+        with open(file_path, 'rb') as f:
+            file_bytes = f.read()
+
+        return await self._call_llm(system_prompt, file_bytes)
+
+    async def _parse_sharded(self, file_path: str, system_prompt: str) -> str:
+        """Split the PDF into page shards, parse them concurrently and stitch the results in order.
+
+        Args:
+            file_path (str): Path to the PDF file.
+            system_prompt (str): The system prompt to use.
+
+        Returns:
+            str: The markdown contents of the whole document.
+
+        Raises:
+            ValueError: If any shard could not be parsed.
+        """
+        shards = await asyncio.to_thread(
+            split_pdf_into_shards,
+            file_path,
+            self.settings.pages_per_shard,
+        )
+        if len(shards) <= 1:
+            return await self._parse_single(file_path, system_prompt)
+
+        total_pages = shards[-1].end_page
+        semaphore = asyncio.Semaphore(self.settings.max_concurrent_shards)
+
+        async def parse_shard(shard: PDFShard) -> str:
+            async with semaphore:
+                contents = await self._call_llm(
+                    system_prompt,
+                    shard.pdf_bytes,
+                    PDF_SHARD_USER_PROMPT.format(
+                        start_page=shard.start_page,
+                        end_page=shard.end_page,
+                        total_pages=total_pages,
+                    ),
+                )
+            if not contents:
+                raise ValueError(f'Could not parse pages {shard.start_page}-{shard.end_page}')
+            return renumber_slide_headers(contents, shard.start_page)
+
+        shard_contents = await asyncio.gather(*[parse_shard(shard) for shard in shards])
+        return '\n\n'.join(contents.strip() for contents in shard_contents)
+
+    async def _parse_hybrid(self, file_path: str, system_prompt: str, is_pptx: bool) -> str:
+        """Convert pages from the PDF text layer and send only complex pages to the LLM.
+
+        Pages whose complexity score (figures, equations, tables or missing text
+        layer) reaches ``settings.hybrid_complexity_threshold`` are parsed
+        concurrently by the LLM, one page per call. All other pages use the
+        locally extracted markdown.
+
+        Args:
+            file_path (str): Path to the PDF file.
+            system_prompt (str): The system prompt to use for complex pages.
+            is_pptx (bool): Whether the PDF is a slide deck.
+
+        Returns:
+            str: The markdown contents of the whole document.
+
+        Raises:
+            ValueError: If any complex page could not be parsed.
+        """
+        pages = await asyncio.to_thread(analyze_pdf, file_path, is_pptx)
+        complex_pages = [
+            page.page_number
+            for page in pages
+            if page.complexity.score >= self.settings.hybrid_complexity_threshold
+        ]
+        logger.info(
+            'Hybrid PDF parsing plan',
+            extra={
+                'file_path': file_path,
+                'total_pages': len(pages),
+                'llm_pages': complex_pages,
+            },
+        )
+
+        contents_by_page = {page.page_number: page.markdown for page in pages}
+        if complex_pages:
+            shards = await asyncio.to_thread(extract_pdf_pages, file_path, complex_pages)
+            semaphore = asyncio.Semaphore(self.settings.max_concurrent_shards)
+
+            async def parse_page(shard: PDFShard) -> tuple[int, str]:
+                async with semaphore:
+                    contents = await self._call_llm(
+                        system_prompt,
+                        shard.pdf_bytes,
+                        PDF_SHARD_USER_PROMPT.format(
+                            start_page=shard.start_page,
+                            end_page=shard.end_page,
+                            total_pages=len(pages),
+                        ),
+                    )
+                if not contents:
+                    raise ValueError(f'Could not parse page {shard.start_page}')
+                contents = renumber_slide_headers(contents.strip(), shard.start_page)
+                if is_pptx and not contents.lstrip().startswith('#'):
+                    contents = f'# Slide {shard.start_page} Content:\n\n{contents}'
+                return shard.start_page, contents
+
+            for page_number, contents in await asyncio.gather(*[parse_page(shard) for shard in shards]):
+                contents_by_page[page_number] = contents
+
+        return '\n\n'.join(
+            contents_by_page[page_number].strip()
+            for page_number in sorted(contents_by_page)
+            if contents_by_page[page_number].strip()
+        )
+
+    async def _call_llm(self, system_prompt: str, pdf_bytes: bytes, user_prompt: str | None = None) -> str:
+        """Send PDF bytes to the multimodal LLM and return its markdown response.
+
+        Args:
+            system_prompt (str): The system prompt to use.
+            pdf_bytes (bytes): The PDF document to convert.
+            user_prompt (str | None): Optional instructions sent along with the file.
+
+        Returns:
+            str: The markdown response, empty if the call failed.
+        """
+        output = await self.litellm_service.process_async(
+            inputs=LiteLLMInput(
+                messages=[
+                    CompletionMessage(
+                        role=Role.SYSTEM,
+                        content=system_prompt
+                    ),
+                    CompletionMessage(
+                        role=Role.USER,
+                        content=user_prompt,
+                        file_url=f"data:application/pdf;base64,{base64.b64encode(pdf_bytes).decode('utf-8')}"
+                    )
+                ]
+            )
+        )
+        return output.response
+
     def _delete_files(self, file_path: str):
         """Delete temporary files created during processing.
 
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import re
+import statistics
+
+import fitz
+from base import BaseModel
+from logger import get_logger
+
+logger = get_logger(__name__)
+
+MATH_CHARACTERS = set('∑∏∫∂√∞≈≠≤≥±×÷∈∉⊂⊆∪∩∀∃∇αβγδεζηθλμνξπρστφχψωΓΔΘΛΞΠΣΦΨΩ')
+MATH_FONT_PATTERN = re.compile(r'math|cmmi|cmsy|cmex|symbol|stix|cambria math', re.IGNORECASE)
+BULLET_PATTERN = re.compile(r'^\s*[•▪●◦■□➢►\-–]\s*')
+
+MIN_TEXT_CHARS = 20
+IMAGE_COVERAGE_THRESHOLD = 0.1
+DRAWING_COUNT_THRESHOLD = 20
+MATH_RATIO_THRESHOLD = 0.02
+
+
+class PageComplexity(BaseModel):
+    """Signals used to decide whether a page can be converted from its text layer alone."""
+
+    text_chars: int
+    image_count: int
+    image_coverage: float
+    drawing_count: int
+    table_count: int
+    math_ratio: float
+    has_math_font: bool
+
+    @property
+    def score(self) -> float:
+        """One point per independent signal that the page holds figures, equations, tables or no text layer."""
+        score = 0.0
+        if self.text_chars < MIN_TEXT_CHARS:
+            score += 1.0
+        if self.image_coverage >= IMAGE_COVERAGE_THRESHOLD:
+            score += 1.0
+        if self.drawing_count >= DRAWING_COUNT_THRESHOLD:
+            score += 1.0
+        if self.table_count > 0:
+            score += 1.0
+        if self.has_math_font or self.math_ratio >= MATH_RATIO_THRESHOLD:
+            score += 1.0
+        return score
+
+
+class PageAnalysis(BaseModel):
+    page_number: int
+    markdown: str
+    complexity: PageComplexity
+
+
+def _iter_lines(page_dict: dict):
+    for block in page_dict.get('blocks', []):
+        if block.get('type') != 0:
+            continue
+        for line in block.get('lines', []):
+            spans = [span for span in line.get('spans', []) if span.get('text', '').strip()]
+            if spans:
+                yield spans
+
+
+def _body_font_size(doc: fitz.Document) -> float:
+    sizes: list[float] = []
+    for page in doc:
+        for spans in _iter_lines(page.get_text('dict')):
+            for span in spans:
+                sizes.extend([round(span['size'], 1)] * len(span['text'].strip()))
+    return statistics.median(sizes) if sizes else 12.0
+
+
+def _line_to_markdown(spans: list[dict], body_size: float, heading_level_offset: int) -> str:
+    text = ''.join(span['text'] for span in spans).strip()
+    max_size = max(span['size'] for span in spans)
+
+    if len(text) <= 120 and max_size >= body_size * 1.6:
+        return '#' * (1 + heading_level_offset) + ' ' + text
+    if len(text) <= 120 and max_size >= body_size * 1.25:
+        return '#' * (2 + heading_level_offset) + ' ' + text
+
+    parts: list[str] = []
+    for span in spans:
+        span_text = span['text']
+        # PyMuPDF flag bit 4 marks bold fonts
+        if span['flags'] & 16 and span_text.strip():
+            leading = span_text[: len(span_text) - len(span_text.lstrip())]
+            trailing = span_text[len(span_text.rstrip()):]
+            span_text = f'{leading}**{span_text.strip()}**{trailing}'
+        parts.append(span_text)
+    line = ''.join(parts).strip()
+
+    if BULLET_PATTERN.match(line):
+        line = BULLET_PATTERN.sub('- ', line, count=1)
+    return line
+
+
+def _analyze_page(page: fitz.Page, body_size: float, is_slide: bool) -> PageAnalysis:
+    page_dict = page.get_text('dict')
+    page_area = abs(page.rect) or 1.0
+    lines: list[str] = []
+    math_fonts = False
+    text_chars = 0
+    math_chars = 0
+
+    for spans in _iter_lines(page_dict):
+        lines.append(_line_to_markdown(spans, body_size, heading_level_offset=1 if is_slide else 0))
+        for span in spans:
+            span_text = span['text'].strip()
+            text_chars += len(span_text)
+            math_chars += sum(1 for char in span_text if char in MATH_CHARACTERS)
+            if MATH_FONT_PATTERN.search(span.get('font', '')):
+                math_fonts = True
+
+    image_area = 0.0
+    image_count = 0
+    for image in page.get_images(full=True):
+        image_count += 1
+        for rect in page.get_image_rects(image[0]):
+            image_area += abs(rect & page.rect)
+
+    try:
+        table_count = len(page.find_tables().tables)
+    except Exception:
+        table_count = 0
+
+    complexity = PageComplexity(
+        text_chars=text_chars,
+        image_count=image_count,
+        image_coverage=min(image_area / page_area, 1.0),
+        drawing_count=len(page.get_drawings()),
+        table_count=table_count,
+        math_ratio=math_chars / text_chars if text_chars else 0.0,
+        has_math_font=math_fonts,
+    )
+
+    page_number = page.number + 1
+    body = '\n'.join(lines)
+    markdown = f'# Slide {page_number} Content:\n\n{body}' if is_slide else body
+
+    return PageAnalysis(
+        page_number=page_number,
+        markdown=markdown,
+        complexity=complexity,
+    )
+
+
+def analyze_pdf(path: str, is_slide: bool) -> list[PageAnalysis]:
+    """Convert every page of a PDF from its text layer and score how complex it is.
+
+    Headings are inferred from font sizes relative to the body text, bold spans
+    and bullets are kept as markdown. Slide decks get the same
+    ``# Slide X Content:`` headers the LLM parser emits.
+
+    Args:
+        path (str): Path to the PDF file.
+        is_slide (bool): Whether the PDF is a slide deck.
+
+    Returns:
+        list[PageAnalysis]: One analysis per page, in page order.
+    """
+    doc = fitz.open(path)
+    try:
+        body_size = _body_font_size(doc)
+        return [_analyze_page(page, body_size, is_slide) for page in doc]
+    finally:
+        doc.close()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 import fitz
+from base import BaseModel
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -45,4 +46,99 @@ def is_powerpoint_pdf(path: str) -> bool:
             pass
         return False
     finally:
-        doc.close()
\ No newline at end of file
+        doc.close()
+
+class PDFShard(BaseModel):
+    start_page: int
+    end_page: int
+    pdf_bytes: bytes
+
+
+def split_pdf_into_shards(path: str, pages_per_shard: int) -> list[PDFShard]:
+    """Split a PDF file into consecutive page ranges using PyMuPDF.
+
+    Args:
+        path (str): Path to the PDF file.
+        pages_per_shard (int): Maximum number of pages per shard.
+
+    Returns:
+        list[PDFShard]: The shards in page order, with 1-based inclusive page ranges.
+    """
+    doc = fitz.open(path)
+    try:
+        shards: list[PDFShard] = []
+        for start in range(0, doc.page_count, pages_per_shard):
+            end = min(start + pages_per_shard, doc.page_count) - 1
+            shard_doc = fitz.open()
+            try:
+                shard_doc.insert_pdf(doc, from_page=start, to_page=end)
+                shards.append(
+                    PDFShard(
+                        start_page=start + 1,
+                        end_page=end + 1,
+                        pdf_bytes=shard_doc.tobytes(garbage=3, deflate=True),
+                    )
+                )
+            finally:
+                shard_doc.close()
+        return shards
+    finally:
+        doc.close()
+
+
+def extract_pdf_pages(path: str, page_numbers: list[int]) -> list[PDFShard]:
+    """Extract single pages of a PDF file as standalone one-page documents.
+
+    Args:
+        path (str): Path to the PDF file.
+        page_numbers (list[int]): 1-based page numbers to extract.
+
+    Returns:
+        list[PDFShard]: One single-page shard per requested page, in the given order.
+    """
+    doc = fitz.open(path)
+    try:
+        shards: list[PDFShard] = []
+        for page_number in page_numbers:
+            page_doc = fitz.open()
+            try:
+                page_doc.insert_pdf(doc, from_page=page_number - 1, to_page=page_number - 1)
+                shards.append(
+                    PDFShard(
+                        start_page=page_number,
+                        end_page=page_number,
+                        pdf_bytes=page_doc.tobytes(garbage=3, deflate=True),
+                    )
+                )
+            finally:
+                page_doc.close()
+        return shards
+    finally:
+        doc.close()
+
+
+SLIDE_HEADER_PATTERN = re.compile(r'^(#\s*Slide\s+)(\d+)', re.IGNORECASE | re.MULTILINE)
+
+
+def renumber_slide_headers(markdown: str, first_page: int) -> str:
+    """Shift "# Slide X" headers of a shard so they match the page numbers of the original document.
+
+    The model is asked to number slides from ``first_page`` but sometimes
+    restarts at 1 for every shard; in that case all headers are offset.
+
+    Args:
+        markdown (str): The markdown produced for one shard.
+        first_page (int): The 1-based page number of the first page of the shard.
+
+    Returns:
+        str: The markdown with slide headers numbered from ``first_page``.
+    """
+    numbers = [int(match.group(2)) for match in SLIDE_HEADER_PATTERN.finditer(markdown)]
+    if not numbers or min(numbers) >= first_page:
+        return markdown
+
+    offset = first_page - min(numbers)
+    return SLIDE_HEADER_PATTERN.sub(
+        lambda match: f'{match.group(1)}{int(match.group(2)) + offset}',
+        markdown,
+    )
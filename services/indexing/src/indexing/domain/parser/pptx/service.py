@@ -4,10 +4,10 @@ import os
 from lite_llm import LiteLLMService
 from base import BaseModel
 from base import BaseService
+from office_converter import OfficeConverterService
 from logger import get_logger
 
 from indexing.shared.settings.parser import ParserSetting
-from indexing.domain.parser.pptx.utils import convert_pptx_to_pdf
 from indexing.domain.parser.pdf import PDFInput
 from indexing.domain.parser.pdf import PDFService
 
@@ -26,6 +26,7 @@ class PPTXOutput(BaseModel):
 
 class PPTXService(BaseService):
     litellm_service: LiteLLMService
+    office_converter: OfficeConverterService
     settings: ParserSetting
 
     @property
@@ -48,8 +49,10 @@ class PPTXService(BaseService):
         file_name = os.path.basename(inputs.file_path)
         file_path = inputs.file_path
 
+        pdf_path = ""
+
         try:
-            pdf_path = convert_pptx_to_pdf(
+            pdf_path = await self.office_converter.convert_to_pdf(
                 input_path=file_path,
                 output_dir=self.settings.upload_folder_path
             )
@@ -1,18 +1,25 @@
 from __future__ import annotations
-import json 
+import asyncio
 
 
 from storage.minio import MinioService
 from storage.minio import MinioInput
+from storage.parser_cache import ParserCacheService
+from storage.parser_cache import compute_file_hash
 from lite_llm import LiteLLMService
+from office_converter import OfficeConverterService
 from base import BaseModel
 from base import BaseService
 import os 
-import io 
+import hashlib
 from logger import get_logger
 
 from indexing.domain.parser.pdf import PDFInput
 from indexing.domain.parser.pdf import PDFService
+from indexing.domain.parser.pdf.prompts import PDF_SYSTEM_PROMPT
+from indexing.domain.parser.pdf.prompts import PDF_SYSTEM_PROMPT_PPTX
+from indexing.domain.parser.pdf.prompts import PDF_SHARD_USER_PROMPT
+from indexing.domain.parser.docx.prompts import DOCX_SYSTEM_PROMPT
 from indexing.domain.parser.pptx import PPTXInput 
 from indexing.domain.parser.pptx import PPTXService
 from indexing.domain.parser.docx import DOCXInput
@@ -26,18 +33,24 @@ logger = get_logger(__name__)
 class ParserInput(BaseModel):
     course_code: str
     week_number: int
-    
-    
-class ParserOutput(BaseModel):
+
+
+class ParsedFile(BaseModel):
     contents: str
     file_name: str
+
+
+class ParserOutput(BaseModel):
+    files: list[ParsedFile]
     course_code: str
     week_number: int
-    
+
 
 class ParserService(BaseService):
     litellm_service: LiteLLMService
     minio_service: MinioService
+    parser_cache_service: ParserCacheService
+    office_converter: OfficeConverterService
     settings: ParserSetting
     
     @property
@@ -53,6 +66,7 @@ class ParserService(BaseService):
         """Get the PPTX service."""
         return PPTXService(
             litellm_service=self.litellm_service,
+            office_converter=self.office_converter,
             settings=self.settings
         )
         
@@ -61,16 +75,28 @@ class ParserService(BaseService):
         """Get the DOCX service."""
         return DOCXService(
             litellm_service=self.litellm_service,
+            office_converter=self.office_converter,
             settings=self.settings
         )
 
     async def process(self, inputs: ParserInput) -> ParserOutput:
-        # os.makedirs(self.settings.upload_folder_path, exist_ok=True)
+        """Parse every lecture file of a course week concurrently.
+
+        Files are parsed with at most ``settings.max_concurrent_files`` in flight,
+        and each file is cached and returned separately so downstream chunks keep
+        the name of the file they came from.
+
+        Args:
+            inputs (ParserInput): The course code and week number to parse.
+
+        Returns:
+            ParserOutput: One parsed entry per successfully parsed file, in listing order.
+        """
         folder_path = f"{inputs.course_code}/tuan-{inputs.week_number}"
         os.makedirs(folder_path, exist_ok=True)
         try:
-            contents: list[str] = []
-            files = self.minio_service.list_files(
+            files = await asyncio.to_thread(
+                self.minio_service.list_files,
                 bucket_name=inputs.course_code, 
                 prefix=f"tuan-{inputs.week_number}/",
                 recursive=False
@@ -88,86 +114,23 @@ class ParserService(BaseService):
                 )
                 
                 return ParserOutput(
-                    contents="",
+                    files=[],
                     course_code=inputs.course_code,
                     week_number=inputs.week_number,
                 )
-                
-            filtered_files = [filtered_files[0]]
-                
-            for file in filtered_files:
-                file_path = f"{inputs.course_code}/{file}"
-                filename = file_path.split('/')[-1]
-                
-                is_parser_exist = self.minio_service.check_object_exists(
-                    MinioInput(
-                        bucket_name=inputs.course_code,
-                        object_name=f"tuan-{inputs.week_number}/{filename.split('.')[0]}_parser.txt"
-                    )
-                )
-                
-                if is_parser_exist:
-                    logger.info(
-                        "Parser file already exists, skipping processing",
-                        extra={
-                            "file_name": filename,
-                            "course_code": inputs.course_code,
-                            "week_number": inputs.week_number
-                        }
-                    )
-                    
-                    contents.append(
-                        self.minio_service.get_data_from_file(
-                            MinioInput(
-                                bucket_name=inputs.course_code,
-                                object_name=f"tuan-{inputs.week_number}/{filename.split('.')[0]}_parser.txt"
-                            )
-                        )
-                    )
-                        
-                    continue
-                
-                _ = self.minio_service.download_file(
-                    MinioInput(
-                        bucket_name=inputs.course_code, 
-                        object_name=file,
-                        file_path=file_path
-                    )
-                )
-            
-                file_type = filename.split('.')[-1].lower()
-                
-                if file_type == FileType.DOCX or file_type == FileType.DOC:
-                    docx_input = DOCXInput(
-                        file_path=file_path,
-                    )
-                    output = await self.docx_service.process(docx_input)
-            
-                elif file_type == FileType.PDF:
-                    pdf_input = PDFInput(file_path=file_path)
-                    output = await self.pdf_service.process(pdf_input)
-
-                elif file_type == FileType.PPTX:
-                    pptx_input = PPTXInput(
-                        file_path=file_path,
-                    )
-                    output = await self.pptx_service.process(pptx_input)
-                
-                contents.append(output.contents)
-                    
-                _ = self.minio_service.upload_data(
-                        MinioInput(
-                            bucket_name=inputs.course_code,
-                            object_name=f"tuan-{inputs.week_number}/{filename.split('.')[0]}_parser.txt",
-                            data=io.BytesIO(output.contents.encode('utf-8'))
-                        )
-                    )
+
+            semaphore = asyncio.Semaphore(self.settings.max_concurrent_files)
+            parsed_files = await asyncio.gather(
+                *[
+                    self._parse_file_with_limit(semaphore, inputs, file)
+                    for file in filtered_files
+                ]
+            )
                 
             return ParserOutput(
-                contents="\n".join(contents),
+                files=[parsed_file for parsed_file in parsed_files if parsed_file and parsed_file.contents],
                 course_code=inputs.course_code,
                 week_number=inputs.week_number,
-                file_name=filename,
             )
             
         except Exception as e:
@@ -180,12 +143,184 @@ class ParserService(BaseService):
                 }
             )
             return ParserOutput(
-                contents="",
+                files=[],
                 course_code=inputs.course_code,
                 week_number=inputs.week_number,
-                file_name="",
             )
 
+    async def _parse_file_with_limit(
+        self,
+        semaphore: asyncio.Semaphore,
+        inputs: ParserInput,
+        file: str,
+    ) -> ParsedFile | None:
+        """Parse a single file while holding a slot of the concurrency semaphore.
+
+        Args:
+            semaphore (asyncio.Semaphore): The semaphore bounding concurrent parses.
+            inputs (ParserInput): The course code and week number.
+            file (str): The object name of the file in MinIO.
+
+        Returns:
+            ParsedFile | None: The parsed file, or None if parsing failed.
+        """
+        async with semaphore:
+            try:
+                return await self._parse_file(inputs, file)
+            except Exception as e:
+                logger.exception(
+                    "Error while parsing file",
+                    extra={
+                        "course_code": inputs.course_code,
+                        "week_number": inputs.week_number,
+                        "file_name": file,
+                        "error": str(e)
+                    }
+                )
+                return None
+
+    @property
+    def parser_version(self) -> str:
+        """Version of the parser output used as part of the cache key.
+
+        Combines the configured ``settings.parser_version`` with a digest of the
+        prompts and of the settings that change the produced markdown, so that
+        editing a prompt or switching the PDF parse mode invalidates the cache.
+        """
+        fingerprint = '\n'.join(
+            [
+                PDF_SYSTEM_PROMPT,
+                PDF_SYSTEM_PROMPT_PPTX,
+                PDF_SHARD_USER_PROMPT,
+                DOCX_SYSTEM_PROMPT,
+                self.settings.pdf_parse_mode.value,
+                str(self.settings.pages_per_shard),
+                str(self.settings.hybrid_complexity_threshold),
+            ]
+        )
+        digest = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:12]
+        return f"{self.settings.parser_version}-{digest}"
+
+    async def _get_content_hash(self, inputs: ParserInput, file: str, file_path: str) -> tuple[str, bool]:
+        """Get the SHA-256 of a source file.
+
+        The upload service stores the hash as object metadata, which avoids
+        downloading the file on a cache hit. Older objects without it are
+        downloaded and hashed locally.
+
+        Args:
+            inputs (ParserInput): The course code and week number.
+            file (str): The object name of the file in MinIO.
+            file_path (str): The local path to download the file to.
+
+        Returns:
+            tuple[str, bool]: The content hash and whether the file was downloaded.
+        """
+        source_metadata = await asyncio.to_thread(
+            self.minio_service.get_object_metadata,
+            MinioInput(
+                bucket_name=inputs.course_code,
+                object_name=file
+            )
+        )
+        if source_metadata.get('sha256'):
+            return source_metadata['sha256'], False
+
+        await self._download_file(inputs, file, file_path)
+        return await asyncio.to_thread(compute_file_hash, file_path), True
+
+    async def _download_file(self, inputs: ParserInput, file: str, file_path: str) -> None:
+        _ = await asyncio.to_thread(
+            self.minio_service.download_file,
+            MinioInput(
+                bucket_name=inputs.course_code, 
+                object_name=file,
+                file_path=file_path
+            )
+        )
+
+    async def _parse_file(self, inputs: ParserInput, file: str) -> ParsedFile:
+        """Parse a single file, reusing the cached parser output of identical content.
+
+        The cache is keyed by the SHA-256 of the file bytes and the parser
+        version, so re-uploading a corrected file under the same name is parsed
+        again, while the same file under another name or course is not.
+
+        Args:
+            inputs (ParserInput): The course code and week number.
+            file (str): The object name of the file in MinIO.
+
+        Returns:
+            ParsedFile: The parsed contents and file name.
+        """
+        file_path = f"{inputs.course_code}/{file}"
+        filename = file_path.split('/')[-1]
+        parser_version = self.parser_version
+
+        content_hash, is_downloaded = await self._get_content_hash(inputs, file, file_path)
+        cache_entry = await asyncio.to_thread(
+            self.parser_cache_service.get,
+            content_hash,
+            parser_version,
+        )
+        
+        if cache_entry is not None:
+            logger.info(
+                "Parser output found in cache, skipping processing",
+                extra={
+                    "file_name": filename,
+                    "course_code": inputs.course_code,
+                    "week_number": inputs.week_number,
+                    "content_hash": content_hash,
+                    "parser_version": parser_version,
+                    "cached_from": cache_entry.metadata.get('source-object'),
+                }
+            )
+            if is_downloaded and os.path.exists(file_path):
+                os.remove(file_path)
+            return ParsedFile(contents=cache_entry.contents, file_name=filename)
+        
+        if not is_downloaded:
+            await self._download_file(inputs, file, file_path)
+    
+        file_type = filename.split('.')[-1].lower()
+        
+        if file_type == FileType.DOCX or file_type == FileType.DOC:
+            docx_input = DOCXInput(
+                file_path=file_path,
+            )
+            output = await self.docx_service.process(docx_input)
+    
+        elif file_type == FileType.PDF:
+            pdf_input = PDFInput(file_path=file_path)
+            output = await self.pdf_service.process(pdf_input)
+
+        elif file_type == FileType.PPTX:
+            pptx_input = PPTXInput(
+                file_path=file_path,
+            )
+            output = await self.pptx_service.process(pptx_input)
+
+        else:
+            raise ValueError(f"Unsupported file type: {file_type}")
+        
+        # Never cache a failed parse, otherwise the empty output would be served forever
+        if output.contents:
+            _ = await asyncio.to_thread(
+                self.parser_cache_service.put,
+                content_hash,
+                parser_version,
+                output.contents,
+                {
+                    'source-bucket': inputs.course_code,
+                    'source-object': file,
+                    'file-type': file_type,
+                    'parse-mode': self.settings.pdf_parse_mode.value,
+                },
+            )
+        
+        return ParsedFile(contents=output.contents, file_name=filename)
+
 # if __name__ == "__main__":
 #     from lite_llm import LiteLLMSetting
 #     from pydantic import HttpUrl, SecretStr
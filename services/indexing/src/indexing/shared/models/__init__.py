@@ -1,7 +1,9 @@
 from __future__ import annotations 
 
 from .files import FileType
+from .parser import PDFParseMode
 
 __all__ = [
     'FileType',
-]
\ No newline at end of file
+    'PDFParseMode',
+]
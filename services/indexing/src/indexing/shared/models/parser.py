@@ -0,0 +1,8 @@
+from __future__ import annotations
+
+from enum import Enum
+
+class PDFParseMode(str, Enum):
+    SINGLE = 'single'
+    SHARDED = 'sharded'
+    HYBRID = 'hybrid'
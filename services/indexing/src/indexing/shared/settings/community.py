@@ -0,0 +1,13 @@
+from base import BaseModel
+
+
+class CommunitySetting(BaseModel):
+    enabled: bool = False
+    resolution: float = 1.0
+    seed: int = 0
+    min_community_size: int = 3
+    max_entities_per_community: int = 30
+    max_relationships_per_community: int = 60
+    descriptions_per_entity: int = 2
+    max_input_tokens: int = 6000
+    max_concurrent_reports: int = 4
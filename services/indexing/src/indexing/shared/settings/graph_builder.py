@@ -0,0 +1,17 @@
+from base import BaseModel 
+
+class GraphBuilderSetting(BaseModel):
+    pack_chunks: bool = False
+    max_tokens_per_pack: int = 3000
+    max_chunks_per_pack: int = 6
+    stream_extraction: bool = False
+    max_concurrent_embeddings: int = 8
+    write_batch_size: int = 200
+    write_flush_interval: float = 1.0
+    max_queued_rows: int = 2000
+    resolve_entities: bool = False
+    entity_similarity_threshold: float = 0.9
+    entity_candidates: int = 5
+    max_entity_descriptions: int = 8
+    compact_embedding_dimension: int = 256
+    lexical_dual_write: bool = False
@@ -0,0 +1,9 @@
+from base import BaseModel
+
+
+class JobQueueSetting(BaseModel):
+    database_path: str
+    num_workers: int = 1
+    poll_interval: float = 1.0
+    heartbeat_timeout: float = 120.0
+    progress_flush_interval: float = 1.0
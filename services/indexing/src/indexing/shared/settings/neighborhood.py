@@ -0,0 +1,7 @@
+from base import BaseModel
+
+
+class NeighborhoodSetting(BaseModel):
+    enabled: bool = False
+    top_k: int = 8
+    batch_size: int = 500
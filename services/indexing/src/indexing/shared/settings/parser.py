@@ -1,6 +1,14 @@
 from base import BaseModel 
 
+from indexing.shared.models import PDFParseMode
+
 class ParserSetting(BaseModel):
     upload_folder_path: str
+    parser_version: str = 'v1'
+    max_concurrent_files: int = 4
+    pdf_parse_mode: PDFParseMode = PDFParseMode.SINGLE
+    pages_per_shard: int = 10
+    max_concurrent_shards: int = 4
+    hybrid_complexity_threshold: float = 1.0
     
 
@@ -8,9 +8,17 @@ from pathlib import Path
 
 from lite_llm import LiteLLMSetting
 from graph_db import Neo4jSetting
+from graph_db import Neo4jSchemaSetting
+from office_converter import OfficeConverterSetting
+from open_search import OpenSearchSettings
 from storage.minio import MinioSetting
+from storage.parser_cache import ParserCacheSetting
 from .parser import ParserSetting
 from .chunker import ChunkerSetting
+from .graph_builder import GraphBuilderSetting
+from .job_queue import JobQueueSetting
+from .neighborhood import NeighborhoodSetting
+from .community import CommunitySetting
 
 load_dotenv()
 
@@ -18,10 +26,18 @@ load_dotenv()
 class Settings(BaseSettings):
     
     parser: ParserSetting
+    parser_cache: ParserCacheSetting
+    office_converter: OfficeConverterSetting
     litellm: LiteLLMSetting
     minio: MinioSetting
     chunker: ChunkerSetting
+    graph_builder: GraphBuilderSetting
     neo4j: Neo4jSetting
+    neo4j_schema: Neo4jSchemaSetting
+    job_queue: JobQueueSetting
+    neighborhood: NeighborhoodSetting
+    community: CommunitySetting
+    opensearch: OpenSearchSettings
 
     class Config:
         env_nested_delimiter = '__'
@@ -2,9 +2,16 @@ import uvicorn
 from contextlib import asynccontextmanager
 from fastapi import FastAPI 
 from lite_llm import LiteLLMService
+from graph_db import IndexVersion
 from graph_db import Neo4jService
+from open_search import OpenSearchService
 
 from rag.api.main import router
+from rag.domain.context_packer import ContextPacker
+from rag.domain.hybrid_search import LexicalSearch
+from rag.domain.query_cache import QueryCache
+from rag.domain.query_cache import settings_fingerprint
+from rag.domain.vector_mirror import VectorMirror
 from rag.shared.utils import get_settings
 
 
@@ -19,8 +26,49 @@ async def lifespan(app: FastAPI):
     app.state.neo4j_service = Neo4jService(
         settings=app.state.settings.neo4j
     )
+    app.state.vector_mirror = None
+    if app.state.settings.vector_mirror.enabled:
+        app.state.vector_mirror = VectorMirror(
+            neo4j_service=app.state.neo4j_service,
+            settings=app.state.settings.vector_mirror,
+            dimension=app.state.settings.litellm.dimension,
+        )
+        # searches fall back to the Neo4j vector index until the mirror is loaded
+        await app.state.vector_mirror.load()
+        app.state.vector_mirror.start()
+    app.state.lexical_search = None
+    if app.state.settings.hybrid_search.enabled:
+        app.state.lexical_search = LexicalSearch(
+            opensearch_service=OpenSearchService(settings=app.state.settings.opensearch),
+            settings=app.state.settings.hybrid_search,
+            index_name=app.state.settings.opensearch.index_name,
+        )
+    app.state.context_packer = None
+    if app.state.settings.context_packer.enabled:
+        app.state.context_packer = ContextPacker(
+            neo4j_service=app.state.neo4j_service,
+            settings=app.state.settings.context_packer,
+        )
+    app.state.query_cache = None
+    if app.state.settings.query_cache.enabled:
+        app.state.query_cache = QueryCache(
+            settings=app.state.settings.query_cache,
+            index_version=IndexVersion(neo4j_service=app.state.neo4j_service),
+            namespace=settings_fingerprint(
+                app.state.settings.local_search_settings,
+                app.state.settings.hybrid_search,
+                app.state.settings.vector_mirror,
+                app.state.settings.context_packer,
+            ),
+        )
     
     yield 
+    
+    if app.state.vector_mirror is not None:
+        await app.state.vector_mirror.close()
+    if app.state.query_cache is not None:
+        app.state.query_cache.close()
+    await app.state.neo4j_service.close()
 
 
 app = FastAPI(
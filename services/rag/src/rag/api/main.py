@@ -1,22 +1,129 @@
+from typing import Optional
+
 from fastapi import Request 
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse 
 from rag.application.local_search import LocalSearchApplication, LocalSearchApplicationInput
+from rag.application.local_search import LocalSearchBatchApplication, LocalSearchBatchApplicationInput
+from rag.application.global_search import GlobalSearchApplication, GlobalSearchApplicationInput
 from base import BaseModel
 from logger import get_logger
+from rag.shared.models import SearchScope
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/v1")
 
 class LocalSearchRequest(BaseModel):
     query: str
+    scope: Optional[SearchScope] = None
+
+
+class LocalSearchBatchRequest(BaseModel):
+    queries: list[str]
+    scope: Optional[SearchScope] = None
+
+
+class GlobalSearchRequest(BaseModel):
+    query: str
+    scope: Optional[SearchScope] = None
 
 
 @router.post("/local_search")
 async def local_search(request: Request, local_search_request: LocalSearchRequest):
     """
-    Perform a local search using the provided query.
+    Perform a local search using the provided query, optionally scoped to a course and some of its weeks.
     """
     application = LocalSearchApplication(request=request)
-    result = await application.run(inputs=LocalSearchApplicationInput(input_text=local_search_request.query))
+    result = await application.run(
+        inputs=LocalSearchApplicationInput(
+            input_text=local_search_request.query,
+            scope=local_search_request.scope,
+        )
+    )
+    return JSONResponse(content=result.model_dump())
+
+
+@router.post("/local_search/batch")
+async def local_search_batch(request: Request, local_search_batch_request: LocalSearchBatchRequest):
+    """
+    Perform the local search of several queries with one embedding request and one Neo4j query.
+
+    Chunks shared by several queries are returned once in ``chunk_df``;
+    ``query_chunks[i]`` lists the positions of the chunks of ``queries[i]``.
+    """
+    queries = local_search_batch_request.queries
+    max_batch_queries = request.app.state.settings.local_search_settings.max_batch_queries
+    if not queries or len(queries) > max_batch_queries:
+        return JSONResponse(
+            status_code=400,
+            content={"detail": f"Expected between 1 and {max_batch_queries} queries, got {len(queries)}"},
+        )
+    application = LocalSearchBatchApplication(request=request)
+    result = await application.run(
+        inputs=LocalSearchBatchApplicationInput(
+            input_texts=queries,
+            scope=local_search_batch_request.scope,
+        )
+    )
+    return JSONResponse(content=result.model_dump())
+
+
+@router.post("/global_search")
+async def global_search(request: Request, global_search_request: GlobalSearchRequest):
+    """
+    Answer a broad question (e.g. a summary of a week) with a map-reduce over the closest community reports.
+    """
+    application = GlobalSearchApplication(request=request)
+    result = await application.run(
+        inputs=GlobalSearchApplicationInput(
+            input_text=global_search_request.query,
+            scope=global_search_request.scope,
+        )
+    )
     return JSONResponse(content=result.model_dump())
+
+
+@router.get("/debug/slow_queries")
+async def slow_queries(request: Request, limit: int = 20):
+    """
+    List the slowest Neo4j queries since startup, with per-query aggregates and captured PROFILE plans.
+    """
+    query_log = request.app.state.neo4j_service.query_log
+    return JSONResponse(
+        content={
+            "slow_query_threshold_ms": query_log.slow_query_threshold_ms,
+            "slowest": [execution.model_dump(exclude={"plan"}) for execution in query_log.top_slow(limit)],
+            "queries": [
+                {**stats.model_dump(exclude={"cypher"}), "mean_ms": stats.mean_ms}
+                for stats in query_log.stats()
+            ],
+            "profiles": {name: execution.model_dump() for name, execution in query_log.profiles().items()},
+        }
+    )
+
+
+@router.post("/debug/slow_queries/{query_name}/profile")
+async def profile_query(request: Request, query_name: str):
+    """
+    Run the next execution of a query with PROFILE and keep its plan.
+    """
+    request.app.state.neo4j_service.query_log.request_profile(query_name)
+    return JSONResponse(content={"query_name": query_name, "profile_requested": True})
+
+
+@router.get("/debug/vector_mirror")
+async def vector_mirror(request: Request):
+    """
+    Report the size, memory use and sync version of the in-process vector mirror.
+    """
+    mirror = request.app.state.vector_mirror
+    return JSONResponse(content=mirror.stats() if mirror is not None else {"enabled": False})
+
+
+@router.get("/debug/query_cache")
+async def query_cache(request: Request):
+    """
+    Report the hit rate, size and graph index version of the local search query cache.
+    """
+    cache = request.app.state.query_cache
+    return JSONResponse(content=cache.stats() if cache is not None else {"enabled": False})
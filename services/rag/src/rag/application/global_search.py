@@ -0,0 +1,36 @@
+from base import BaseApplication
+from fastapi import Request
+
+from rag.domain.global_search import GlobalSearch
+from rag.domain.global_search import GlobalSearchInput
+from rag.domain.global_search import GlobalSearchOutput
+
+class GlobalSearchApplicationInput(GlobalSearchInput):
+    pass
+
+class GlobalSearchApplicationOutput(GlobalSearchOutput):
+    pass
+
+class GlobalSearchApplication(BaseApplication):
+
+    request: Request
+
+    @property
+    def global_search(self) -> GlobalSearch:
+        return GlobalSearch(
+            neo4j_service=self.request.app.state.neo4j_service,
+            litellm_service=self.request.app.state.litellm_service,
+            settings=self.request.app.state.settings.global_search,
+        )
+
+    async def run(self, inputs: GlobalSearchApplicationInput) -> GlobalSearchApplicationOutput:
+        """
+        Run the global search application with the provided inputs.
+
+        Args:
+            inputs (GlobalSearchApplicationInput): The question and its optional scope.
+
+        Returns:
+            GlobalSearchApplicationOutput: The answer and the communities it was built from.
+        """
+        return await self.global_search.process(inputs)
@@ -3,6 +3,8 @@ from fastapi import Request
 
 from rag.domain.local_search import LocalSearchInput 
 from rag.domain.local_search import LocalSearch
+from rag.domain.local_search import LocalSearchBatchInput
+from rag.domain.local_search import LocalSearchBatchOutput
 from rag.domain.local_search import LocalSearchOutput
 
 class LocalSearchApplicationInput(LocalSearchInput):
@@ -11,6 +13,12 @@ class LocalSearchApplicationInput(LocalSearchInput):
 class LocalSearchApplicationOutput(LocalSearchOutput):
     pass
 
+class LocalSearchBatchApplicationInput(LocalSearchBatchInput):
+    pass
+
+class LocalSearchBatchApplicationOutput(LocalSearchBatchOutput):
+    pass
+
 class LocalSearchApplication(BaseApplication):
     
     request: Request
@@ -21,6 +29,10 @@ class LocalSearchApplication(BaseApplication):
             neo4j_service=self.request.app.state.neo4j_service,
             litellm_service=self.request.app.state.litellm_service,
             local_search_settings=self.request.app.state.settings.local_search_settings,
+            vector_mirror=self.request.app.state.vector_mirror,
+            lexical_search=self.request.app.state.lexical_search,
+            query_cache=self.request.app.state.query_cache,
+            context_packer=self.request.app.state.context_packer,
         )
 
     async def run(self, inputs: LocalSearchApplicationInput) -> LocalSearchApplicationOutput:
@@ -33,4 +45,19 @@ class LocalSearchApplication(BaseApplication):
         Returns:
             LocalSearchApplicationOutput: The output containing the search results.
         """
-        return await self.local_search.process(inputs)
\ No newline at end of file
+        return await self.local_search.process(inputs)
+
+
+class LocalSearchBatchApplication(LocalSearchApplication):
+
+    async def run(self, inputs: LocalSearchBatchApplicationInput) -> LocalSearchBatchApplicationOutput:
+        """
+        Run the local search of several queries as one batch.
+
+        Args:
+            inputs (LocalSearchBatchApplicationInput): The query texts.
+
+        Returns:
+            LocalSearchBatchApplicationOutput: The deduplicated chunks and the chunk positions of every query.
+        """
+        return await self.local_search.process_batch(inputs)
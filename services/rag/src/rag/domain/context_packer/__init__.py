@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from .service import ContextPacker
+
+__all__ = [
+    'ContextPacker',
+]
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+
+CHUNK_EMBEDDINGS = """MATCH (c:Chunk)
+WHERE c.uid IN $uids AND c.embedding IS NOT NULL
+RETURN c.uid AS uid, c.embedding AS embedding
+"""
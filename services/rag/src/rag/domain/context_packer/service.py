@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from typing import Any
+from typing import Optional
+
+import numpy as np
+from base import BaseModel
+from graph_db import Neo4jService
+from logger import get_logger
+from rag.shared.settings.context_packer import ContextPackerSetting
+from rag.shared.utils import tokens_calculator
+
+from .cypher_query import CHUNK_EMBEDDINGS
+
+logger = get_logger(__name__)
+
+
+def _unique(values: list) -> list:
+    return [value for value in dict.fromkeys(values) if value]
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class ContextPacker(BaseModel):
+    """Select the most relevant context that fits a token budget.
+
+    The context rows are grouped by chunk, near-duplicate chunks are removed
+    and the others ordered with maximal marginal relevance (MMR) over the
+    chunk embeddings, then chunks are added in that order while they fit in
+    ``token_budget``. Relationships are capped per chunk and dropped first
+    when a chunk does not fit with all of them.
+    """
+
+    neo4j_service: Neo4jService
+    settings: ContextPackerSetting
+
+    async def pack(self, rows: list[dict], embedded_query: list[float]) -> list[dict]:
+        """
+        Pack the context rows of a query.
+
+        Args:
+            rows (list[dict]): Context rows (chunk_uid, chunk, entity_description,
+                relationship_descriptions, file_name, similarity_score).
+            embedded_query (list[float]): The embedding of the query.
+
+        Returns:
+            list[dict]: Chunks with their entities, relationships and file names,
+                most relevant first, in the format of ``post_process_context``.
+        """
+        candidates = self._group(rows)
+        if not candidates:
+            return []
+
+        relevance, similarity = await self._similarities(candidates, embedded_query)
+        order, duplicates = self._mmr(relevance, similarity)
+        packed, tokens = self._fit([candidates[position] for position in order])
+        logger.debug(
+            'Context packed',
+            extra={
+                'candidates': len(candidates),
+                'duplicates': duplicates,
+                'packed': len(packed),
+                'tokens': tokens,
+                'token_budget': self.settings.token_budget,
+            },
+        )
+        return packed
+
+    def _group(self, rows: list[dict]) -> list[dict[str, Any]]:
+        grouped: dict[str, dict[str, Any]] = {}
+        for row in sorted(rows, key=lambda row: row.get('similarity_score') or 0.0, reverse=True):
+            key = row.get('chunk_uid') or row['chunk']
+            candidate = grouped.setdefault(
+                key,
+                {
+                    'chunk_uid': row.get('chunk_uid'),
+                    'chunk': row['chunk'],
+                    'entities': [],
+                    'relationships': [],
+                    'file_name': [],
+                    'score': row.get('similarity_score') or 0.0,
+                },
+            )
+            candidate['entities'].append(row['entity_description'])
+            candidate['relationships'].extend(row['relationship_descriptions'] or [])
+            candidate['file_name'].append(row['file_name'])
+
+        for candidate in grouped.values():
+            for key in ('entities', 'relationships', 'file_name'):
+                candidate[key] = _unique(candidate[key])
+        return list(grouped.values())
+
+    async def _similarities(
+        self,
+        candidates: list[dict[str, Any]],
+        embedded_query: list[float],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Relevance of every chunk to the query and chunk-to-chunk cosine similarities.
+
+        Chunks without an embedding keep their retrieval score as relevance and
+        are never considered duplicates.
+        """
+        relevance = np.array([candidate['score'] for candidate in candidates], dtype=np.float32)
+        vectors = np.zeros((len(candidates), len(embedded_query)), dtype=np.float32)
+        embeddings = await self._chunk_embeddings([candidate['chunk_uid'] for candidate in candidates])
+        for position, candidate in enumerate(candidates):
+            embedding = embeddings.get(candidate['chunk_uid'])
+            if embedding is not None and len(embedding) == len(embedded_query):
+                vectors[position] = embedding
+
+        vectors = _unit(vectors)
+        embedded = np.any(vectors != 0, axis=1)
+        query = _unit(np.asarray(embedded_query, dtype=np.float32))
+        relevance[embedded] = vectors[embedded] @ query
+        return relevance, vectors @ vectors.T
+
+    async def _chunk_embeddings(self, uids: list[Optional[str]]) -> dict[str, np.ndarray]:
+        uids = [uid for uid in uids if uid]
+        if not uids:
+            return {}
+        columns = await self.neo4j_service.execute_read(
+            CHUNK_EMBEDDINGS,
+            {'uids': uids},
+            output_format='numpy',
+            vector_keys=['embedding'],
+            query_name='CHUNK_EMBEDDINGS',
+        )
+        if not isinstance(columns, dict):
+            logger.error('Failed to read chunk embeddings', extra={'error': columns.error})
+            return {}
+        return dict(zip(columns['uid'], columns['embedding']))
+
+    def _mmr(self, relevance: np.ndarray, similarity: np.ndarray) -> tuple[list[int], int]:
+        """Order the chunks by maximal marginal relevance, leaving out near-duplicates.
+
+        Returns:
+            tuple[list[int], int]: Positions of the kept chunks in MMR order and
+                the number of near-duplicates left out.
+        """
+        mmr_lambda = self.settings.mmr_lambda
+        remaining = list(range(len(relevance)))
+        selected: list[int] = []
+        duplicates = 0
+        while remaining:
+            redundancy = (
+                similarity[remaining][:, selected].max(axis=1)
+                if selected
+                else np.zeros(len(remaining), dtype=np.float32)
+            )
+            best = int(np.argmax(mmr_lambda * relevance[remaining] - (1.0 - mmr_lambda) * redundancy))
+            position = remaining.pop(best)
+            if redundancy[best] >= self.settings.duplicate_threshold:
+                duplicates += 1
+            else:
+                selected.append(position)
+        return selected, duplicates
+
+    def _tokens(self, texts: list[str]) -> list[int]:
+        return [tokens_calculator(text, model=self.settings.token_model) for text in texts]
+
+    def _fit(self, candidates: list[dict[str, Any]]) -> tuple[list[dict], int]:
+        """Add the chunks in order while they fit in the token budget.
+
+        Returns:
+            tuple[list[dict], int]: The packed chunks and their token count.
+        """
+        budget = self.settings.token_budget
+        packed = []
+        used = 0
+        for candidate in candidates:
+            relationships = candidate['relationships'][: self.settings.max_relationships_per_chunk]
+            base = sum(self._tokens([candidate['chunk'], *candidate['entities'], *candidate['file_name']]))
+            relationship_tokens = self._tokens(relationships)
+            # drop the last relationships until the chunk fits
+            while relationships and used + base + sum(relationship_tokens) > budget:
+                relationships.pop()
+                relationship_tokens.pop()
+            tokens = base + sum(relationship_tokens)
+            if used + tokens > budget:
+                continue
+            used += tokens
+            packed.append(
+                {
+                    'chunk': candidate['chunk'],
+                    'entities': candidate['entities'],
+                    'relationships': relationships,
+                    'file_name': candidate['file_name'],
+                }
+            )
+        return packed, used
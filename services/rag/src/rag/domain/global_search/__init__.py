@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from .service import GlobalSearch
+from .service import GlobalSearchInput
+from .service import GlobalSearchOutput
+
+__all__ = [
+    'GlobalSearch',
+    'GlobalSearchInput',
+    'GlobalSearchOutput',
+]
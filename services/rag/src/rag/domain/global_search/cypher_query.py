@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+
+# Community reports closest to the query, inside the weeks of the scope; a scoped
+# search reads the per-course index, which only holds the communities of the course
+COMMUNITY_SEARCH = """
+CALL db.index.vector.queryNodes($index_name, $candidates, $embedding)
+YIELD node, score
+WHERE size($week_numbers) = 0 OR any(week IN node.week_numbers WHERE week IN $week_numbers)
+RETURN
+    node.uid AS uid,
+    node.title AS title,
+    node.summary AS summary,
+    node.findings AS findings,
+    node.rating AS rating,
+    2 * score - 1 AS similarity
+ORDER BY similarity DESC, rating DESC
+LIMIT $top_communities
+"""
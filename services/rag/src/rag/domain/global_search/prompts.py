@@ -0,0 +1,43 @@
+GLOBAL_SEARCH_MAP_PROMPT = """<role>
+You help students by answering broad questions about their IT courses from reports on groups of related concepts.
+</role>
+
+<instructions>
+Read the community report below and list the points of the report that help answer the question.
+For every point give:
+- description: the point, self-contained and faithful to the report (keep formulas exactly as written).
+- score: how much the point helps answer the question, from 0 (not at all) to 100 (essential).
+Return an empty list when the report is not relevant to the question.
+</instructions>
+
+<question>
+{question}
+</question>
+
+<report>
+# {title}
+
+{summary}
+
+{findings}
+</report>
+"""
+
+GLOBAL_SEARCH_REDUCE_PROMPT = """<role>
+You help students by answering broad questions about their IT courses.
+</role>
+
+<instructions>
+Answer the question using only the key points below, which were collected from several reports and are ordered from most to least useful.
+Combine overlapping points, organize the answer by theme and leave out points that do not help.
+If the points do not contain the answer, say so. Answer in the language of the question.
+</instructions>
+
+<question>
+{question}
+</question>
+
+<key_points>
+{points}
+</key_points>
+"""
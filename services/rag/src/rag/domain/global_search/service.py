@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+from typing import Optional
+
+from base import BaseModel
+from base import BaseService
+from graph_db import Neo4jService
+from lite_llm import CompletionMessage
+from lite_llm import LiteLLMEmbeddingInput
+from lite_llm import LiteLLMInput
+from lite_llm import LiteLLMService
+from lite_llm import Role
+from logger import get_logger
+from rag.shared.models import SearchScope
+from rag.shared.settings.global_search import GlobalSearchSetting
+from rag.shared.utils import tokens_calculator
+
+from .cypher_query import COMMUNITY_SEARCH
+from .prompts import GLOBAL_SEARCH_MAP_PROMPT
+from .prompts import GLOBAL_SEARCH_REDUCE_PROMPT
+
+logger = get_logger(__name__)
+
+
+class GlobalSearchInput(BaseModel):
+    input_text: str
+    scope: Optional[SearchScope] = None
+
+
+class GlobalSearchOutput(BaseModel):
+    answer: str
+    communities: list[dict[str, Any]]
+
+
+class MapPoint(BaseModel):
+    description: str
+    score: int
+
+
+class MapAnswer(BaseModel):
+    points: list[MapPoint]
+
+
+class GlobalSearch(BaseService):
+    """Answer broad questions from the community reports of the knowledge graph.
+
+    The reports are written offline by the indexing service. At query time the
+    ``top_communities`` reports closest to the question are mapped to scored
+    key points, at most ``max_concurrent_maps`` LLM calls at a time, and the
+    best points that fit in ``reduce_token_budget`` are reduced to one answer.
+    """
+
+    neo4j_service: Neo4jService
+    litellm_service: LiteLLMService
+    settings: GlobalSearchSetting
+
+    async def process(self, inputs: GlobalSearchInput) -> GlobalSearchOutput:
+        """
+        Answer a question from the community reports.
+
+        Args:
+            inputs (GlobalSearchInput): The question and its optional course scope.
+
+        Returns:
+            GlobalSearchOutput: The answer and the communities it was built from.
+        """
+        embedding_result = await self.litellm_service.embedding_llm_async(
+            inputs=LiteLLMEmbeddingInput(text=inputs.input_text)
+        )
+        if not embedding_result.embedding:
+            raise Exception('Could not embed the question')
+
+        communities = await self._communities(embedding_result.embedding, inputs.scope)
+        if not communities:
+            logger.error('Not found community reports for the question')
+            return GlobalSearchOutput(answer='', communities=[])
+
+        semaphore = asyncio.Semaphore(self.settings.max_concurrent_maps)
+
+        async def map_community(community: dict) -> list[MapPoint]:
+            async with semaphore:
+                return await self._map(inputs.input_text, community)
+
+        mapped = await asyncio.gather(*(map_community(community) for community in communities))
+        points = sorted(
+            (point for community_points in mapped for point in community_points if point.score > 0),
+            key=lambda point: point.score,
+            reverse=True,
+        )
+        answer = await self._reduce(inputs.input_text, points) if points else ''
+        logger.info(
+            'Global search completed',
+            extra={'communities': len(communities), 'points': len(points)},
+        )
+        return GlobalSearchOutput(
+            answer=answer,
+            communities=[
+                {
+                    'uid': community['uid'],
+                    'title': community['title'],
+                    'similarity': community['similarity'],
+                    'points': sum(point.score > 0 for point in community_points),
+                }
+                for community, community_points in zip(communities, mapped)
+            ],
+        )
+
+    async def _communities(self, embedding: list[float], scope: Optional[SearchScope]) -> list[dict]:
+        rows = await self.neo4j_service.execute_read(
+            COMMUNITY_SEARCH,
+            {
+                'index_name': scope.index_name(self.settings.index_name) if scope is not None else self.settings.index_name,
+                'candidates': self.settings.candidates,
+                'top_communities': self.settings.top_communities,
+                'embedding': embedding,
+                'week_numbers': scope.week_numbers if scope is not None else [],
+            },
+            output_format='records',
+            query_name='COMMUNITY_SEARCH',
+        )
+        if not isinstance(rows, list):
+            logger.error('Community search failed', extra={'error': rows.error})
+            return []
+        return rows
+
+    async def _map(self, question: str, community: dict) -> list[MapPoint]:
+        """Key points of one community report, an empty list on failure."""
+        try:
+            output = await self.litellm_service.process_async(
+                inputs=LiteLLMInput(
+                    messages=[
+                        CompletionMessage(
+                            role=Role.USER,
+                            content=GLOBAL_SEARCH_MAP_PROMPT.format(
+                                question=question,
+                                title=community['title'],
+                                summary=community['summary'],
+                                findings='\n'.join(f'- {finding}' for finding in community['findings'] or []),
+                            ),
+                        )
+                    ],
+                    response_format=MapAnswer,
+                )
+            )
+        except Exception as e:
+            logger.exception('Global search map failed', extra={'community': community['uid'], 'error': str(e)})
+            return []
+        if not isinstance(output.response, MapAnswer):
+            logger.error('Global search map failed', extra={'community': community['uid']})
+            return []
+        return output.response.points
+
+    async def _reduce(self, question: str, points: list[MapPoint]) -> str:
+        """Answer from the best points that fit in the token budget."""
+        budget = self.settings.reduce_token_budget
+        lines = []
+        for point in points:
+            line = f'- ({point.score}) {point.description}'
+            tokens = tokens_calculator(line, model=self.settings.token_model)
+            if tokens > budget:
+                break
+            budget -= tokens
+            lines.append(line)
+
+        output = await self.litellm_service.process_async(
+            inputs=LiteLLMInput(
+                messages=[
+                    CompletionMessage(
+                        role=Role.USER,
+                        content=GLOBAL_SEARCH_REDUCE_PROMPT.format(question=question, points='\n'.join(lines)),
+                    )
+                ],
+            )
+        )
+        return output.response if isinstance(output.response, str) else ''
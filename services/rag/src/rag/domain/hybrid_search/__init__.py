@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from .service import EntitySearch
+from .service import LexicalSearch
+
+__all__ = [
+    'EntitySearch',
+    'LexicalSearch',
+]
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+
+ENTITY_CANDIDATES = """CALL db.index.vector.queryNodes($index_name, $query_nodes, $embedding)
+YIELD node, score WHERE node.type = 'ENTITY' AND (size($week_numbers) = 0 OR node.week_number IN $week_numbers)
+RETURN node.uid AS uid, score ORDER BY score DESC LIMIT $k
+"""
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from base import BaseModel
+from graph_db import Neo4jService
+from graph_db import course_slug
+from logger import get_logger
+from open_search import DESCRIPTION_KIND
+from open_search import OpenSearchService
+from rag.domain.vector_mirror import VectorMirror
+from rag.shared.models import SearchScope
+from rag.shared.settings.hybrid_search import HybridSearchSetting
+from rag.shared.settings.local_search import ExtractEntitySetting
+from rag.shared.utils import reciprocal_rank_fusion
+
+from .cypher_query import ENTITY_CANDIDATES
+
+logger = get_logger(__name__)
+
+
+class LexicalSearch(BaseModel):
+    """BM25 search over the entity descriptions dual-written to OpenSearch by the indexing service."""
+
+    opensearch_service: OpenSearchService
+    settings: HybridSearchSetting
+    index_name: str
+
+    async def search(self, text: str, size: int, scope: Optional[SearchScope] = None) -> list[dict]:
+        """
+        Rank entity descriptions by BM25 on their entity name and text.
+
+        Args:
+            text (str): The query text.
+            size (int): Number of descriptions to return.
+            scope (Optional[SearchScope]): Course and weeks to search in.
+
+        Returns:
+            list[dict]: ``{'uid', 'score'}`` dicts, best first; empty on error.
+        """
+        filters = [
+            {'term': {'kind': DESCRIPTION_KIND}},
+            {'term': {'description_type': 'ENTITY'}},
+        ]
+        if scope is not None:
+            # documents are stamped with the course slug; the raw code matches
+            # the documents indexed before the slug was used
+            course_codes = sorted({course_slug(scope.course_code), scope.course_code})
+            filters.append({'terms': {'course_code': course_codes}})
+            if scope.week_numbers:
+                filters.append({'terms': {'week_number': scope.week_numbers}})
+        query = {
+            'size': size,
+            '_source': False,
+            'query': {
+                'bool': {
+                    'must': {
+                        'multi_match': {
+                            'query': text,
+                            'fields': self.settings.lexical_fields,
+                        },
+                    },
+                    'filter': filters,
+                },
+            },
+        }
+        hits = await asyncio.to_thread(self.opensearch_service.search_hits, self.index_name, query)
+        return [{'uid': hit['_id'], 'score': hit['_score']} for hit in hits]
+
+
+class EntitySearch(BaseModel):
+    """Entity description candidates computed outside of the graph query.
+
+    Combines the in-process vector mirror and the lexical search when they
+    are available:
+
+    - neither: returns None, the graph query runs the Neo4j vector index itself;
+    - vector mirror only: its top-k;
+    - lexical search: vector (mirror or Neo4j vector index) and BM25 rankings
+      are retrieved concurrently and fused with reciprocal rank fusion.
+
+    The vector mirror holds every course, so scoped searches use the
+    per-course Neo4j vector index instead.
+    """
+
+    neo4j_service: Neo4jService
+    extract_entity_setting: ExtractEntitySetting
+    vector_mirror: Optional[VectorMirror] = None
+    lexical_search: Optional[LexicalSearch] = None
+
+    @property
+    def mirror_ready(self) -> bool:
+        return self.vector_mirror is not None and self.vector_mirror.ready
+
+    async def _vector_candidates(
+        self,
+        embedding: list[float],
+        size: int,
+        scope: Optional[SearchScope] = None,
+    ) -> list[dict]:
+        if self.mirror_ready and scope is None:
+            return await self.vector_mirror.query(embedding, size)
+
+        index_name = self.extract_entity_setting.index_name
+        rows = await self.neo4j_service.execute_read(
+            ENTITY_CANDIDATES,
+            {
+                'index_name': scope.index_name(index_name) if scope is not None else index_name,
+                'week_numbers': scope.week_numbers if scope is not None else [],
+                'query_nodes': max(self.extract_entity_setting.query_nodes, size),
+                'embedding': embedding,
+                'k': size,
+            },
+            output_format='records',
+            query_name='ENTITY_CANDIDATES',
+        )
+        if not isinstance(rows, list):
+            logger.error('Vector entity candidates failed', extra={'error': rows.error})
+            return []
+        return rows
+
+    async def hits(
+        self,
+        text: str,
+        embedding: list[float],
+        k: int,
+        scope: Optional[SearchScope] = None,
+    ) -> Optional[list[dict]]:
+        """
+        Ranked entity description hits for a query.
+
+        Args:
+            text (str): The query text.
+            embedding (list[float]): The query embedding.
+            k (int): Number of descriptions the caller keeps.
+            scope (Optional[SearchScope]): Course and weeks to search in.
+
+        Returns:
+            Optional[list[dict]]: ``{'uid', 'score'}`` dicts, best first, or None
+                when the Neo4j vector index should be queried in the graph query.
+        """
+        if self.lexical_search is None:
+            if self.mirror_ready and scope is None:
+                return await self.vector_mirror.query(embedding, k)
+            return None
+
+        settings = self.lexical_search.settings
+        size = max(k, settings.candidates)
+        vector_hits, lexical_hits = await asyncio.gather(
+            self._vector_candidates(embedding, size, scope),
+            self.lexical_search.search(text, size, scope),
+        )
+        fused = reciprocal_rank_fusion(
+            [[hit['uid'] for hit in vector_hits], [hit['uid'] for hit in lexical_hits]],
+            k=settings.rrf_k,
+        )
+        logger.debug(
+            'Hybrid entity search',
+            extra={'vector_hits': len(vector_hits), 'lexical_hits': len(lexical_hits), 'fused': len(fused)},
+        )
+        return fused[:size]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
 from .search import LocalSearch
+from .search import LocalSearchBatchInput
+from .search import LocalSearchBatchOutput
 from .search import LocalSearchInput
 from .search import LocalSearchOutput
@@ -0,0 +1,115 @@
+"""Compare the latency of the local search retrieval paths and similarity modes.
+
+Every similarity mode (vector index, native cosine, GDS cosine) is timed with
+the three-query and the single round-trip path against the configured
+database; run it on a graph of realistic size, e.g. after indexing a course.
+The GDS mode is skipped when the plugin is not installed. The query embedding
+is computed once and cached, so only retrieval is timed.
+
+Usage:
+    python -m rag.domain.local_search.benchmark "<query>" [runs]
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+
+from graph_db import Neo4jService
+from lite_llm import LiteLLMEmbeddingInput
+from lite_llm import LiteLLMService
+from lite_llm.models import LiteLLMEmbeddingOutput
+from pydantic import PrivateAttr
+from rag.shared.utils import get_settings
+from rag.shared.utils import SIMILARITY_MODES
+
+from .search import LocalSearch
+from .search import LocalSearchInput
+
+
+class _CachedEmbeddingService(LiteLLMService):
+    """LiteLLMService embedding every text once."""
+
+    _cache: dict[str, LiteLLMEmbeddingOutput] = PrivateAttr(default_factory=dict)
+
+    async def embedding_llm_async(self, inputs: LiteLLMEmbeddingInput) -> LiteLLMEmbeddingOutput:
+        if inputs.text not in self._cache:
+            self._cache[inputs.text] = await super().embedding_llm_async(inputs)
+        return self._cache[inputs.text]
+
+
+GRAPH_SIZE = """
+CALL { MATCH (c:Chunk) RETURN count(c) AS chunks }
+CALL { MATCH (e:Entity) RETURN count(e) AS entities }
+CALL { MATCH (d:Description) RETURN count(d) AS descriptions }
+RETURN chunks, entities, descriptions
+"""
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(percentile / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def benchmark(query: str, runs: int = 50) -> dict[str, dict[str, float]]:
+    """Time every retrieval path and similarity mode on the same query.
+
+    Args:
+        query (str): The query to search.
+        runs (int): Timed searches per variant, after one warm-up search.
+
+    Returns:
+        dict[str, dict[str, float]]: p50, p99 and mean milliseconds per variant.
+    """
+    settings = get_settings()
+    neo4j_service = Neo4jService(settings=settings.neo4j)
+    litellm_service = _CachedEmbeddingService(litellm_setting=settings.litellm)
+    timings: dict[str, dict[str, float]] = {}
+    try:
+        graph_size = await neo4j_service.execute_read(GRAPH_SIZE, output_format='records', query_name='GRAPH_SIZE')
+        if isinstance(graph_size, list) and graph_size:
+            print('graph:', ', '.join(f'{count} {label}' for label, count in graph_size[0].items()))
+        has_gds = isinstance(await neo4j_service.execute_read(
+            'RETURN gds.version() AS version', output_format='records',
+        ), list)
+
+        variants = [
+            (mode, single_round_trip)
+            for mode in SIMILARITY_MODES
+            if has_gds or mode != 'gds'
+            for single_round_trip in (False, True)
+        ]
+        for mode, single_round_trip in variants:
+            name = f'{mode}/{"single_round_trip" if single_round_trip else "three_queries"}'
+            local_search = LocalSearch(
+                neo4j_service=neo4j_service,
+                litellm_service=litellm_service,
+                local_search_settings=settings.local_search_settings.model_copy(
+                    update={'single_round_trip': single_round_trip, 'similarity_mode': mode},
+                ),
+            )
+            inputs = LocalSearchInput(input_text=query)
+            await local_search.process(inputs)
+
+            samples = []
+            for _ in range(runs):
+                start_time = time.perf_counter()
+                await local_search.process(inputs)
+                samples.append((time.perf_counter() - start_time) * 1000)
+            timings[name] = {
+                'p50': _percentile(samples, 50),
+                'p99': _percentile(samples, 99),
+                'mean': statistics.mean(samples),
+            }
+    finally:
+        await neo4j_service.close()
+    return timings
+
+
+if __name__ == '__main__':
+    number_of_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    results = asyncio.run(benchmark(sys.argv[1], number_of_runs))
+    for path, stats in results.items():
+        print(f'{path:>30}: p50 {stats["p50"]:8.1f} ms  p99 {stats["p99"]:8.1f} ms  mean {stats["mean"]:8.1f} ms')
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+
+ENTITY_VECTOR_SEARCH = """
+CALL db.index.vector.queryNodes($index_name, $query_nodes, $embedding)
+YIELD node, score WHERE node.type = 'ENTITY' AND (size($week_numbers) = 0 OR node.week_number IN $week_numbers)
+"""
+
+# Entity descriptions already ranked by the in-process vector mirror
+ENTITY_MIRROR_HITS = """
+UNWIND $entity_hits AS hit
+MATCH (node:Description {uid: hit.uid})
+WITH node, hit.score AS score
+"""
+
+# Template: the similarity placeholders are filled by rag.shared.utils.render_similarity,
+# <NEIGHBORHOOD> / <FILE_NAME> by rag.shared.utils.render_neighborhood,
+# <QUERY> carries the current query through the batched variant.
+_GRAPH_EXPANSION = """
+MATCH (node)<-[:DESCRIBED]-(entity:Entity)
+WITH <QUERY>entity, node, score
+ORDER BY score DESC LIMIT $entity_k
+
+WITH
+  <QUERY>collect(DISTINCT entity.name) AS entity_names,
+  collect(DISTINCT node.uid) AS description_ids,
+  collect(DISTINCT node.chunk_uid) AS entity_chunk_ids
+
+CALL {
+  WITH <QUERY>entity_chunk_ids
+  <CHUNK_HITS>
+  MATCH (chunk:Chunk)
+  WHERE chunk.uid IN entity_chunk_ids
+  WITH chunk, <CHUNK_SCORE:chunk> AS chunk_score
+  WHERE chunk_score > $threshold
+  RETURN chunk.uid AS chunk_uid
+  ORDER BY chunk_score DESC LIMIT $chunk_k
+}
+WITH <QUERY>entity_names, description_ids, collect(chunk_uid) AS chunk_uids
+<DESCRIPTION_HITS>
+
+MATCH (e:Entity)-[rel]-(c:Chunk)
+WHERE c.uid IN chunk_uids AND e.name IN entity_names
+
+<NEIGHBORHOOD>
+
+OPTIONAL MATCH (e)-[:DESCRIBED]->(d2)
+WHERE d2.uid IN description_ids AND d2.embedding IS NOT NULL
+
+WITH
+  e, c, d, d2, <FILE_NAME> AS file_name,
+  CASE
+    WHEN d IS NOT NULL THEN <DESCRIPTION_SCORE:d>
+    WHEN d2 IS NOT NULL THEN <DESCRIPTION_SCORE:d2>
+    ELSE 0.0
+  END AS similarity_score
+
+RETURN
+    e.name AS entity_name,
+    c.uid AS chunk_uid,
+    c.text AS chunk,
+    d2.text AS entity_description,
+    COLLECT(DISTINCT d.text) AS relationship_descriptions,
+    file_name,
+    similarity_score
+ORDER BY similarity_score DESC
+LIMIT $k
+"""
+
+GRAPH_EXPANSION = _GRAPH_EXPANSION.replace('<QUERY>', '')
+
+# SIMILARITY_GETTING, TEXT_UNIT_MAPPING and CONTEXT_MAPPER chained in one
+# query: same ordering and limits, ids are passed between the stages in-database.
+LOCAL_SEARCH_RETRIEVAL = ENTITY_VECTOR_SEARCH + GRAPH_EXPANSION
+LOCAL_SEARCH_EXPANSION = ENTITY_MIRROR_HITS + GRAPH_EXPANSION
+
+# Batched variants: the same pipeline runs once per element of $queries
+# ({index, embedding, entity_hits}); rendered with vector_parameter='query.embedding'.
+BATCH_ENTITY_VECTOR_SEARCH = """
+UNWIND $queries AS query
+CALL {
+WITH query
+CALL db.index.vector.queryNodes($index_name, $query_nodes, query.embedding)
+YIELD node, score WHERE node.type = 'ENTITY' AND (size($week_numbers) = 0 OR node.week_number IN $week_numbers)
+"""
+
+BATCH_ENTITY_MIRROR_HITS = """
+UNWIND $queries AS query
+CALL {
+WITH query
+UNWIND query.entity_hits AS hit
+MATCH (node:Description {uid: hit.uid})
+WITH query, node, hit.score AS score
+"""
+
+BATCH_RETURN = """
+}
+RETURN
+    query.index AS query_index,
+    entity_name,
+    chunk_uid,
+    chunk,
+    entity_description,
+    relationship_descriptions,
+    file_name,
+    similarity_score
+"""
+
+BATCH_GRAPH_EXPANSION = _GRAPH_EXPANSION.replace('<QUERY>', 'query, ')
+LOCAL_SEARCH_BATCH_RETRIEVAL = BATCH_ENTITY_VECTOR_SEARCH + BATCH_GRAPH_EXPANSION + BATCH_RETURN
+LOCAL_SEARCH_BATCH_EXPANSION = BATCH_ENTITY_MIRROR_HITS + BATCH_GRAPH_EXPANSION + BATCH_RETURN
@@ -5,3 +5,8 @@ YIELD node, score WHERE node.type = 'ENTITY'
 MATCH (node)<-[:DESCRIBED]-(e:Entity)
 RETURN e.name AS name, e.type AS type, node.uid AS description_id, node.text AS description, node.chunk_uid AS chunk_id, score ORDER BY score DESC limit $k
 """
+
+SIMILARITY_LOOKUP = """UNWIND $hits AS hit
+MATCH (node:Description {uid: hit.uid})<-[:DESCRIBED]-(e:Entity)
+RETURN e.name AS name, e.type AS type, node.uid AS description_id, node.text AS description, node.chunk_uid AS chunk_id, hit.score AS score ORDER BY score DESC limit $k
+"""
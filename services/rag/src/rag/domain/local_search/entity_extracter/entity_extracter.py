@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Optional
+
 import pandas as pd
 from base import BaseModel
 from base import BaseService
@@ -7,9 +9,11 @@ from lite_llm import LiteLLMEmbeddingInput
 from lite_llm import LiteLLMService
 from logger import get_logger
 from graph_db import Neo4jService 
+from rag.domain.hybrid_search import EntitySearch
 from rag.shared.settings.local_search import ExtractEntitySetting
 
 from .cypher_query import SIMILARITY_GETTING
+from .cypher_query import SIMILARITY_LOOKUP
 
 
 logger = get_logger(__name__)
@@ -37,6 +41,7 @@ class EntityExtracter(BaseService):
     neo4j_service: Neo4jService
     litellm_service: LiteLLMService
     extract_entity_setting: ExtractEntitySetting
+    entity_search: Optional[EntitySearch] = None
 
     async def process(self, input: EntityExtracterInput) -> EntityExtracterOutput:
         """
@@ -59,7 +64,7 @@ class EntityExtracter(BaseService):
             if not embedded_query:
                 raise Exception('Could not extract entities from input')
 
-            similar_entities = await self.__get_similar_entities(embedded_query)
+            similar_entities = await self.__get_similar_entities(embedded_query, input.text)
             return EntityExtracterOutput(
                 entities=similar_entities,
                 embedded_query=embedded_query,
@@ -98,12 +103,16 @@ class EntityExtracter(BaseService):
             )
             return None
 
-    async def __get_similar_entities(self, input_vector: list[float]) -> pd.DataFrame:
+    async def __get_similar_entities(self, input_vector: list[float], text: str = '') -> pd.DataFrame:
         """
         Retrieve entities from Neo4j that are most similar to the input embedding vector.
 
+        The entity hits come from the entity search (vector mirror and/or hybrid
+        lexical search) when it has any, from the Neo4j vector index otherwise.
+
         Args:
             input_vector (list[float]): The embedding vector to use for similarity search.
+            text (str): The query text, used by the lexical search when enabled.
 
         Returns:
             pd.DataFrame: DataFrame of similar entities, chunk IDs, and similarity scores.
@@ -112,7 +121,21 @@ class EntityExtracter(BaseService):
             Exception: If the output is not a DataFrame or retrieval fails.
         """
         try:
-            results = await self.neo4j_service.execute_query(
+            hits = None
+            if self.entity_search is not None:
+                hits = await self.entity_search.hits(text, input_vector, self.extract_entity_setting.top_k)
+            if hits is not None:
+                return await self.neo4j_service.execute_read(
+                    cypher=SIMILARITY_LOOKUP,
+                    parameters={
+                        'hits': hits,
+                        'k': self.extract_entity_setting.top_k,
+                    },
+                    output_format='pandas',
+                    query_name='SIMILARITY_LOOKUP',
+                )
+
+            results = await self.neo4j_service.execute_read(
                 cypher=SIMILARITY_GETTING,
                 parameters={
                     'index_name': self.extract_entity_setting.index_name,
@@ -121,6 +144,7 @@ class EntityExtracter(BaseService):
                     'query_nodes': self.extract_entity_setting.query_nodes,
                 },
                 output_format='pandas',
+                query_name='SIMILARITY_GETTING',
             )
             return results
         except Exception as e:
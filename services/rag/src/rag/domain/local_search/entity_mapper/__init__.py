@@ -2,8 +2,16 @@ from __future__ import annotations
 
 from .entity_mapper import EntityMapper
 from .entity_mapper import EntityMapperInput
+from .entity_mapper import merge_batch_chunks
+from .entity_mapper import post_process_batch_context
+from .entity_mapper import post_process_context
+from .entity_mapper import split_batch_context
 
 __all__ = [
     'EntityMapper',
     'EntityMapperInput',
+    'merge_batch_chunks',
+    'post_process_batch_context',
+    'post_process_context',
+    'split_batch_context',
 ]
@@ -12,6 +12,8 @@ from graph_db import Neo4jService
 from pandas import DataFrame
 from rag.shared.settings.local_search import ExtractChunkSetting
 from rag.shared.settings.local_search import ExtractRelationshipSetting
+from rag.shared.utils import render_neighborhood
+from rag.shared.utils import render_similarity
 
 from .cypher_query import CONTEXT_MAPPER
 from .cypher_query import TEXT_UNIT_MAPPING
@@ -33,6 +35,10 @@ class EntityMapper(BaseService):
     neo4j_service: Neo4jService
     extract_chunk_settings: ExtractChunkSetting
     extract_relationship_settings: ExtractRelationshipSetting
+    description_index_name: str = 'description_index'
+    similarity_mode: str = 'vector_index'
+    index_candidates: int = 100
+    materialized_neighborhoods: bool = False
 
     async def process(self, inputs: EntityMapperInput) -> list[dict] | None:
         """
@@ -97,7 +103,7 @@ class EntityMapper(BaseService):
             return None
 
         try:
-            context_mapper = self.__post_process_context(context_mapper.to_dict())
+            context_mapper = self.__post_process_context(context_mapper.to_dict('records'))
         except Exception as e:
             logger.exception(
                 f'Error while post-processing context mapping: {e}',
@@ -121,15 +127,18 @@ class EntityMapper(BaseService):
             DataFrame | None: DataFrame of mapped text units, or None if mapping fails.
         """
         try:
-            df = await self.neo4j_service.execute_query(
-                cypher=TEXT_UNIT_MAPPING,
+            df = await self.neo4j_service.execute_read(
+                cypher=render_similarity(TEXT_UNIT_MAPPING, self.similarity_mode),
                 parameters={
                     'chunk_ids': chunk_id,
                     'input_vector': embedded_query,
+                    'chunk_index_name': self.extract_chunk_settings.index_name,
+                    'index_candidates': self.index_candidates,
                     'threshold': self.extract_chunk_settings.threshold,
                     'k': self.extract_chunk_settings.top_k,
                 },
                 output_format='pandas',
+                query_name='TEXT_UNIT_MAPPING',
             )
 
             return df
@@ -160,16 +169,22 @@ class EntityMapper(BaseService):
             DataFrame | None: DataFrame of mapped related entities and context, or None if mapping fails.
         """
         try:
-            df = await self.neo4j_service.execute_query(
-                cypher=CONTEXT_MAPPER,
+            df = await self.neo4j_service.execute_read(
+                cypher=render_similarity(
+                    render_neighborhood(CONTEXT_MAPPER, self.materialized_neighborhoods, chunk_uids='$chunk_uids'),
+                    self.similarity_mode,
+                ),
                 parameters={
                     'entity_names': entity_names,
                     'chunk_uids': chunk_ids,
                     'description_ids': description_ids,
                     'input_vector': embedded_query,
+                    'description_index_name': self.description_index_name,
+                    'index_candidates': self.index_candidates,
                     'k': self.extract_relationship_settings.top_k,
                 },
                 output_format='pandas',
+                query_name='CONTEXT_MAPPER',
             )
             return df
 
@@ -179,31 +194,106 @@ class EntityMapper(BaseService):
             )
             return None
 
-    def __post_process_context(self, context: dict) -> list:
+    def __post_process_context(self, context: list[dict]) -> list:
         """
         Group and organize context data by chunk, aggregating entities, relationships, and file names.
 
         Args:
-            context (dict): Dictionary with keys 'chunk', 'entity_description', 'relationship_descriptions', and 'file_name'.
+            context (list[dict]): Rows with keys 'chunk', 'entity_description', 'relationship_descriptions', and 'file_name'.
 
         Returns:
             list: List of dictionaries, each with a chunk, unique entities, relationships, and file names.
         """
-        grouped: dict = defaultdict(lambda: {'entities': [], 'relationships': [], 'file_name': []})
-
-        for idx, chunk in context['chunk'].items():
-            grouped[chunk]['entities'].append(context['entity_description'][idx])
-            grouped[chunk]['relationships'].extend(context['relationship_descriptions'][idx])
-            grouped[chunk]['file_name'].append(context['file_name'][idx])
-
-        # Remove duplicates
-        result = [
-            {
-                'chunk': chunk,
-                'entities': list(set(values['entities'])),
-                'relationships': list(set(values['relationships'])),
-                'file_name': list(set(values['file_name'])),
-            }
-            for chunk, values in grouped.items()
-        ]
-        return result
+        return post_process_context(context)
+
+
+def post_process_context(context: list[dict]) -> list:
+    """
+    Group and organize context rows by chunk, aggregating entities, relationships, and file names.
+
+    Args:
+        context (list[dict]): Rows with keys 'chunk', 'entity_description', 'relationship_descriptions', and 'file_name'.
+
+    Returns:
+        list: List of dictionaries, each with a chunk, unique entities, relationships, and file names.
+    """
+    grouped: dict = defaultdict(lambda: {'entities': [], 'relationships': [], 'file_name': []})
+
+    for row in context:
+        grouped[row['chunk']]['entities'].append(row['entity_description'])
+        grouped[row['chunk']]['relationships'].extend(row['relationship_descriptions'])
+        grouped[row['chunk']]['file_name'].append(row['file_name'])
+
+    # Remove duplicates
+    result = [
+        {
+            'chunk': chunk,
+            'entities': list(set(values['entities'])),
+            'relationships': list(set(values['relationships'])),
+            'file_name': list(set(values['file_name'])),
+        }
+        for chunk, values in grouped.items()
+    ]
+    return result
+
+
+def split_batch_context(context: list[dict], queries: int) -> list[list[dict]]:
+    """
+    Split the context rows of a batch of queries by their 'query_index'.
+
+    Args:
+        context (list[dict]): Context rows with a 'query_index' key.
+        queries (int): Number of queries in the batch.
+
+    Returns:
+        list[list[dict]]: The rows of every query, in query order.
+    """
+    per_query: list[list[dict]] = [[] for _ in range(queries)]
+    for row in context:
+        per_query[row['query_index']].append(row)
+    return per_query
+
+
+def merge_batch_chunks(per_query_chunks: list[list[dict]]) -> tuple[list, list[list[int]]]:
+    """
+    Keep each chunk once across the chunks of a batch of queries.
+
+    Args:
+        per_query_chunks (list[list[dict]]): Grouped chunks of every query, in query order.
+
+    Returns:
+        tuple[list, list[list[int]]]: The deduplicated chunks (entities, relationships
+            and file names merged across queries) and, per query, the positions of
+            its chunks in that list.
+    """
+    chunks: list = []
+    positions: dict[str, int] = {}
+    query_chunks = []
+    for items in per_query_chunks:
+        indices = []
+        for item in items:
+            position = positions.get(item['chunk'])
+            if position is None:
+                position = positions[item['chunk']] = len(chunks)
+                chunks.append(item)
+            else:
+                merged = chunks[position]
+                for key in ('entities', 'relationships', 'file_name'):
+                    merged[key] = list(dict.fromkeys(merged[key] + item[key]))
+            indices.append(position)
+        query_chunks.append(indices)
+    return chunks, query_chunks
+
+
+def post_process_batch_context(context: list[dict], queries: int) -> tuple[list, list[list[int]]]:
+    """
+    Group the context rows of a batch of queries, keeping each chunk once across the batch.
+
+    Args:
+        context (list[dict]): Rows of :func:`post_process_context` with a 'query_index' key.
+        queries (int): Number of queries in the batch.
+
+    Returns:
+        tuple[list, list[list[int]]]: See :func:`merge_batch_chunks`.
+    """
+    return merge_batch_chunks([post_process_context(rows) for rows in split_batch_context(context, queries)])
@@ -1,33 +1,78 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Optional
+
 import pandas as pd
+from lite_llm import LiteLLMBatchEmbeddingInput
+from lite_llm import LiteLLMEmbeddingInput
 from lite_llm import LiteLLMService
 from graph_db import Neo4jService
+from rag.domain.context_packer import ContextPacker
+from rag.domain.hybrid_search import EntitySearch
+from rag.domain.hybrid_search import LexicalSearch
 from rag.domain.local_search.entity_extracter import EntityExtracter
 from rag.domain.local_search.entity_extracter import EntityExtracterInput
+from rag.domain.query_cache import QueryCache
+from rag.domain.vector_mirror import VectorMirror
+from rag.shared.models import SearchScope
 from rag.shared.settings.local_search import LocalSearchSettings
+from rag.shared.utils import render_neighborhood
+from rag.shared.utils import render_similarity
 from logger import get_logger
 from base import BaseModel
 from base import BaseService
 
+from .cypher_query import LOCAL_SEARCH_BATCH_EXPANSION
+from .cypher_query import LOCAL_SEARCH_BATCH_RETRIEVAL
+from .cypher_query import LOCAL_SEARCH_EXPANSION
+from .cypher_query import LOCAL_SEARCH_RETRIEVAL
 from .entity_mapper import EntityMapper
 from .entity_mapper import EntityMapperInput
+from .entity_mapper import merge_batch_chunks
+from .entity_mapper import post_process_batch_context
+from .entity_mapper import post_process_context
+from .entity_mapper import split_batch_context
 
 logger = get_logger(__name__)
 
 
 class LocalSearchInput(BaseModel):
     input_text: str
+    scope: Optional[SearchScope] = None
 
 
 class LocalSearchOutput(BaseModel):
     chunk_df: list
 
 
+class LocalSearchBatchInput(BaseModel):
+    input_texts: list[str]
+    scope: Optional[SearchScope] = None
+
+
+class LocalSearchBatchOutput(BaseModel):
+    chunk_df: list
+    query_chunks: list[list[int]]
+
+
 class LocalSearch(BaseService):
     neo4j_service: Neo4jService
     litellm_service: LiteLLMService
     local_search_settings: LocalSearchSettings
+    vector_mirror: Optional[VectorMirror] = None
+    lexical_search: Optional[LexicalSearch] = None
+    query_cache: Optional[QueryCache] = None
+    context_packer: Optional[ContextPacker] = None
+
+    @property
+    def entity_search(self) -> EntitySearch:
+        return EntitySearch(
+            neo4j_service=self.neo4j_service,
+            extract_entity_setting=self.local_search_settings.extract_entity_settings,
+            vector_mirror=self.vector_mirror,
+            lexical_search=self.lexical_search,
+        )
 
     @property
     def entity_extracter(self) -> EntityExtracter:
@@ -35,6 +80,7 @@ class LocalSearch(BaseService):
             neo4j_service=self.neo4j_service,
             litellm_service=self.litellm_service,
             extract_entity_setting=self.local_search_settings.extract_entity_settings,
+            entity_search=self.entity_search,
         )
 
     @property
@@ -43,6 +89,10 @@ class LocalSearch(BaseService):
             neo4j_service=self.neo4j_service,
             extract_chunk_settings=self.local_search_settings.extract_chunk_settings,
             extract_relationship_settings=self.local_search_settings.extract_relationship_settings,
+            description_index_name=self.local_search_settings.extract_entity_settings.index_name,
+            similarity_mode=self.local_search_settings.similarity_mode,
+            index_candidates=self.local_search_settings.index_candidates,
+            materialized_neighborhoods=self.local_search_settings.materialized_neighborhoods,
         )
 
     async def process(self, inputs: LocalSearchInput) -> LocalSearchOutput:
@@ -50,7 +100,9 @@ class LocalSearch(BaseService):
         Process input text using local entity extraction and mapping to generate a structured search output.
 
         Extracts entities from the input, maps them to relevant document chunks and context, and returns the result.
-        If no relevant information is found, returns an empty output.
+        If no relevant information is found, returns an empty output. Non-empty outputs are served from and
+        stored in the query cache when it is enabled. Scoped searches always use the single round-trip
+        retrieval, which reads the per-course vector indexes.
 
         Args:
             inputs (LocalSearchInput): The input containing the text to process.
@@ -58,6 +110,23 @@ class LocalSearch(BaseService):
         Returns:
             LocalSearchOutput: Output with mapped context, completion time, LLM calls, and prompt tokens.
         """
+        scope = inputs.scope.model_dump() if inputs.scope is not None else None
+        version = None
+        if self.query_cache is not None:
+            cached, version = await self.query_cache.get(inputs.input_text, scope)
+            if cached is not None:
+                return LocalSearchOutput(chunk_df=cached)
+
+        output = await self._process(inputs)
+        # empty outputs may come from a failed retrieval and are not cached
+        if self.query_cache is not None and output.chunk_df:
+            await self.query_cache.put(inputs.input_text, output.chunk_df, version, scope)
+        return output
+
+    async def _process(self, inputs: LocalSearchInput) -> LocalSearchOutput:
+        if self.local_search_settings.single_round_trip or inputs.scope is not None:
+            return await self._process_single_round_trip(inputs)
+
         # Step 1: Extract entities
         extracted_entities, embedded_query = await self._extract_entities(
             inputs.input_text,
@@ -82,6 +151,213 @@ class LocalSearch(BaseService):
             chunk_df=mapped_data,
         )
 
+    async def _process_single_round_trip(self, inputs: LocalSearchInput) -> LocalSearchOutput:
+        """
+        Run entity search, chunk scoring and context mapping as one Neo4j query.
+
+        Equivalent to the three-step path (same queries, same limits) but with a
+        single round trip and deduplicated ids passed between the stages. The
+        context is fitted to a token budget when the context packer is enabled.
+
+        Args:
+            inputs (LocalSearchInput): The input containing the text to process.
+
+        Returns:
+            LocalSearchOutput: Output with mapped context.
+        """
+        embedding_result = await self.litellm_service.embedding_llm_async(
+            inputs=LiteLLMEmbeddingInput(text=inputs.input_text)
+        )
+        if not embedding_result.embedding:
+            raise Exception('Could not extract entities from input')
+
+        rows = await self.retrieve(embedding_result.embedding, inputs.input_text, inputs.scope)
+        if not rows:
+            logger.error(
+                'Not found information on documents in database',
+            )
+            return LocalSearchOutput(
+                chunk_df=[],
+            )
+
+        if self.context_packer is not None:
+            return LocalSearchOutput(
+                chunk_df=await self.context_packer.pack(rows, embedding_result.embedding),
+            )
+        return LocalSearchOutput(
+            chunk_df=post_process_context(rows),
+        )
+
+    async def process_batch(self, inputs: LocalSearchBatchInput) -> LocalSearchBatchOutput:
+        """
+        Run the local search of several queries with one embedding request and one Neo4j query.
+
+        Args:
+            inputs (LocalSearchBatchInput): The query texts.
+
+        Returns:
+            LocalSearchBatchOutput: The chunks of all queries, each kept once, and
+                the positions of every query's chunks in that list.
+        """
+        embedding_result = await self.litellm_service.batch_embedding_llm_async(
+            inputs=LiteLLMBatchEmbeddingInput(texts=inputs.input_texts)
+        )
+        if len(embedding_result.embeddings) != len(inputs.input_texts):
+            raise Exception('Could not extract entities from input')
+
+        rows = await self.retrieve_batch(embedding_result.embeddings, inputs.input_texts, inputs.scope)
+        if not rows:
+            logger.error(
+                'Not found information on documents in database',
+                extra={'queries': len(inputs.input_texts)},
+            )
+
+        if self.context_packer is not None:
+            # every query gets its own token budget before chunks are shared
+            per_query_chunks = await asyncio.gather(
+                *(
+                    self.context_packer.pack(query_rows, embedding)
+                    for query_rows, embedding in zip(
+                        split_batch_context(rows, len(inputs.input_texts)),
+                        embedding_result.embeddings,
+                    )
+                )
+            )
+            chunks, query_chunks = merge_batch_chunks(list(per_query_chunks))
+        else:
+            chunks, query_chunks = post_process_batch_context(rows, len(inputs.input_texts))
+        return LocalSearchBatchOutput(
+            chunk_df=chunks,
+            query_chunks=query_chunks,
+        )
+
+    async def retrieve(
+        self,
+        embedded_query: list[float],
+        query_text: str = '',
+        scope: Optional[SearchScope] = None,
+    ) -> list[dict]:
+        """
+        Retrieve the context rows of an embedded query in a single read transaction.
+
+        Args:
+            embedded_query (list[float]): The embedding of the query.
+            query_text (str): The query text, used by the lexical search when enabled.
+            scope (Optional[SearchScope]): Course and weeks to search in; the
+                per-course vector indexes are queried instead of the global ones.
+
+        Returns:
+            list[dict]: Context rows (entity_name, chunk, entity_description,
+                relationship_descriptions, file_name, similarity_score), empty on failure.
+        """
+        settings = self.local_search_settings
+        # with entity hits from the vector mirror or the hybrid search Neo4j only runs the graph expansion
+        entity_hits = await self.entity_search.hits(
+            query_text, embedded_query, settings.extract_entity_settings.top_k, scope,
+        )
+
+        rows = await self.neo4j_service.execute_read(
+            render_similarity(
+                render_neighborhood(
+                    LOCAL_SEARCH_EXPANSION if entity_hits is not None else LOCAL_SEARCH_RETRIEVAL,
+                    settings.materialized_neighborhoods,
+                ),
+                settings.similarity_mode,
+                vector_parameter='$embedding',
+            ),
+            {
+                **self._retrieval_parameters(scope),
+                'entity_hits': entity_hits,
+                'embedding': embedded_query,
+            },
+            output_format='records',
+            query_name='LOCAL_SEARCH_EXPANSION' if entity_hits is not None else 'LOCAL_SEARCH_RETRIEVAL',
+        )
+        if not isinstance(rows, list):
+            logger.error(
+                'Local search retrieval failed',
+                extra={'error': rows.error},
+            )
+            return []
+        return rows
+
+    async def retrieve_batch(
+        self,
+        embedded_queries: list[list[float]],
+        query_texts: list[str],
+        scope: Optional[SearchScope] = None,
+    ) -> list[dict]:
+        """
+        Retrieve the context rows of several embedded queries in a single read transaction.
+
+        The pipeline of :meth:`retrieve` runs once per query inside an
+        ``UNWIND`` over the queries, with the same limits per query.
+
+        Args:
+            embedded_queries (list[list[float]]): The embeddings of the queries.
+            query_texts (list[str]): The query texts, used by the lexical search when enabled.
+            scope (Optional[SearchScope]): Course and weeks every query searches in.
+
+        Returns:
+            list[dict]: Context rows of :meth:`retrieve` with a 'query_index' key, empty on failure.
+        """
+        settings = self.local_search_settings
+        top_k = settings.extract_entity_settings.top_k
+        entity_hits = await asyncio.gather(
+            *(
+                self.entity_search.hits(text, embedding, top_k, scope)
+                for text, embedding in zip(query_texts, embedded_queries)
+            )
+        )
+        expansion = all(hits is not None for hits in entity_hits)
+
+        rows = await self.neo4j_service.execute_read(
+            render_similarity(
+                render_neighborhood(
+                    LOCAL_SEARCH_BATCH_EXPANSION if expansion else LOCAL_SEARCH_BATCH_RETRIEVAL,
+                    settings.materialized_neighborhoods,
+                ),
+                settings.similarity_mode,
+                vector_parameter='query.embedding',
+            ),
+            {
+                **self._retrieval_parameters(scope),
+                'queries': [
+                    {'index': index, 'embedding': embedding, 'entity_hits': hits}
+                    for index, (embedding, hits) in enumerate(zip(embedded_queries, entity_hits))
+                ],
+            },
+            output_format='records',
+            query_name='LOCAL_SEARCH_BATCH_EXPANSION' if expansion else 'LOCAL_SEARCH_BATCH_RETRIEVAL',
+        )
+        if not isinstance(rows, list):
+            logger.error(
+                'Batch local search retrieval failed',
+                extra={'error': rows.error, 'queries': len(embedded_queries)},
+            )
+            return []
+        return rows
+
+    def _retrieval_parameters(self, scope: Optional[SearchScope] = None) -> dict:
+        settings = self.local_search_settings
+        description_index_name = settings.extract_entity_settings.index_name
+        chunk_index_name = settings.extract_chunk_settings.index_name
+        if scope is not None:
+            description_index_name = scope.index_name(description_index_name)
+            chunk_index_name = scope.index_name(chunk_index_name)
+        return {
+            'index_name': description_index_name,
+            'description_index_name': description_index_name,
+            'chunk_index_name': chunk_index_name,
+            'week_numbers': scope.week_numbers if scope is not None else [],
+            'index_candidates': settings.index_candidates,
+            'query_nodes': settings.extract_entity_settings.query_nodes,
+            'entity_k': settings.extract_entity_settings.top_k,
+            'threshold': settings.extract_chunk_settings.threshold,
+            'chunk_k': settings.extract_chunk_settings.top_k,
+            'k': settings.extract_relationship_settings.top_k,
+        }
+
     async def _extract_entities(
         self,
         input_text: str,
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from .service import QueryCache
+from .service import normalize_query
+from .service import settings_fingerprint
+
+__all__ = [
+    'QueryCache',
+    'normalize_query',
+    'settings_fingerprint',
+]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from typing import Any
+from typing import Optional
+
+from base import BaseModel
+from graph_db import IndexVersion
+from logger import get_logger
+from pydantic import PrivateAttr
+from rag.shared.settings.query_cache import QueryCacheSetting
+
+from .store import DiskStore
+from .store import MemoryStore
+
+logger = get_logger(__name__)
+
+# disk entries written between two size prunes
+PUTS_PER_PRUNE = 1000
+
+
+def normalize_query(text: str) -> str:
+    """Cache form of a query: NFC, case-folded, single spaces, no trailing punctuation."""
+    text = unicodedata.normalize('NFC', text).casefold()
+    return re.sub(r'\s+', ' ', text).strip().rstrip('?!.').rstrip()
+
+
+def settings_fingerprint(*settings: BaseModel) -> str:
+    """Short hash of the settings a cached result depends on."""
+    digest = hashlib.sha256()
+    for setting in settings:
+        digest.update(setting.model_dump_json().encode())
+    return digest.hexdigest()[:16]
+
+
+class QueryCache(BaseModel):
+    """Retrieval results keyed by normalized query text and retrieval settings.
+
+    Every entry records the graph index version it was computed at; entries
+    of another version are misses. The version is re-read from Neo4j at most
+    every ``version_check_interval`` seconds, so a new indexing run is picked
+    up within that delay. While the version cannot be read the cache is
+    bypassed. A value is stored at the version its lookup was made at, so a
+    result computed across an indexing run is never filed under the new
+    version. Errors of the disk store (e.g. a locked SQLite file) are logged
+    and treated as misses.
+
+    Entries live in a per-process LRU and, with ``settings.path``, in a SQLite
+    file shared by the workers of the host.
+    """
+
+    settings: QueryCacheSetting
+    index_version: IndexVersion
+    namespace: str = ''
+    _memory: Optional[MemoryStore] = PrivateAttr(default=None)
+    _disk: Optional[DiskStore] = PrivateAttr(default=None)
+    _version: Optional[int] = PrivateAttr(default=None)
+    _checked_at: float = PrivateAttr(default=float('-inf'))
+    _puts: int = PrivateAttr(default=0)
+    _counters: dict[str, int] = PrivateAttr(
+        default_factory=lambda: {'hits': 0, 'disk_hits': 0, 'misses': 0, 'invalidations': 0, 'bypassed': 0}
+    )
+
+    def model_post_init(self, __context) -> None:
+        self._memory = MemoryStore(max_entries=self.settings.max_entries)
+        if self.settings.path:
+            self._disk = DiskStore(path=self.settings.path, max_entries=self.settings.max_disk_entries)
+
+    def key(self, text: str, scope: Optional[dict[str, Any]] = None) -> str:
+        payload = json.dumps([self.namespace, normalize_query(text), scope], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def version(self) -> Optional[int]:
+        """The graph index version, re-read when older than ``version_check_interval``."""
+        now = time.monotonic()
+        if now - self._checked_at < self.settings.version_check_interval:
+            return self._version
+
+        self._checked_at = now
+        version = await self.index_version.read()
+        if version is not None and version != self._version:
+            if self._version is not None:
+                self._counters['invalidations'] += self._memory.clear()
+                logger.info('Query cache invalidated', extra={'version': version, 'previous': self._version})
+            if self._disk is not None:
+                try:
+                    await asyncio.to_thread(self._disk.prune, version)
+                except Exception as e:
+                    logger.exception(f'Query cache disk prune failed: {e}')
+        self._version = version
+        return version
+
+    def _fresh(self, entry: Any, version: int) -> bool:
+        entry_version, created_at, _ = entry
+        return entry_version == version and time.time() - created_at < self.settings.ttl
+
+    async def get(self, text: str, scope: Optional[dict[str, Any]] = None) -> tuple[Optional[Any], Optional[int]]:
+        """The cached value of a query (in a search scope), None on a miss.
+
+        Returns:
+            tuple[Optional[Any], Optional[int]]: The value and the index version
+                of the lookup, to pass to :meth:`put` on a miss; None while the
+                version cannot be read.
+        """
+        version = await self.version()
+        if version is None:
+            self._counters['bypassed'] += 1
+            return None, None
+
+        key = self.key(text, scope)
+        entry = self._memory.get(key)
+        if entry is not None:
+            if self._fresh(entry, version):
+                self._counters['hits'] += 1
+                return entry[2], version
+            self._memory.delete(key)
+            self._counters['invalidations'] += 1
+
+        if self._disk is not None:
+            try:
+                entry = await asyncio.to_thread(self._disk.get, key)
+            except Exception as e:
+                logger.exception(f'Query cache disk read failed: {e}')
+                entry = None
+            if entry is not None and self._fresh(entry, version):
+                self._memory.put(key, entry)
+                self._counters['disk_hits'] += 1
+                return entry[2], version
+
+        self._counters['misses'] += 1
+        return None, version
+
+    async def put(
+        self,
+        text: str,
+        value: Any,
+        version: Optional[int],
+        scope: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Cache the value of a query (in a search scope) at the version returned by its :meth:`get`."""
+        if version is None:
+            return
+
+        key = self.key(text, scope)
+        entry = (version, time.time(), value)
+        self._memory.put(key, entry)
+        if self._disk is not None:
+            try:
+                await asyncio.to_thread(self._disk.put, key, entry)
+                self._puts += 1
+                if self._puts % PUTS_PER_PRUNE == 0:
+                    await asyncio.to_thread(self._disk.prune, version)
+            except Exception as e:
+                logger.exception(f'Query cache disk write failed: {e}')
+
+    def stats(self) -> dict[str, Any]:
+        """Counters and hit rate since startup."""
+        counters = self._counters
+        lookups = counters['hits'] + counters['disk_hits'] + counters['misses']
+        return {
+            **counters,
+            'lookups': lookups,
+            'hit_rate': round((counters['hits'] + counters['disk_hits']) / lookups, 4) if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'disk_path': self.settings.path or None,
+            'version': self._version,
+            'namespace': self.namespace,
+        }
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
@@ -0,0 +1,128 @@
+"""Storage backends of the query cache.
+
+Entries are ``(version, created_at, value)`` tuples keyed by the cache key;
+values are JSON-serializable.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from typing import Optional
+
+from base import BaseModel
+from pydantic import PrivateAttr
+
+Entry = tuple[int, float, Any]
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    value TEXT NOT NULL
+)
+"""
+
+
+class MemoryStore(BaseModel):
+    """Least recently used entries of one worker process."""
+
+    max_entries: int
+    _entries: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Entry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: Entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> int:
+        size = len(self._entries)
+        self._entries.clear()
+        return size
+
+
+class DiskStore(BaseModel):
+    """SQLite file shared by the workers of one host.
+
+    WAL mode lets every uvicorn worker read while another one writes. Calls
+    are blocking and meant to run in a thread (``asyncio.to_thread``).
+    """
+
+    path: str
+    max_entries: int
+    _connection: Optional[sqlite3.Connection] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(CREATE_TABLE)
+            self._connection = connection
+        return self._connection
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute('SELECT count(*) FROM entries').fetchone()[0]
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT version, created_at, value FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def put(self, key: str, entry: Entry) -> None:
+        version, created_at, value = entry
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO entries (key, version, created_at, value) VALUES (?, ?, ?, ?)',
+                (key, version, created_at, json.dumps(value, ensure_ascii=False)),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self.connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+
+    def prune(self, version: int) -> int:
+        """Delete the entries of other versions and the oldest ones beyond ``max_entries``.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        with self._lock:
+            deleted = self.connection.execute('DELETE FROM entries WHERE version != ?', (version,)).rowcount
+            deleted += self.connection.execute(
+                'DELETE FROM entries WHERE key IN '
+                '(SELECT key FROM entries ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            ).rowcount
+        return deleted
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
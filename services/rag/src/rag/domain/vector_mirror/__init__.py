@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from .index import FlatIndex
+from .index import HnswIndex
+from .service import VectorMirror
+
+__all__ = [
+    'FlatIndex',
+    'HnswIndex',
+    'VectorMirror',
+]
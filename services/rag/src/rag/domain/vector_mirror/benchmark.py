@@ -0,0 +1,135 @@
+"""Measure recall, search latency and memory of the vector mirror configurations.
+
+Single-stage indexes are compared with two-stage searches (compact Matryoshka
+prefix or binary codes, then re-scoring of the candidates at full dimension).
+Recall@k is measured against the exact float32 search. The in-memory cost of
+a two-stage search is its first stage only, since full embeddings are read
+from Neo4j; that read is not part of the timings.
+
+Without an embeddings file, clustered random vectors with a decaying
+per-dimension variance stand in for Matryoshka embeddings. The hnsw backend is
+skipped when hnswlib is not installed.
+
+Usage:
+    python -m rag.domain.vector_mirror.benchmark [vectors] [dimension] [queries] [embeddings.npy]
+"""
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from typing import Callable
+from typing import Optional
+
+import numpy as np
+
+from .index import BINARY
+from .index import FLOAT32
+from .index import FlatIndex
+from .index import HnswIndex
+from .index import INT8
+from .index import normalize
+from .index import top_k
+
+RESCORE_CANDIDATES = 100
+
+
+def _synthetic(vectors: int, dimension: int, queries: int) -> tuple[np.ndarray, np.ndarray]:
+    generator = np.random.default_rng(0)
+    centers = generator.standard_normal((max(1, vectors // 50), dimension), dtype=np.float32)
+    data = centers[generator.integers(0, len(centers), vectors)]
+    data += 0.5 * generator.standard_normal((vectors, dimension), dtype=np.float32)
+    data *= (1.0 + np.arange(dimension, dtype=np.float32) / 64) ** -0.5
+    picked = data[generator.integers(0, vectors, queries)]
+    query_vectors = picked + 0.3 * generator.standard_normal(picked.shape, dtype=np.float32) * data.std(axis=0)
+    return normalize(data), normalize(query_vectors)
+
+
+def _configurations(dimension: int) -> dict[str, tuple[Callable, int, int]]:
+    """name -> (index factory, first stage dimension, candidates re-scored, 0 for none)."""
+    compact = min(256, dimension)
+    configurations = {
+        'flat/float32': (lambda: FlatIndex(dimension=dimension, dtype=FLOAT32), dimension, 0),
+        'flat/int8': (lambda: FlatIndex(dimension=dimension, dtype=INT8), dimension, 0),
+        f'{compact}d/float32': (lambda: FlatIndex(dimension=compact, dtype=FLOAT32), compact, 0),
+        f'{compact}d/float32+rescore': (lambda: FlatIndex(dimension=compact, dtype=FLOAT32), compact, RESCORE_CANDIDATES),
+        'binary+rescore': (lambda: FlatIndex(dimension=dimension, dtype=BINARY), dimension, RESCORE_CANDIDATES),
+        f'{compact}d/binary+rescore': (lambda: FlatIndex(dimension=compact, dtype=BINARY), compact, RESCORE_CANDIDATES),
+    }
+    try:
+        import hnswlib  # noqa: F401
+        configurations['hnsw/float32'] = (lambda: HnswIndex(dimension=dimension), dimension, 0)
+        configurations[f'hnsw/{compact}d+rescore'] = (lambda: HnswIndex(dimension=compact), compact, RESCORE_CANDIDATES)
+    except ImportError:
+        pass
+    return configurations
+
+
+def benchmark(
+    vectors: int = 100_000,
+    dimension: int = 1536,
+    queries: int = 200,
+    embeddings_path: Optional[str] = None,
+    k: int = 5,
+) -> dict[str, dict[str, float]]:
+    """Build every configuration on the same vectors and time top-k queries.
+
+    Args:
+        vectors (int): Indexed vectors (ignored with an embeddings file).
+        dimension (int): Embedding dimension (ignored with an embeddings file).
+        queries (int): Timed queries per configuration.
+        embeddings_path (Optional[str]): ``.npy`` file of real embeddings; the
+            queries are then noisy copies of random rows.
+        k (int): Neighbours per query.
+
+    Returns:
+        dict[str, dict[str, float]]: Build seconds, p50/p99 query microseconds,
+            first stage memory and recall@k, per configuration.
+    """
+    if embeddings_path:
+        data = normalize(np.load(embeddings_path))
+        generator = np.random.default_rng(0)
+        picked = data[generator.integers(0, len(data), queries)]
+        query_vectors = normalize(picked + 0.02 * generator.standard_normal(picked.shape, dtype=np.float32))
+    else:
+        data, query_vectors = _synthetic(vectors, dimension, queries)
+    vectors, dimension = data.shape
+    ids = [str(i) for i in range(vectors)]
+    exact = [set(top_k(data @ query, k).tolist()) for query in query_vectors]
+
+    results: dict[str, dict[str, float]] = {}
+    for name, (build, stage_dimension, candidates) in _configurations(dimension).items():
+        start_time = time.perf_counter()
+        index = build()
+        index.upsert(ids, data[:, :stage_dimension])
+        build_seconds = time.perf_counter() - start_time
+
+        samples, recalls = [], []
+        for query, expected in zip(query_vectors, exact):
+            start_time = time.perf_counter()
+            found, _ = index.search(query[:stage_dimension], candidates or k)
+            positions = np.fromiter(found, dtype=np.int64)
+            if candidates:
+                positions = positions[top_k(data[positions] @ query, k)]
+            samples.append((time.perf_counter() - start_time) * 1e6)
+            recalls.append(len(expected & set(positions.tolist())) / k)
+        samples.sort()
+        results[name] = {
+            'build_s': build_seconds,
+            'p50_us': statistics.median(samples),
+            'p99_us': samples[min(len(samples) - 1, round(0.99 * (len(samples) - 1)))],
+            'memory_mb': index.memory_bytes / 2**20,
+            'mb_per_100k': index.memory_bytes / vectors * 100_000 / 2**20,
+            'recall': statistics.mean(recalls),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    numbers = [int(argument) for argument in sys.argv[1:4]]
+    path = sys.argv[4] if len(sys.argv) > 4 else None
+    for configuration, stats in benchmark(*numbers, embeddings_path=path).items():
+        print(
+            f'{configuration:>22}: build {stats["build_s"]:6.2f} s  p50 {stats["p50_us"]:9.1f} us  '
+            f'p99 {stats["p99_us"]:9.1f} us  {stats["mb_per_100k"]:7.1f} MB / 100k  recall@k {stats["recall"]:.3f}'
+        )
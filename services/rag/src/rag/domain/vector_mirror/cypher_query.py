@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+
+SERVER_TIME = """RETURN timestamp() AS now"""
+
+# The first $dimension components: the stored Matryoshka copy when it is long
+# enough, the full embedding otherwise
+MIRROR_EMBEDDING = """CASE WHEN size(d.embedding_compact) >= $dimension
+  THEN d.embedding_compact[0..$dimension]
+  ELSE d.embedding[0..$dimension]
+END AS embedding"""
+
+# Full load, paged by uid
+MIRROR_LOAD = """MATCH (d:Description)
+WHERE d.uid > $after AND d.type = $type AND d.embedding IS NOT NULL
+RETURN d.uid AS uid, """ + MIRROR_EMBEDDING + """
+ORDER BY d.uid LIMIT $batch_size
+"""
+
+# Descriptions written since the last sync, paged by (updated_at, uid)
+MIRROR_SYNC = """MATCH (d:Description)
+WHERE d.updated_at >= $since AND d.type = $type AND d.embedding IS NOT NULL
+WITH d WHERE d.updated_at > $since OR d.uid > $after
+RETURN d.uid AS uid, """ + MIRROR_EMBEDDING + """, d.updated_at AS updated_at
+ORDER BY d.updated_at, d.uid LIMIT $batch_size
+"""
+
+# Uids of the mirrored descriptions, paged by uid, to drop deleted ones
+MIRROR_UIDS = """MATCH (d:Description)
+WHERE d.uid > $after AND d.type = $type AND d.embedding IS NOT NULL
+RETURN d.uid AS uid
+ORDER BY d.uid LIMIT $batch_size
+"""
+
+# Full embeddings of the first stage candidates
+MIRROR_RESCORE = """MATCH (d:Description)
+WHERE d.uid IN $uids
+RETURN d.uid AS uid, d.embedding AS embedding
+"""
@@ -0,0 +1,227 @@
+"""In-process vector indexes over normalized embeddings.
+
+Both indexes store unit vectors and return the raw cosine similarity
+(estimated from the Hamming distance for binary vectors).
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from pydantic import PrivateAttr
+
+from base import BaseModel
+
+FLOAT32 = 'float32'
+INT8 = 'int8'
+BINARY = 'binary'
+
+# rows scored at once by the int8 index, bounds the float32 scratch buffer
+INT8_SEARCH_BLOCK = 8192
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale float32 rows to unit length (zero rows are left as is)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` highest scores, highest first."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    positions = np.argpartition(-scores, k)[:k]
+    return positions[np.argsort(-scores[positions])]
+
+
+class FlatIndex(BaseModel):
+    """Exact index: one contiguous matrix scored with a matrix-vector product.
+
+    With ``dtype='int8'`` every vector is stored as int8 with a float32 scale,
+    a quarter of the float32 memory, and scored block by block. With
+    ``dtype='binary'`` only the sign bits are kept (1/32 of the memory) and the
+    cosine is estimated from the Hamming distance, which is meant as the first
+    stage of a two-stage search.
+    """
+
+    dimension: int
+    dtype: str = FLOAT32
+    _ids: list[str] = PrivateAttr(default_factory=list)
+    _positions: dict[str, int] = PrivateAttr(default_factory=dict)
+    _vectors: Optional[np.ndarray] = PrivateAttr(default=None)
+    _scales: Optional[np.ndarray] = PrivateAttr(default=None)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of the stored vectors (and int8 scales)."""
+        size = len(self._ids)
+        if self._vectors is None:
+            return 0
+        scales = self._scales[:size].nbytes if self._scales is not None else 0
+        return self._vectors[:size].nbytes + scales
+
+    def _reserve(self, capacity: int) -> None:
+        current = 0 if self._vectors is None else len(self._vectors)
+        if capacity <= current:
+            return
+        capacity = max(capacity, 2 * current, 1024)
+        if self.dtype == BINARY:
+            vectors = np.zeros((capacity, (self.dimension + 7) // 8), dtype=np.uint8)
+        else:
+            storage = np.int8 if self.dtype == INT8 else np.float32
+            vectors = np.zeros((capacity, self.dimension), dtype=storage)
+        scales = np.zeros(capacity, dtype=np.float32)
+        if self._vectors is not None:
+            vectors[:current] = self._vectors
+            scales[:current] = self._scales
+        self._vectors, self._scales = vectors, scales
+
+    def _store(self, positions: np.ndarray, vectors: np.ndarray) -> None:
+        if self.dtype == BINARY:
+            self._vectors[positions] = np.packbits(vectors > 0, axis=1)
+            self._scales[positions] = 1.0
+        elif self.dtype == INT8:
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._vectors[positions] = np.round(vectors / scales[:, None]).astype(np.int8)
+            self._scales[positions] = scales
+        else:
+            self._vectors[positions] = vectors
+            self._scales[positions] = 1.0
+
+    def upsert(self, ids: list[str], vectors: np.ndarray) -> None:
+        """Insert or replace vectors by id.
+
+        Args:
+            ids (list[str]): Ids of the vectors.
+            vectors (np.ndarray): ``(len(ids), dimension)`` embeddings, normalized here.
+        """
+        if not ids:
+            return
+        vectors = normalize(vectors)
+        self._reserve(len(self._ids) + len(ids))
+        positions = []
+        for id_ in ids:
+            position = self._positions.get(id_)
+            if position is None:
+                position = len(self._ids)
+                self._positions[id_] = position
+                self._ids.append(id_)
+            positions.append(position)
+        self._store(np.asarray(positions), vectors)
+
+    def ids(self) -> list[str]:
+        """Ids of the stored vectors."""
+        return list(self._ids)
+
+    def remove(self, ids: list[str]) -> None:
+        """Remove vectors by id, moving the last vector into each freed slot."""
+        for id_ in ids:
+            position = self._positions.pop(id_, None)
+            if position is None:
+                continue
+            last = len(self._ids) - 1
+            if position != last:
+                moved = self._ids[last]
+                self._ids[position] = moved
+                self._positions[moved] = position
+                self._vectors[position] = self._vectors[last]
+                self._scales[position] = self._scales[last]
+            self._ids.pop()
+
+    def search(self, query: np.ndarray, k: int) -> tuple[list[str], np.ndarray]:
+        """Return the ids and cosine similarities of the ``k`` nearest vectors."""
+        size = len(self._ids)
+        if not size or k <= 0:
+            return [], np.empty(0, dtype=np.float32)
+        query = normalize(query)[0]
+        if self.dtype == BINARY:
+            distances = np.bitwise_count(self._vectors[:size] ^ np.packbits(query > 0)).sum(axis=1, dtype=np.int32)
+            scores = 1.0 - 2.0 * distances.astype(np.float32) / self.dimension
+        elif self.dtype == INT8:
+            scores = np.empty(size, dtype=np.float32)
+            for start in range(0, size, INT8_SEARCH_BLOCK):
+                end = min(start + INT8_SEARCH_BLOCK, size)
+                scores[start:end] = self._vectors[start:end].astype(np.float32) @ query
+            scores *= self._scales[:size]
+        else:
+            scores = self._vectors[:size] @ query
+        positions = top_k(scores, k)
+        return [self._ids[position] for position in positions], scores[positions]
+
+
+class HnswIndex(BaseModel):
+    """Approximate index backed by ``hnswlib`` (optional dependency).
+
+    Sub-millisecond queries at any size, at the cost of the graph links
+    (``2 * m`` int32 per vector) on top of the float32 vectors.
+    """
+
+    dimension: int
+    m: int = 16
+    ef_construction: int = 200
+    ef: int = 64
+    _index: object = PrivateAttr(default=None)
+    _ids: list[Optional[str]] = PrivateAttr(default_factory=list)
+    _labels: dict[str, int] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context) -> None:
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError("vector_mirror.backend='hnsw' requires hnswlib, install rag[hnsw]") from e
+        self._index = hnswlib.Index(space='ip', dim=self.dimension)
+        self._index.init_index(max_elements=1024, ef_construction=self.ef_construction, M=self.m)
+        self._index.set_ef(self.ef)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimated bytes of the vectors and level-0 links."""
+        return self._index.get_current_count() * (4 * self.dimension + 8 * self.m + 8)
+
+    def upsert(self, ids: list[str], vectors: np.ndarray) -> None:
+        """Insert or replace vectors by id."""
+        if not ids:
+            return
+        labels = []
+        for id_ in ids:
+            label = self._labels.get(id_)
+            if label is None:
+                label = len(self._ids)
+                self._labels[id_] = label
+                self._ids.append(id_)
+            labels.append(label)
+        required = len(self._ids)
+        if required > self._index.get_max_elements():
+            self._index.resize_index(max(required, 2 * self._index.get_max_elements()))
+        self._index.add_items(normalize(vectors), np.asarray(labels))
+
+    def ids(self) -> list[str]:
+        """Ids of the stored vectors."""
+        return list(self._labels)
+
+    def remove(self, ids: list[str]) -> None:
+        """Mark vectors as deleted by id."""
+        for id_ in ids:
+            label = self._labels.pop(id_, None)
+            if label is not None:
+                self._index.mark_deleted(label)
+                self._ids[label] = None
+
+    def search(self, query: np.ndarray, k: int) -> tuple[list[str], np.ndarray]:
+        """Return the ids and cosine similarities of the ``k`` nearest vectors."""
+        k = min(k, len(self._labels))
+        if k <= 0:
+            return [], np.empty(0, dtype=np.float32)
+        labels, distances = self._index.knn_query(normalize(query), k=k)
+        return [self._ids[label] for label in labels[0]], 1.0 - distances[0]
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+from typing import Optional
+
+import numpy as np
+from base import BaseModel
+from graph_db import Neo4jService
+from logger import get_logger
+from pydantic import PrivateAttr
+from rag.shared.settings.vector_mirror import VectorMirrorSetting
+
+from .cypher_query import MIRROR_LOAD
+from .cypher_query import MIRROR_RESCORE
+from .cypher_query import MIRROR_SYNC
+from .cypher_query import MIRROR_UIDS
+from .cypher_query import SERVER_TIME
+from .index import FlatIndex
+from .index import HnswIndex
+from .index import normalize
+from .index import top_k
+
+logger = get_logger(__name__)
+
+VECTORS_PER_REPORT = 100_000
+
+
+class VectorMirror(BaseModel):
+    """In-process copy of the entity Description embeddings.
+
+    :meth:`load` reads every embedding from Neo4j at startup; the background
+    task started by :meth:`start` then pulls the descriptions written since
+    the last sync, using the ``updated_at`` stamp set by the indexing writer.
+    The stamp is taken when the write statement runs, not when its
+    transaction commits, so every sync re-reads the last ``sync_overlap``
+    seconds (upserts are idempotent). Every ``reconcile_interval`` seconds the
+    mirrored uids are checked against Neo4j and deleted descriptions removed.
+    :meth:`query` answers top-k queries with scores on the Neo4j vector index
+    scale (``(1 + cos) / 2``).
+
+    With ``compact_dimension`` only the Matryoshka prefix of every embedding
+    is kept in memory; with ``rescore_candidates`` the search is two-stage:
+    the compact (or binary) index selects the candidates, which are then
+    re-scored on their full embeddings read from Neo4j.
+    """
+
+    neo4j_service: Neo4jService
+    settings: VectorMirrorSetting
+    dimension: int
+    _index: Any = PrivateAttr(default=None)
+    _version: int = PrivateAttr(default=0)
+    _reconciled_at: float = PrivateAttr(default=0.0)
+    _ready: bool = PrivateAttr(default=False)
+    _task: Optional[asyncio.Task] = PrivateAttr(default=None)
+
+    @property
+    def index_dimension(self) -> int:
+        """Dimension of the vectors held in memory."""
+        compact_dimension = self.settings.compact_dimension
+        return compact_dimension if 0 < compact_dimension < self.dimension else self.dimension
+
+    def model_post_init(self, __context) -> None:
+        if self.settings.backend == 'hnsw':
+            self._index = HnswIndex(
+                dimension=self.index_dimension,
+                m=self.settings.hnsw_m,
+                ef_construction=self.settings.hnsw_ef_construction,
+                ef=self.settings.hnsw_ef,
+            )
+        elif self.settings.backend == 'flat':
+            self._index = FlatIndex(dimension=self.index_dimension, dtype=self.settings.dtype)
+        else:
+            raise ValueError(f'Unknown vector mirror backend: {self.settings.backend}')
+
+    @property
+    def ready(self) -> bool:
+        """Whether the initial load completed."""
+        return self._ready
+
+    @property
+    def version(self) -> int:
+        """Neo4j timestamp (ms) up to which the mirror is in sync."""
+        return self._version
+
+    def stats(self) -> dict[str, Any]:
+        """Size and memory use of the mirror."""
+        size = len(self._index)
+        memory_bytes = self._index.memory_bytes
+        return {
+            'ready': self._ready,
+            'backend': self.settings.backend,
+            'dtype': self.settings.dtype if self.settings.backend == 'flat' else 'float32',
+            'vectors': size,
+            'dimension': self.index_dimension,
+            'rescore_candidates': self.settings.rescore_candidates,
+            'memory_bytes': memory_bytes,
+            'bytes_per_100k_vectors': round(memory_bytes / size * VECTORS_PER_REPORT) if size else 0,
+            'version': self._version,
+        }
+
+    def search(self, embedding: list[float], k: int) -> list[dict[str, Any]]:
+        """Top-k entity descriptions of a query embedding, from memory only.
+
+        Args:
+            embedding (list[float]): The full query embedding.
+            k (int): Number of descriptions to return.
+
+        Returns:
+            list[dict[str, Any]]: ``{'uid', 'score'}`` dicts, best first.
+        """
+        ids, similarities = self._index.search(embedding[:self.index_dimension], k)
+        return [
+            {'uid': uid, 'score': float((1.0 + similarity) / 2.0)}
+            for uid, similarity in zip(ids, similarities)
+        ]
+
+    async def query(self, embedding: list[float], k: int) -> list[dict[str, Any]]:
+        """Top-k entity descriptions of a query embedding.
+
+        Runs :meth:`search` for ``rescore_candidates`` candidates and re-scores
+        them at full dimension when two-stage search is enabled.
+
+        Args:
+            embedding (list[float]): The full query embedding.
+            k (int): Number of descriptions to return.
+
+        Returns:
+            list[dict[str, Any]]: ``{'uid', 'score'}`` dicts, best first.
+        """
+        candidates = self.settings.rescore_candidates
+        if candidates <= k:
+            return self.search(embedding, k)
+
+        hits = self.search(embedding, candidates)
+        columns = await self._read(MIRROR_RESCORE, {'uids': [hit['uid'] for hit in hits]}, 'MIRROR_RESCORE')
+        if columns is None or not columns['uid']:
+            # first stage scores are still a usable ranking
+            return hits[:k]
+
+        similarities = normalize(columns['embedding']) @ normalize(np.asarray(embedding, dtype=np.float32))[0]
+        return [
+            {'uid': columns['uid'][position], 'score': float((1.0 + similarities[position]) / 2.0)}
+            for position in top_k(similarities, k)
+        ]
+
+    async def _read(self, cypher: str, parameters: dict[str, Any], query_name: str) -> dict[str, Any] | None:
+        columns = await self.neo4j_service.execute_read(
+            cypher,
+            {'dimension': self.index_dimension, **parameters},
+            output_format='numpy',
+            vector_keys=['embedding'],
+            query_name=query_name,
+        )
+        if not isinstance(columns, dict):
+            logger.error('Vector mirror read failed', extra={'query_name': query_name, 'error': columns.error})
+            return None
+        return columns
+
+    async def load(self) -> bool:
+        """Load every entity description embedding from Neo4j.
+
+        Returns:
+            bool: Whether the load completed.
+        """
+        start_time = time.perf_counter()
+        now = await self.neo4j_service.execute_read(SERVER_TIME, output_format='records', query_name='SERVER_TIME')
+        if not isinstance(now, list):
+            logger.error('Vector mirror load failed', extra={'error': now.error})
+            return False
+
+        after = ''
+        while True:
+            columns = await self._read(
+                MIRROR_LOAD,
+                {'after': after, 'type': self.settings.description_type, 'batch_size': self.settings.batch_size},
+                'MIRROR_LOAD',
+            )
+            if columns is None:
+                return False
+            if not columns['uid']:
+                break
+            self._index.upsert(columns['uid'], columns['embedding'])
+            after = columns['uid'][-1]
+            if len(columns['uid']) < self.settings.batch_size:
+                break
+
+        # descriptions written during the load are picked up by the first sync
+        self._version = now[0]['now']
+        self._reconciled_at = time.monotonic()
+        self._ready = True
+        logger.info(
+            'Vector mirror loaded',
+            extra={**self.stats(), 'duration_ms': round((time.perf_counter() - start_time) * 1000, 2)},
+        )
+        return True
+
+    async def sync(self) -> int:
+        """Pull the descriptions written since the last sync, minus the overlap window.
+
+        Returns:
+            int: The number of upserted descriptions, -1 on failure.
+        """
+        # transactions still open at the last sync commit rows stamped before its version
+        since = max(0, self._version - int(self.settings.sync_overlap * 1000))
+        after = ''
+        latest = self._version
+        upserted = 0
+        while True:
+            columns = await self._read(
+                MIRROR_SYNC,
+                {
+                    'since': since,
+                    'after': after,
+                    'type': self.settings.description_type,
+                    'batch_size': self.settings.batch_size,
+                },
+                'MIRROR_SYNC',
+            )
+            if columns is None:
+                return -1
+            if not columns['uid']:
+                break
+            self._index.upsert(columns['uid'], columns['embedding'])
+            upserted += len(columns['uid'])
+            since = int(columns['updated_at'][-1])
+            after = columns['uid'][-1]
+            latest = max(latest, since)
+            if len(columns['uid']) < self.settings.batch_size:
+                break
+
+        self._version = latest
+        if upserted:
+            logger.info('Vector mirror synced', extra={'upserted': upserted, **self.stats()})
+        return upserted
+
+    async def reconcile(self) -> int:
+        """Remove the mirrored descriptions that no longer exist in Neo4j.
+
+        Returns:
+            int: The number of removed descriptions, -1 on failure.
+        """
+        # descriptions upserted during the scan are not in this snapshot and cannot be removed
+        mirrored = set(self._index.ids())
+        existing: set[str] = set()
+        after = ''
+        while True:
+            rows = await self.neo4j_service.execute_read(
+                MIRROR_UIDS,
+                {'after': after, 'type': self.settings.description_type, 'batch_size': self.settings.batch_size},
+                output_format='records',
+                query_name='MIRROR_UIDS',
+            )
+            if not isinstance(rows, list):
+                logger.error('Vector mirror reconcile failed', extra={'error': rows.error})
+                return -1
+            existing.update(row['uid'] for row in rows)
+            if len(rows) < self.settings.batch_size:
+                break
+            after = rows[-1]['uid']
+
+        removed = list(mirrored - existing)
+        self._index.remove(removed)
+        self._reconciled_at = time.monotonic()
+        if removed:
+            logger.info('Vector mirror reconciled', extra={'removed': len(removed), **self.stats()})
+        return len(removed)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.settings.sync_interval)
+            try:
+                if not self._ready:
+                    await self.load()
+                else:
+                    await self.sync()
+                    if time.monotonic() - self._reconciled_at >= self.settings.reconcile_interval:
+                        await self.reconcile()
+            except Exception as e:
+                logger.exception(f'Vector mirror sync failed: {e}')
+
+    def start(self) -> None:
+        """Start the background sync task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background sync task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
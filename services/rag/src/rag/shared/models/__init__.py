@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from .scope import SearchScope
+
+__all__ = [
+    'SearchScope',
+]
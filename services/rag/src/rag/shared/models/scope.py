@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from base import BaseModel
+from graph_db import course_index_name
+
+
+class SearchScope(BaseModel):
+    """Restricts a search to one course and, optionally, some of its weeks."""
+
+    course_code: str
+    week_numbers: list[int] = []
+
+    def index_name(self, index_name: str) -> str:
+        """The per-course copy of a vector index."""
+        return course_index_name(index_name, self.course_code)
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from base import BaseModel
+
+
+class ContextPackerSetting(BaseModel):
+    enabled: bool = False
+    token_budget: int = 3000
+    mmr_lambda: float = 0.7
+    duplicate_threshold: float = 0.95
+    max_relationships_per_chunk: int = 5
+    token_model: str = 'gemini-2.5-flash'
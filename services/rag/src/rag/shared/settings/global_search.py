@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from base import BaseModel
+
+
+class GlobalSearchSetting(BaseModel):
+    index_name: str = 'community_index'
+    candidates: int = 50
+    top_communities: int = 8
+    max_concurrent_maps: int = 4
+    reduce_token_budget: int = 6000
+    token_model: str = 'gemini-2.5-flash'
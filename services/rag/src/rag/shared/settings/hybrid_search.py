@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+from base import BaseModel
+
+
+class HybridSearchSetting(BaseModel):
+    enabled: bool = False
+    candidates: int = 50
+    rrf_k: int = 60
+    lexical_fields: list[str] = ['entity_name^2', 'text']
@@ -6,3 +6,4 @@ from base import BaseModel
 class ExtractChunkSetting(BaseModel):
     threshold: float
     top_k: int
+    index_name: str = 'chunk_index'
@@ -11,3 +11,10 @@ class LocalSearchSettings(BaseModel):
     extract_chunk_settings: ExtractChunkSetting
     extract_entity_settings: ExtractEntitySetting
     extract_relationship_settings: ExtractRelationshipSetting
+    single_round_trip: bool = True
+    similarity_mode: str = 'vector_index'
+    index_candidates: int = 100
+    # read the NEIGHBOR relationships materialized by the indexing service
+    # (graph_db.neighborhood); enable once the graph has been materialized
+    materialized_neighborhoods: bool = False
+    max_batch_queries: int = 16
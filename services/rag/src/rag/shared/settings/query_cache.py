@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from base import BaseModel
+
+
+class QueryCacheSetting(BaseModel):
+    enabled: bool = False
+    max_entries: int = 1024
+    path: str = ''
+    max_disk_entries: int = 100_000
+    ttl: float = 7 * 24 * 3600.0
+    version_check_interval: float = 5.0
@@ -4,12 +4,18 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 from lite_llm import LiteLLMSetting
+from open_search import OpenSearchSettings
 from graph_db import Neo4jSetting
 from pydantic_settings import BaseSettings
 from pydantic_settings import PydanticBaseSettingsSource
 from pydantic_settings import YamlConfigSettingsSource  # type: ignore
 
+from .context_packer import ContextPackerSetting
+from .global_search import GlobalSearchSetting
+from .hybrid_search import HybridSearchSetting
 from .local_search import LocalSearchSettings
+from .query_cache import QueryCacheSetting
+from .vector_mirror import VectorMirrorSetting
 
 # test in local
 load_dotenv()
@@ -19,6 +25,12 @@ class Settings(BaseSettings):
     neo4j: Neo4jSetting
     litellm: LiteLLMSetting
     local_search_settings: LocalSearchSettings
+    vector_mirror: VectorMirrorSetting
+    hybrid_search: HybridSearchSetting
+    query_cache: QueryCacheSetting
+    context_packer: ContextPackerSetting
+    global_search: GlobalSearchSetting
+    opensearch: OpenSearchSettings
 
     class Config:
         env_nested_delimiter = '__'
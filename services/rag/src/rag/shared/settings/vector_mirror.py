@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from base import BaseModel
+
+
+class VectorMirrorSetting(BaseModel):
+    enabled: bool = False
+    backend: str = 'flat'
+    dtype: str = 'float32'
+    description_type: str = 'ENTITY'
+    compact_dimension: int = 0
+    rescore_candidates: int = 0
+    batch_size: int = 5000
+    sync_interval: float = 30.0
+    sync_overlap: float = 120.0
+    reconcile_interval: float = 600.0
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 200
+    hnsw_ef: int = 64
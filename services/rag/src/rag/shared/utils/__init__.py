@@ -1 +1,6 @@
-from .utils import get_settings
\ No newline at end of file
+from .utils import get_settings
+from .fusion import reciprocal_rank_fusion
+from .neighborhood import render_neighborhood
+from .similarity import render_similarity
+from .similarity import SIMILARITY_MODES
+from .token_calculator import tokens_calculator
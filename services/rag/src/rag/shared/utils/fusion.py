@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from collections import defaultdict
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[dict]:
+    """Fuse ranked id lists with reciprocal rank fusion.
+
+    Every list contributes ``1 / (k + rank)`` (rank starting at 1) to the
+    score of each of its ids, so ids ranked well by several retrievers come
+    first without having to calibrate their scores against each other.
+
+    Args:
+        rankings (list[list[str]]): Ids of every retriever, best first.
+        k (int): Damping constant, 60 in the original paper.
+
+    Returns:
+        list[dict]: ``{'uid', 'score'}`` dicts, best first.
+    """
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, uid in enumerate(ranking, start=1):
+            scores[uid] += 1.0 / (k + rank)
+    fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [{'uid': uid, 'score': score} for uid, score in fused]
@@ -0,0 +1,41 @@
+"""Relationship context lookups of the local search queries.
+
+Query templates hold a ``<NEIGHBORHOOD>`` line binding the relationship
+Descriptions ``d`` of entity ``e`` within the retrieved chunks, and a
+``<FILE_NAME>`` expression for the file of chunk ``c``. :func:`render_neighborhood`
+fills them either with the materialized neighborhoods written by the indexing
+service (see ``graph_db.neighborhood``), a bounded lookup, or with the
+traversal of the ``Relationship`` nodes and Documents.
+"""
+from __future__ import annotations
+
+_MATERIALIZED = """OPTIONAL MATCH (e)-[neighbor:NEIGHBOR]->(d)
+WHERE neighbor.chunk_uid IN {chunk_uids}"""
+
+_TRAVERSED = """OPTIONAL MATCH (e)-[:RELATED]-(r)-[:DESCRIBED]->(d)
+WHERE d.embedding IS NOT NULL AND d.chunk_uid IN {chunk_uids}
+
+OPTIONAL MATCH (d3)-[:CONTAINED]->(c)"""
+
+
+def render_neighborhood(template: str, materialized: bool, chunk_uids: str = 'chunk_uids') -> str:
+    """Fill the relationship context placeholders of a query template.
+
+    Args:
+        template (str): The query template.
+        materialized (bool): Read the materialized neighborhoods instead of
+            traversing the graph.
+        chunk_uids (str): Cypher expression of the retrieved chunk uids.
+
+    Returns:
+        str: The Cypher query.
+    """
+    lines = []
+    for line in template.splitlines():
+        if line.strip() == '<NEIGHBORHOOD>':
+            indent = line[: len(line) - len(line.lstrip())]
+            block = (_MATERIALIZED if materialized else _TRAVERSED).format(chunk_uids=chunk_uids)
+            lines.extend(indent + block_line if block_line else '' for block_line in block.splitlines())
+            continue
+        lines.append(line.replace('<FILE_NAME>', 'c.file_name' if materialized else 'd3.file_name'))
+    return '\n'.join(lines)
@@ -0,0 +1,95 @@
+"""Cosine similarity expressions for the local search queries.
+
+Query templates hold placeholders that :func:`render_similarity` fills in for
+the configured mode:
+
+- ``vector_index``: scores are read from a vector index query; nodes missing
+  from the index candidates fall back to ``vector.similarity.cosine``.
+- ``cosine``: the native ``vector.similarity.cosine`` function on every row.
+- ``gds``: ``gds.similarity.cosine`` on every row (needs the GDS plugin).
+
+Neo4j vector indexes and ``vector.similarity.cosine`` return ``(1 + cos) / 2``;
+every mode is mapped back to the raw cosine returned by GDS so that the
+configured thresholds keep their meaning.
+"""
+from __future__ import annotations
+
+VECTOR_INDEX = 'vector_index'
+COSINE = 'cosine'
+GDS = 'gds'
+SIMILARITY_MODES = (VECTOR_INDEX, COSINE, GDS)
+
+
+def _index_hits(hits: str, index_parameter: str, vector_parameter: str) -> str:
+    # a query vector held by a variable (batched queries) is imported into the subquery
+    imported = '' if vector_parameter.startswith('$') else f'WITH {vector_parameter.split(".")[0]} '
+    return (
+        f'CALL {{ {imported}CALL db.index.vector.queryNodes({index_parameter}, $index_candidates, {vector_parameter}) '
+        f'YIELD node, score RETURN collect({{node: node, score: score}}) AS {hits} }}'
+    )
+
+
+def similarity_expression(mode: str, node: str, vector_parameter: str, hits: str) -> str:
+    """Cypher expression of the raw cosine between ``node.embedding`` and a query vector.
+
+    Args:
+        mode (str): One of ``SIMILARITY_MODES``.
+        node (str): Cypher variable of the node holding the embedding.
+        vector_parameter (str): Query vector parameter, e.g. ``$input_vector``, or
+            a variable property such as ``query.embedding``.
+        hits (str): Variable holding the index hits (``vector_index`` mode only).
+
+    Returns:
+        str: The Cypher expression.
+    """
+    if mode == GDS:
+        return f'gds.similarity.cosine({node}.embedding, {vector_parameter})'
+    function = f'(2 * vector.similarity.cosine({node}.embedding, {vector_parameter}) - 1)'
+    if mode == COSINE:
+        return function
+    if mode == VECTOR_INDEX:
+        return f'coalesce(head([hit IN {hits} WHERE hit.node = {node} | 2 * hit.score - 1]), {function})'
+    raise ValueError(f'Unknown similarity mode: {mode}')
+
+
+def render_similarity(template: str, mode: str, vector_parameter: str = '$input_vector') -> str:
+    """Fill the similarity placeholders of a query template.
+
+    Placeholders:
+        ``<CHUNK_HITS>`` / ``<DESCRIPTION_HITS>``: the index lookups, on their own line.
+        ``<CHUNK_SCORE:c>`` / ``<DESCRIPTION_SCORE:d>``: the similarity of node ``c`` / ``d``.
+
+    Args:
+        template (str): The query template.
+        mode (str): One of ``SIMILARITY_MODES``.
+        vector_parameter (str): Query vector parameter of the template.
+
+    Returns:
+        str: The Cypher query.
+    """
+    if mode not in SIMILARITY_MODES:
+        raise ValueError(f'Unknown similarity mode: {mode}')
+
+    lookups = {
+        'CHUNK': ('chunk_hits', '$chunk_index_name'),
+        'DESCRIPTION': ('description_hits', '$description_index_name'),
+    }
+    lines = []
+    for line in template.splitlines():
+        kind = next((kind for kind in lookups if line.strip() == f'<{kind}_HITS>'), None)
+        if kind is not None:
+            if mode == VECTOR_INDEX:
+                hits, index_parameter = lookups[kind]
+                indent = line[: len(line) - len(line.lstrip())]
+                lines.append(indent + _index_hits(hits, index_parameter, vector_parameter))
+            continue
+
+        for kind, (hits, _) in lookups.items():
+            marker = f'<{kind}_SCORE:'
+            while marker in line:
+                start = line.index(marker)
+                end = line.index('>', start)
+                node = line[start + len(marker):end]
+                line = line[:start] + similarity_expression(mode, node, vector_parameter, hits) + line[end + 1:]
+        lines.append(line)
+    return '\n'.join(lines)